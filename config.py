@@ -10,6 +10,10 @@ class Config:
     app_version = "1.0.0"
     app_theme = "light"  # Options: "light", "dark", "system"
     app_color_theme = "orange"  # Default color theme
+    prewarm_imports = True  # Load chart/report libraries in the background after admin login
+    frame_metrics = True  # Record screen render times and event-loop stalls
+    frame_metrics_path = "logs/frame_metrics.log"
+    frame_metrics_overlay = False  # Show the metrics overlay at startup (toggle with Ctrl+Shift+M)
     
     # Image Paths
     logo_path = "static/images/logo.png"
@@ -5,10 +5,9 @@ from datetime import datetime, timedelta
 from custom.navigation_frame_admin import NavigationFrameAdmin
 from utils import connect_to_database, execute_query
 from CTkMessagebox import CTkMessagebox
-import bcrypt
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
+from custom.order_lifecycle import ORDER_STATUSES, STATUS_COLORS, change_order_status, status_choices
+from custom.frame_metrics import timed
+from custom.facets import get_facet_index, restaurant_changed
 
 class AdminDashboard(ctk.CTkFrame):
     """Dashboard for administrators to manage the entire food ordering system."""
@@ -55,6 +54,7 @@ class AdminDashboard(ctk.CTkFrame):
         else:
             return {"FirstName": "Admin", "LastName": "User"}
     
+    @timed
     def show_frame(self, frame_name, **kwargs):
         """Show selected frame and hide others."""
         # Hide all frames
@@ -242,7 +242,21 @@ class UsersFrame(ctk.CTkFrame):
             height=40,
             width=250
         )
-        self.add_user_button.pack(pady=(0, 15))
+        self.add_user_button.pack(pady=(0, 10))
+        
+        # Bulk import button (CSV/JSON)
+        self.import_users_button = ctk.CTkButton(
+            self,
+            text="Import Users from File",
+            command=self.open_import_users_dialog,
+            fg_color="#607D8B",
+            hover_color="#455A64",
+            corner_radius=10,
+            font=("Arial", 14),
+            height=40,
+            width=250
+        )
+        self.import_users_button.pack(pady=(0, 15))
         
         # Users container
         self.users_container = ctk.CTkScrollableFrame(
@@ -256,6 +270,7 @@ class UsersFrame(ctk.CTkFrame):
         # Refresh users
         self.refresh_users()
     
+    @timed
     def refresh_users(self):
         """Refresh and display users."""
         # Clear existing items
@@ -419,7 +434,7 @@ class UsersFrame(ctk.CTkFrame):
         role_var = ctk.StringVar(value="customer")
         role_dropdown = ctk.CTkOptionMenu(
             dialog, 
-            values=["customer", "restaurant", "admin"],
+            values=["customer", "restaurant", "delivery", "admin"],
             variable=role_var,
             width=350
         )
@@ -477,6 +492,7 @@ class UsersFrame(ctk.CTkFrame):
             return
         
         # Hash password
+        import bcrypt
         hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
         
         # Check if email already exists
@@ -532,6 +548,117 @@ class UsersFrame(ctk.CTkFrame):
                 option_1="OK"
             )
     
+    def open_import_users_dialog(self):
+        """Pick a CSV/JSON file and bulk import its users with a progress dialog."""
+        from tkinter import filedialog
+        from custom.bulk_import import read_import_file
+        
+        path = filedialog.askopenfilename(
+            title="Import Users",
+            filetypes=[("User files", "*.csv *.json"), ("CSV files", "*.csv"), ("JSON files", "*.json")]
+        )
+        if not path:
+            return
+        
+        try:
+            rows = read_import_file(path)
+        except Exception as e:
+            CTkMessagebox(
+                title="Import Error",
+                message=f"Could not read import file: {e}",
+                icon="cancel",
+                option_1="OK"
+            )
+            return
+        
+        if not rows:
+            CTkMessagebox(
+                title="Import Error",
+                message="The import file does not contain any users.",
+                icon="warning",
+                option_1="OK"
+            )
+            return
+        
+        # Progress dialog
+        dialog = ctk.CTkToplevel(self)
+        dialog.title("Importing Users")
+        dialog.geometry("400x160")
+        dialog.resizable(False, False)
+        dialog.grab_set()
+        
+        status_label = ctk.CTkLabel(dialog, text=f"Preparing {len(rows)} rows...", font=("Arial", 14))
+        status_label.pack(padx=20, pady=(25, 10))
+        
+        progress_bar = ctk.CTkProgressBar(dialog, width=350)
+        progress_bar.set(0)
+        progress_bar.pack(padx=20, pady=10)
+        
+        # The import runs on a worker thread; Tk widgets are only touched from the polling loop
+        import queue
+        import threading
+        updates = queue.Queue()
+        
+        def run_import():
+            from custom.bulk_import import import_users
+            try:
+                result = import_users(rows, progress=lambda stage, done, total: updates.put(("progress", stage, done, total)))
+                updates.put(("done", result))
+            except Exception as e:
+                updates.put(("error", e))
+        
+        stage_labels = {
+            "validating": "Validating rows",
+            "checking": "Checking for existing emails",
+            "hashing": "Hashing passwords",
+            "inserting": "Saving users"
+        }
+        
+        def poll_updates():
+            try:
+                while True:
+                    message = updates.get_nowait()
+                    if message[0] == "progress":
+                        _, stage, done, total = message
+                        status_label.configure(text=f"{stage_labels.get(stage, stage)}: {done}/{total}")
+                        progress_bar.set(done / total if total else 0)
+                    else:
+                        self.finish_import_users(message, dialog)
+                        return
+            except queue.Empty:
+                pass
+            dialog.after(100, poll_updates)
+        
+        threading.Thread(target=run_import, daemon=True).start()
+        dialog.after(100, poll_updates)
+    
+    def finish_import_users(self, message, dialog):
+        """Close the progress dialog and report the bulk import result."""
+        dialog.destroy()
+        
+        if message[0] == "error":
+            CTkMessagebox(
+                title="Import Error",
+                message=f"Failed to import users: {message[1]}",
+                icon="cancel",
+                option_1="OK"
+            )
+            return
+        
+        result = message[1]
+        details = [f"Row {row}: {error}" for row, error in result.errors[:5]]
+        if len(result.errors) > 5:
+            details.append(f"...and {len(result.errors) - 5} more.")
+        
+        CTkMessagebox(
+            title="Import Complete",
+            message="\n".join([result.summary()] + details),
+            icon="check" if not result.errors else "warning",
+            option_1="OK"
+        )
+        
+        self.refresh_users()
+    
     def create_restaurant_for_user(self, user_id, restaurant_name):
         """Create a restaurant entry for a restaurant owner user."""
         query = """
@@ -556,6 +683,8 @@ class UsersFrame(ctk.CTkFrame):
             
             cursor.close()
             conn.close()
+            
+            restaurant_changed(restaurant_id)
         except Exception as e:
             print(f"Error creating restaurant for user: {e}")
     
@@ -593,7 +722,7 @@ class UsersFrame(ctk.CTkFrame):
         role_var = ctk.StringVar(value=user['Role'])
         role_dropdown = ctk.CTkOptionMenu(
             dialog, 
-            values=["customer", "restaurant", "admin"],
+            values=["customer", "restaurant", "delivery", "admin"],
             variable=role_var,
             width=350
         )
@@ -773,6 +902,7 @@ class UsersFrame(ctk.CTkFrame):
             return
         
         # Hash new password
+        import bcrypt
         hashed_password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
         
         # Update password query
@@ -886,6 +1016,7 @@ class RestaurantsFrame(ctk.CTkFrame):
         # Refresh restaurants
         self.refresh_restaurants()
     
+    @timed
     def refresh_restaurants(self):
         """Refresh and display restaurants."""
         # Clear existing items
@@ -1151,6 +1282,8 @@ class RestaurantsFrame(ctk.CTkFrame):
             cursor.close()
             conn.close()
             
+            restaurant_changed(restaurant_id)
+            
             # Close dialog
             dialog.destroy()
             
@@ -1286,6 +1419,8 @@ class RestaurantsFrame(ctk.CTkFrame):
             cursor.close()
             conn.close()
             
+            restaurant_changed(restaurant_id)
+            
             # Close dialog
             dialog.destroy()
             
@@ -1401,6 +1536,8 @@ class RestaurantsFrame(ctk.CTkFrame):
             cursor.close()
             conn.close()
             
+            restaurant_changed(restaurant_id)
+            
             # Close dialog
             dialog.destroy()
             
@@ -1445,6 +1582,8 @@ class RestaurantsFrame(ctk.CTkFrame):
                 cursor.close()
                 conn.close()
                 
+                restaurant_changed(restaurant['RestaurantID'])
+                
                 # Refresh restaurants list
                 self.refresh_restaurants()
                 
@@ -1515,7 +1654,7 @@ class OrdersFrame(ctk.CTkFrame):
         )
         self.filter_status_label.pack(side="left", padx=(20, 5), pady=10)
         
-        status_options = ["All", "pending", "preparing", "shipped", "delivered"]
+        status_options = ["All"] + list(ORDER_STATUSES)
         self.filter_status_var = ctk.StringVar(value=status_options[0])
         self.filter_status_dropdown = ctk.CTkOptionMenu(
             self.filter_frame,
@@ -1543,11 +1682,13 @@ class OrdersFrame(ctk.CTkFrame):
         query = "SELECT RestaurantID, Name FROM Restaurant ORDER BY Name"
         return execute_query(query, fetch=True) or []
     
+    @timed
     def refresh_orders(self):
         """Refresh and display orders."""
         # Clear existing items
         for widget in self.orders_container.winfo_children():
             widget.destroy()
+        self.order_cards = {}
         
         # Get selected filters
         restaurant_filter = self.filter_restaurant_var.get()
@@ -1715,12 +1856,7 @@ class OrdersFrame(ctk.CTkFrame):
             bottom_frame,
             text=f"Status: {order['OrderStatus']}",
             font=("Arial", 12),
-            text_color={
-                'pending': '#FFA000',
-                'preparing': '#2196F3',
-                'shipped': '#9C27B0',
-                'delivered': '#4CAF50'
-            }.get(order['OrderStatus'], '#666666')
+            text_color=STATUS_COLORS.get(order['OrderStatus'], '#666666')
         )
         status_label.pack(side="right")
         
@@ -1728,13 +1864,12 @@ class OrdersFrame(ctk.CTkFrame):
         actions_frame = ctk.CTkFrame(card, fg_color="transparent")
         actions_frame.pack(fill="x", padx=10, pady=5)
         
-        # Update status dropdown
-        status_options = ["pending", "preparing", "shipped", "delivered"]
+        # Update status dropdown (only the moves allowed from the current status)
         status_var = ctk.StringVar(value=order['OrderStatus'])
         
         status_dropdown = ctk.CTkOptionMenu(
             actions_frame,
-            values=status_options,
+            values=status_choices(order['OrderStatus']),
             variable=status_var,
             width=150
         )
@@ -1761,33 +1896,68 @@ class OrdersFrame(ctk.CTkFrame):
             width=150
         )
         delete_btn.pack(side="right")
+        
+        self.order_cards[order['OrderID']] = {
+            "card": card,
+            "status": order['OrderStatus'],
+            "status_label": status_label,
+            "status_var": status_var,
+            "status_dropdown": status_dropdown
+        }
+    
+    def set_card_status(self, order_id, status):
+        """Show a new status on an order's card without rebuilding it."""
+        widgets = self.order_cards.get(order_id)
+        if not widgets:
+            return
+        
+        # Drop the card if it no longer matches the status filter
+        status_filter = self.filter_status_var.get()
+        if status_filter != "All" and status != status_filter:
+            widgets["card"].destroy()
+            del self.order_cards[order_id]
+            return
+        
+        widgets["status"] = status
+        widgets["status_label"].configure(
+            text=f"Status: {status}",
+            text_color=STATUS_COLORS.get(status, '#666666')
+        )
+        widgets["status_dropdown"].configure(values=status_choices(status))
+        widgets["status_var"].set(status)
     
     def update_order_status(self, order_id, new_status):
         """Update the status of an order."""
-        query = "UPDATE `Order` SET OrderStatus = %s WHERE OrderID = %s"
+        expected_status = self.order_cards[order_id]["status"]
+        if new_status == expected_status:
+            return
         
-        try:
-            conn = connect_to_database()
-            cursor = conn.cursor()
-            cursor.execute(query, (new_status, order_id))
-            conn.commit()
-            cursor.close()
-            conn.close()
-            
-            # Refresh orders
-            self.refresh_orders()
-            
-            # Show success message
+        success, status = change_order_status(order_id, expected_status, new_status)
+        
+        if success:
+            self.set_card_status(order_id, status)
             CTkMessagebox(
                 title="Success",
                 message=f"Order status updated to '{new_status}'!",
                 icon="check",
                 option_1="OK"
             )
-        except Exception as e:
+        elif status != expected_status:
+            # Another change won; show what the order is now
+            if status:
+                self.set_card_status(order_id, status)
+            CTkMessagebox(
+                title="Order Changed",
+                message=(f"Order #{order_id} was already updated to '{status}' by someone else."
+                         if status else f"Order #{order_id} no longer exists."),
+                icon="warning",
+                option_1="OK"
+            )
+        else:
+            self.set_card_status(order_id, expected_status)
             CTkMessagebox(
                 title="Database Error",
-                message=f"Failed to update order status: {e}",
+                message="Failed to update order status.",
                 icon="cancel",
                 option_1="OK"
             )
@@ -2419,6 +2589,7 @@ class ReportsFrame(ctk.CTkFrame):
         self.user_stats_frame = ctk.CTkFrame(scrollable_frame, fg_color="white", corner_radius=10, height=180)
         self.user_stats_frame.pack(fill="x", pady=10)
     
+    @timed
     def refresh_data(self):
         """Refresh all report data."""
         self.refresh_revenue_data()
@@ -2428,6 +2599,11 @@ class ReportsFrame(ctk.CTkFrame):
     
     def refresh_revenue_data(self):
         """Refresh revenue report data."""
+        # Chart libraries are loaded on first use to keep startup fast
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        import matplotlib.pyplot as plt
+        
         # Clear existing widgets
         for widget in self.revenue_stats_frame.winfo_children():
             widget.destroy()
@@ -2514,6 +2690,10 @@ class ReportsFrame(ctk.CTkFrame):
     
     def refresh_orders_data(self):
         """Refresh orders report data."""
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        import matplotlib.pyplot as plt
+        
         # Clear existing widgets
         for widget in self.orders_stats_frame.winfo_children():
             widget.destroy()
@@ -2857,6 +3037,9 @@ class ReportsFrame(ctk.CTkFrame):
     
     def create_restaurant_statistics(self):
         """Create restaurant statistics charts."""
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        
         # Create a frame for the charts
         charts_frame = ctk.CTkFrame(self.restaurant_stats_frame, fg_color="transparent")
         charts_frame.pack(fill="both", expand=True, padx=15, pady=15)
@@ -2958,16 +3141,11 @@ class ReportsFrame(ctk.CTkFrame):
             no_data_label.pack(pady=50)
     
     def get_cuisine_distribution(self):
-        """Get distribution of restaurants by cuisine."""
-        query = """
-            SELECT Cuisine as cuisine, COUNT(*) as count
-            FROM Restaurant
-            WHERE Cuisine IS NOT NULL AND Cuisine != ''
-            GROUP BY Cuisine
-            ORDER BY count DESC
-        """
-        
-        return execute_query(query, fetch=True) or []
+        """Get distribution of restaurants by cuisine (from the facet index)."""
+        return [
+            {"cuisine": cuisine, "count": count}
+            for cuisine, count in get_facet_index().cuisine_counts()
+        ]
     
     def get_restaurant_orders(self):
         """Get top restaurants by order count."""
@@ -2984,6 +3162,9 @@ class ReportsFrame(ctk.CTkFrame):
     
     def create_user_role_chart(self):
         """Create user role distribution chart."""
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        
         # User role distribution label
         role_label = ctk.CTkLabel(
             self.user_stats_frame,
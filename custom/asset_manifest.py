@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+
+IMAGE_ROOT = os.path.join('static', 'images')
+
+# Seconds between checks of the image directories for added or removed files
+POLL_INTERVAL = 5.0
+
+_manifest = None
+_manifest_lock = threading.Lock()
+
+
+class AssetManifest:
+    """
+    In-memory list of the files under an asset directory.
+
+    The tree is scanned once; lookups are set membership tests and make no
+    filesystem calls. A background thread stats each directory every
+    `poll_interval` seconds and rescans only those whose mtime changed
+    (adding, removing or renaming a file updates its directory's mtime).
+    Listeners registered with add_listener() are called on that thread
+    after each change.
+    """
+    def __init__(self, root=IMAGE_ROOT, poll_interval=POLL_INTERVAL):
+        self.root = root
+        self.poll_interval = poll_interval
+        self._files = frozenset()
+        self._directories = {}  # Directory path -> (mtime, set of file paths)
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._poller = None
+        self.scan()
+
+    def scan(self):
+        """Rescan every directory."""
+        directories = {}
+        self._read(self.root, directories)
+        self._replace(directories)
+
+    def refresh(self):
+        """
+        Rescan directories whose mtime changed since the last scan.
+
+        Every known directory is stat'ed; only the changed ones are listed
+        again, along with any new subdirectories found in them.
+
+        Returns:
+            bool: True if anything changed
+        """
+        with self._lock:
+            known = dict(self._directories)
+
+        directories = {}
+        changed = []
+        for directory, previous in known.items():
+            try:
+                mtime = os.stat(directory).st_mtime
+            except OSError:
+                continue  # Removed; its parent's mtime changed too
+            if mtime == previous[0]:
+                directories[directory] = previous
+            else:
+                changed.append(directory)
+
+        for directory in changed:
+            self._read(directory, directories)
+        if changed or directories.keys() != known.keys():
+            self._replace(directories)
+            for listener in list(self._listeners):
+                listener()
+            return True
+        return False
+
+    def _read(self, directory, directories):
+        """List a directory into `directories`, then any subdirectories not already there."""
+        pending = [directory]
+        while pending:
+            directory = pending.pop()
+            files = set()
+            try:
+                mtime = os.stat(directory).st_mtime
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            if entry.path not in directories:
+                                pending.append(entry.path)
+                        else:
+                            files.add(entry.path)
+            except OSError:
+                continue
+            directories[directory] = (mtime, files)
+
+    def _replace(self, directories):
+        files = frozenset().union(*(paths for _, paths in directories.values()))
+        with self._lock:
+            self._directories = directories
+            self._files = files
+
+    def add_listener(self, callback):
+        """Call `callback()` whenever refresh() finds added, removed or replaced files."""
+        self._listeners.append(callback)
+
+    def exists(self, path):
+        """Return True if the file was present at the last scan."""
+        return os.path.normpath(path) in self._files
+
+    def image_path(self, filename, folder):
+        """
+        Return the path of an image, falling back to the folder's default.png.
+
+        Args:
+            filename (str): Image file name
+            folder (str): Subfolder of the root (restaurant or menu)
+
+        Returns:
+            str: Path of the image or its fallback, or None if neither exists
+        """
+        base_path = os.path.join(self.root, folder)
+        full_path = os.path.join(base_path, filename)
+        if full_path in self._files:
+            return full_path
+        fallback_path = os.path.join(base_path, 'default.png')
+        if fallback_path in self._files:
+            return fallback_path
+        return None
+
+    def start_polling(self):
+        """Watch for file changes on a background thread."""
+        if self._poller is None:
+            self._poller = threading.Thread(target=self._poll, daemon=True)
+            self._poller.start()
+
+    def _poll(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing asset manifest: {e}")
+
+
+def get_asset_manifest():
+    """Return the process-wide image manifest, scanning and watching it on first use."""
+    global _manifest
+    with _manifest_lock:
+        if _manifest is None:
+            _manifest = AssetManifest()
+            _manifest.start_polling()
+        return _manifest
@@ -1,9 +1,8 @@
 import customtkinter as ctk
-from tkinter import messagebox
 from PIL import Image
 import re  # For password validation
-import bcrypt
-from utils import connect_to_database, execute_query, soft_delete
+from mysql.connector import IntegrityError
+from utils import connect_to_database, execute_query, DEFAULT_USER_SETTINGS
 from CTkMessagebox import CTkMessagebox  # Assuming you'll install this package
 
 # Function to validate user credentials
@@ -25,6 +24,7 @@ def validate_user(email, password):
         
         if user and len(user) > 0:
             user = user[0]  # Get the first user
+            import bcrypt
             if bcrypt.checkpw(password.encode('utf-8'), user['Password'].encode('utf-8')):
                 # Remove the password before returning user data
                 del user['Password']
@@ -40,6 +40,11 @@ def register_user(first_name, last_name, email, password, role='customer'):
     """
     Registers a new user in the database with a hashed password.
     
+    The user and their default settings are written in one transaction on a
+    single connection. The new UserID comes from lastrowid and all default
+    settings go in one multi-row insert. A duplicate email is detected by
+    the unique index on User.Email, so no existence query is needed.
+    
     Args:
         first_name (str): User's first name
         last_name (str): User's last name
@@ -50,51 +55,49 @@ def register_user(first_name, last_name, email, password, role='customer'):
     Returns:
         bool: True if registration was successful, False otherwise
     """
+    # Hash before connecting so the connection is only held for the inserts
+    import bcrypt
+    hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    
+    conn = None
     try:
-        # Check if email already exists for active users
-        check_query = "SELECT UserID FROM User WHERE Email = %s AND IsActive = True AND DeletedAt IS NULL"
-        existing_user = execute_query(check_query, (email,), fetch=True)
-        
-        if existing_user:
+        conn = connect_to_database()
+        if not conn:
             return False
-
-        # Hash the password before storing
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        
+        cursor = conn.cursor()
         
         # Insert the new user with IsActive flag
         query = """
         INSERT INTO User (FirstName, LastName, Email, Password, Role, IsActive, CreatedAt)
         VALUES (%s, %s, %s, %s, %s, True, NOW())
         """
-        execute_query(query, (first_name, last_name, email, hashed_password, role), fetch=False)
-        
-        # Add default settings for the new user
-        user_id_query = "SELECT UserID FROM User WHERE Email = %s"
-        user_result = execute_query(user_id_query, (email,), fetch=True)
-        
-        if user_result and len(user_result) > 0:
-            user_id = user_result[0]['UserID']
-            
-            # Default settings
-            settings_query = """
-            INSERT INTO UserSettings (UserID, SettingName, SettingValue, CreatedAt)
-            VALUES (%s, %s, %s, NOW())
-            """
-            
-            default_settings = [
-                (user_id, "Notifications", True),
-                (user_id, "DarkMode", False),
-                (user_id, "AutoSaveAddress", True),
-                (user_id, "SavePaymentInfo", False)
-            ]
-            
-            for setting in default_settings:
-                execute_query(settings_query, setting, fetch=False)
-                
+        cursor.execute(query, (first_name, last_name, email, hashed_password, role))
+        user_id = cursor.lastrowid
+        
+        # Add default settings for the new user in a single statement
+        values = ", ".join(["(%s, %s, %s, NOW())"] * len(DEFAULT_USER_SETTINGS))
+        settings_query = f"INSERT INTO UserSettings (UserID, SettingName, SettingValue, CreatedAt) VALUES {values}"
+        params = []
+        for setting_name, setting_value in DEFAULT_USER_SETTINGS:
+            params.extend((user_id, setting_name, setting_value))
+        cursor.execute(settings_query, tuple(params))
+        
+        conn.commit()
+        cursor.close()
         return True
+    except IntegrityError:
+        # Email already registered
+        conn.rollback()
+        return False
     except Exception as err:
         print(f"Database Error: {err}")
+        if conn and conn.is_connected():
+            conn.rollback()
         return False
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
 
 
 # Function to reset a user's password
@@ -118,6 +121,7 @@ def reset_password_logic(email, new_password):
             return False, "Email not found or account is inactive."
 
         # Update password with hash
+        import bcrypt
         hashed_password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
         update_query = "UPDATE User SET Password = %s, UpdatedAt = NOW() WHERE Email = %s"
         execute_query(update_query, (hashed_password, email), fetch=False)
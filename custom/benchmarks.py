@@ -0,0 +1,64 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import execute_query
+
+# Benchmark accounts use this domain so they can be found and removed afterwards
+BENCHMARK_EMAIL_DOMAIN = "benchmark.invalid"
+
+
+def benchmark_signups(count=50, concurrency=4, cleanup=True):
+    """
+    Measure registration throughput against the configured database.
+
+    Signs up `count` throwaway users through custom.auth.register_user using
+    `concurrency` threads. bcrypt releases the GIL, so the threads overlap
+    like concurrent clients would.
+
+    Args:
+        count (int, optional): Number of signups to perform
+        concurrency (int, optional): Number of simultaneous signups
+        cleanup (bool, optional): Delete the benchmark users afterwards
+
+    Returns:
+        dict: Signups attempted and succeeded, elapsed seconds, signups per
+              second, and average and worst per-signup latency in milliseconds
+    """
+    from custom.auth import register_user
+
+    run_id = int(time.time())
+    emails = [f"signup-{run_id}-{i}@{BENCHMARK_EMAIL_DOMAIN}" for i in range(count)]
+    latencies = []
+
+    def sign_up(email):
+        started = time.perf_counter()
+        ok = register_user("Bench", "User", email, "Benchmark#2025", "customer")
+        latencies.append(time.perf_counter() - started)
+        return ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        succeeded = sum(1 for ok in pool.map(sign_up, emails) if ok)
+    elapsed = time.perf_counter() - started
+
+    if cleanup:
+        # UserSettings rows are removed by ON DELETE CASCADE
+        execute_query("DELETE FROM User WHERE Email LIKE %s", (f"signup-{run_id}-%@{BENCHMARK_EMAIL_DOMAIN}",))
+
+    return {
+        "signups": count,
+        "succeeded": succeeded,
+        "elapsed": elapsed,
+        "per_second": count / elapsed if elapsed else 0.0,
+        "avg_ms": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        "max_ms": max(latencies) * 1000 if latencies else 0.0
+    }
+
+
+def print_benchmark(title, results):
+    """Print benchmark results as an aligned two-column table."""
+    print(title)
+    print("-" * 40)
+    for key, value in results.items():
+        text = f"{value:.2f}" if isinstance(value, float) else str(value)
+        print(f"{key:<20} {text:>19}")
@@ -0,0 +1,310 @@
+import csv
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+from utils import connect_to_database, DEFAULT_USER_SETTINGS
+
+# Roles that can be bulk imported. Restaurant owners also need a Restaurant
+# row, so they are still created one at a time from the Users screen.
+IMPORTABLE_ROLES = ("customer", "admin")
+
+# Rows inserted per transaction
+DEFAULT_CHUNK_SIZE = 1000
+
+# Emails checked per duplicate lookup query
+EMAIL_LOOKUP_BATCH = 1000
+
+# Key read_import_file adds to each row: its line in a CSV file (the header
+# is line 1) or its 1-based position in a JSON list
+ROW_NUMBER_KEY = "_RowNumber"
+
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+
+class ImportResult:
+    """Summary of a bulk import run."""
+    def __init__(self):
+        self.imported = 0
+        self.skipped_existing = []  # Emails already in the database
+        self.errors = []  # (row_number, message) tuples
+
+    def summary(self):
+        """Return a short human readable summary."""
+        return (
+            f"Imported {self.imported} user(s). "
+            f"Skipped {len(self.skipped_existing)} existing email(s). "
+            f"{len(self.errors)} row(s) had errors."
+        )
+
+
+def read_import_file(path):
+    """
+    Read user rows from a CSV or JSON file.
+
+    CSV files need a header row; JSON files must contain a list of objects.
+    Expected fields are FirstName, LastName, Email, Password and optionally
+    Phone, Address and Role. Each row also gets ROW_NUMBER_KEY, so errors
+    can point at the row in the file.
+
+    Args:
+        path (str): Path to a .csv or .json file
+
+    Returns:
+        list: List of dicts, one per user
+    """
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == ".json":
+        with open(path, encoding="utf-8") as f:
+            rows = json.load(f)
+        if not isinstance(rows, list):
+            raise ValueError("JSON import file must contain a list of users.")
+        for row_number, row in enumerate(rows, start=1):
+            if isinstance(row, dict):
+                row[ROW_NUMBER_KEY] = row_number
+        return rows
+
+    if extension == ".csv":
+        rows = []
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            reader.fieldnames  # Reads the header, so line_num counts from it
+            while True:
+                # A quoted field can span lines, so note where each row starts
+                start_line = reader.line_num + 1
+                try:
+                    row = next(reader)
+                except StopIteration:
+                    break
+                row[ROW_NUMBER_KEY] = start_line
+                rows.append(row)
+        return rows
+
+    raise ValueError("Import file must be a .csv or .json file.")
+
+
+def validate_rows(rows, result):
+    """
+    Validate and normalize import rows.
+
+    Rows with errors are recorded on the result and dropped. Repeated emails
+    within the file keep only their first occurrence.
+
+    Args:
+        rows (list): Rows from read_import_file
+        result (ImportResult): Collects per-row errors
+
+    Returns:
+        list: Clean user dicts ready to hash and insert
+    """
+    from custom.auth import is_password_strong
+
+    valid = []
+    seen_emails = set()
+
+    for position, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            result.errors.append((position, "Expected an object with user fields."))
+            continue
+        row_number = row.get(ROW_NUMBER_KEY, position)
+        first_name = str(row.get("FirstName") or "").strip()
+        last_name = str(row.get("LastName") or "").strip()
+        email = str(row.get("Email") or "").strip().lower()
+        password = str(row.get("Password") or "")
+        role = str(row.get("Role") or "customer").strip().lower()
+
+        if not first_name or not last_name or not email or not password:
+            result.errors.append((row_number, "FirstName, LastName, Email and Password are required."))
+            continue
+        if not EMAIL_PATTERN.match(email):
+            result.errors.append((row_number, f"Invalid email address: {email}"))
+            continue
+        if not is_password_strong(password):
+            result.errors.append((row_number, f"Password for {email} does not meet the requirements."))
+            continue
+        if role not in IMPORTABLE_ROLES:
+            result.errors.append((row_number, f"Role '{role}' cannot be bulk imported."))
+            continue
+        if email in seen_emails:
+            result.errors.append((row_number, f"Duplicate email in file: {email}"))
+            continue
+
+        seen_emails.add(email)
+        valid.append({
+            "FirstName": first_name,
+            "LastName": last_name,
+            "Email": email,
+            "Password": password,
+            "Phone": str(row.get("Phone") or "").strip() or None,
+            "Address": str(row.get("Address") or "").strip() or None,
+            "Role": role,
+            "RowNumber": row_number
+        })
+
+    return valid
+
+
+def hash_password(password):
+    """Hash a single password with bcrypt. Runs inside the worker processes."""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+
+def hash_passwords(passwords, workers=None, progress=None):
+    """
+    Hash passwords across a process pool.
+
+    bcrypt is CPU bound by design, so processes (not threads) are used to
+    spread the work over every core.
+
+    Args:
+        passwords (list): Plain text passwords
+        workers (int, optional): Number of processes (default: CPU count)
+        progress (callable, optional): Called as progress(stage, done, total)
+
+    Returns:
+        list: Hashes in the same order as the input
+    """
+    total = len(passwords)
+    if total == 0:
+        return []
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, min(64, total // (workers * 4) or 1))
+    hashes = []
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for hashed in pool.map(hash_password, passwords, chunksize=chunksize):
+            hashes.append(hashed)
+            if progress and (len(hashes) % 100 == 0 or len(hashes) == total):
+                progress("hashing", len(hashes), total)
+
+    return hashes
+
+
+def find_existing_emails(cursor, emails, batch_size=EMAIL_LOOKUP_BATCH, progress=None):
+    """
+    Return the subset of emails that already belong to a user.
+
+    Args:
+        cursor: Open database cursor
+        emails (list): Emails to check
+        batch_size (int, optional): Emails per IN (...) query
+        progress (callable, optional): Called as progress("checking", done, total)
+
+    Returns:
+        set: Lowercased emails that already exist
+    """
+    existing = set()
+    for start in range(0, len(emails), batch_size):
+        batch = emails[start:start + batch_size]
+        placeholders = ", ".join(["%s"] * len(batch))
+        cursor.execute(f"SELECT Email FROM User WHERE Email IN ({placeholders})", tuple(batch))
+        existing.update(row[0].lower() for row in cursor.fetchall())
+        if progress:
+            progress("checking", start + len(batch), len(emails))
+    return existing
+
+
+def insert_user_chunk(cursor, users):
+    """
+    Insert a chunk of users and their default settings.
+
+    Args:
+        cursor: Open database cursor inside a transaction
+        users (list): User dicts with a hashed Password
+    """
+    user_query = """
+        INSERT INTO User (FirstName, LastName, Email, Password, Phone, Address, Role)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """
+    cursor.executemany(user_query, [
+        (u["FirstName"], u["LastName"], u["Email"], u["Password"], u["Phone"], u["Address"], u["Role"])
+        for u in users
+    ])
+
+    # Look up the new IDs in one query rather than relying on consecutive auto-increment values
+    emails = [u["Email"] for u in users]
+    placeholders = ", ".join(["%s"] * len(emails))
+    cursor.execute(f"SELECT UserID FROM User WHERE Email IN ({placeholders})", tuple(emails))
+    user_ids = [row[0] for row in cursor.fetchall()]
+
+    settings_query = """
+        INSERT INTO UserSettings (UserID, SettingName, SettingValue)
+        VALUES (%s, %s, %s)
+    """
+    cursor.executemany(settings_query, [
+        (user_id, name, value)
+        for user_id in user_ids
+        for name, value in DEFAULT_USER_SETTINGS
+    ])
+
+
+def import_users(rows, chunk_size=DEFAULT_CHUNK_SIZE, workers=None, progress=None):
+    """
+    Validate, hash and insert users in bulk.
+
+    Args:
+        rows (list): Raw rows from read_import_file
+        chunk_size (int, optional): Users inserted per transaction
+        workers (int, optional): Processes used for password hashing
+        progress (callable, optional): Called as progress(stage, done, total)
+            with stage one of "validating", "checking", "hashing", "inserting"
+
+    Returns:
+        ImportResult: Counts of imported, skipped and failed rows
+    """
+    result = ImportResult()
+
+    if progress:
+        progress("validating", 0, len(rows))
+    users = validate_rows(rows, result)
+    if not users:
+        return result
+
+    conn = connect_to_database()
+    if not conn:
+        result.errors.append((0, "Could not connect to the database."))
+        return result
+
+    try:
+        cursor = conn.cursor()
+
+        # Drop emails that are already registered
+        if progress:
+            progress("checking", 0, len(users))
+        existing = find_existing_emails(cursor, [u["Email"] for u in users], progress=progress)
+        if existing:
+            result.skipped_existing = sorted(existing)
+            users = [u for u in users if u["Email"] not in existing]
+        if not users:
+            return result
+
+        # Hash in parallel, then insert in chunked transactions
+        hashes = hash_passwords([u["Password"] for u in users], workers=workers, progress=progress)
+        for user, hashed in zip(users, hashes):
+            user["Password"] = hashed
+
+        total = len(users)
+        for start in range(0, total, chunk_size):
+            chunk = users[start:start + chunk_size]
+            try:
+                insert_user_chunk(cursor, chunk)
+                conn.commit()
+                result.imported += len(chunk)
+            except Exception as e:
+                conn.rollback()
+                first_row, last_row = chunk[0]["RowNumber"], chunk[-1]["RowNumber"]
+                result.errors.append((first_row, f"Failed to insert rows {first_row}-{last_row}: {e}"))
+            if progress:
+                progress("inserting", min(start + chunk_size, total), total)
+
+        cursor.close()
+    finally:
+        if conn.is_connected():
+            conn.close()
+
+    return result
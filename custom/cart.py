@@ -0,0 +1,153 @@
+import json
+from decimal import Decimal
+
+from custom.pricing import to_money
+
+# Bump when the serialized layout changes
+CART_FORMAT_VERSION = 1
+
+
+class Cart:
+    """
+    Shopping cart keyed by MenuID.
+
+    Lines are plain dicts (MenuID, ItemName, Price, Quantity, RestaurantID)
+    kept in the order they were added. Adding, changing and removing a line
+    are dict operations, and the total is adjusted by each change's
+    difference rather than re-summed. Lines hold data only; screens keep
+    their widgets elsewhere, keyed by MenuID.
+
+    If `on_change` is set it is called with the MenuID of every line that
+    changes, or with None when the cart is cleared.
+    """
+    def __init__(self):
+        self._lines = {}
+        self.total = Decimal("0.00")
+        self.item_count = 0
+        self.on_change = None
+
+    def _changed(self, menu_id):
+        if self.on_change:
+            self.on_change(menu_id)
+
+    def __len__(self):
+        return len(self._lines)
+
+    def __bool__(self):
+        return bool(self._lines)
+
+    def __iter__(self):
+        return iter(self._lines.values())
+
+    def __contains__(self, menu_id):
+        return menu_id in self._lines
+
+    def get(self, menu_id):
+        """Return the line for a MenuID, or None."""
+        return self._lines.get(menu_id)
+
+    def add(self, menu_id, item_name, price, quantity=1, restaurant_id=None):
+        """
+        Add an item, or increase its quantity if it is already in the cart.
+
+        Returns:
+            dict: The cart line
+        """
+        line = self._lines.get(menu_id)
+        if line:
+            self.set_quantity(menu_id, line["Quantity"] + quantity)
+            return line
+
+        line = {
+            "MenuID": menu_id,
+            "ItemName": item_name,
+            "Price": to_money(price),
+            "Quantity": quantity,
+            "RestaurantID": restaurant_id
+        }
+        self._lines[menu_id] = line
+        self.total += line["Price"] * quantity
+        self.item_count += quantity
+        self._changed(menu_id)
+        return line
+
+    def set_quantity(self, menu_id, quantity):
+        """Set a line's quantity (at least 1) and adjust the total by the difference."""
+        line = self._lines[menu_id]
+        quantity = max(1, quantity)
+        difference = quantity - line["Quantity"]
+        line["Quantity"] = quantity
+        self.total += line["Price"] * difference
+        self.item_count += difference
+        self._changed(menu_id)
+        return line
+
+    def change_quantity(self, menu_id, change):
+        """Add `change` (may be negative) to a line's quantity."""
+        return self.set_quantity(menu_id, self._lines[menu_id]["Quantity"] + change)
+
+    def set_price(self, menu_id, price):
+        """Replace a line's unit price (e.g. after checkout re-pricing)."""
+        line = self._lines[menu_id]
+        price = to_money(price)
+        self.total += (price - line["Price"]) * line["Quantity"]
+        line["Price"] = price
+        self._changed(menu_id)
+        return line
+
+    def remove(self, menu_id):
+        """Remove a line if present. Returns the removed line or None."""
+        line = self._lines.pop(menu_id, None)
+        if line:
+            self.total -= line["Price"] * line["Quantity"]
+            self.item_count -= line["Quantity"]
+            self._changed(menu_id)
+        return line
+
+    def clear(self):
+        """Remove every line."""
+        self._lines.clear()
+        self.total = Decimal("0.00")
+        self.item_count = 0
+        self._changed(None)
+
+    def to_dict(self):
+        """Return a JSON-safe representation of the cart."""
+        return {
+            "version": CART_FORMAT_VERSION,
+            "lines": [
+                {
+                    "MenuID": line["MenuID"],
+                    "ItemName": line["ItemName"],
+                    "Price": str(line["Price"]),
+                    "Quantity": line["Quantity"],
+                    "RestaurantID": line["RestaurantID"]
+                }
+                for line in self._lines.values()
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a cart from to_dict() output. Unknown versions give an empty cart."""
+        cart = cls()
+        if not data or data.get("version") != CART_FORMAT_VERSION:
+            return cart
+        for line in data.get("lines", []):
+            cart.add(
+                line["MenuID"],
+                line["ItemName"],
+                Decimal(line["Price"]),
+                line["Quantity"],
+                line.get("RestaurantID")
+            )
+        return cart
+
+    def to_json(self):
+        """Serialize the cart to a compact JSON string."""
+        return json.dumps(self.to_dict(), separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, text):
+        """Rebuild a cart from to_json() output."""
+        return cls.from_dict(json.loads(text)) if text else cls()
@@ -0,0 +1,175 @@
+import threading
+
+from custom.cart import Cart
+from utils import connect_in_background, connect_to_database
+
+# Seconds between the first unsaved cart change and the write that saves
+# it. Every click in that window goes into the same batch.
+FLUSH_DELAY = 0.3
+
+# Seconds before a failed write is tried again
+RETRY_DELAY = 5.0
+
+
+def load_cart(user_id):
+    """
+    Restore a user's saved cart with a single query.
+
+    Args:
+        user_id (int): Owner of the cart
+
+    Returns:
+        Cart: The saved lines in the order they were added (empty if none
+              were saved or the database is unreachable)
+    """
+    cart = Cart()
+    conn = connect_to_database()
+    if not conn:
+        return cart
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT ci.MenuID, m.ItemName, ci.Price, ci.Quantity, m.RestaurantID
+            FROM CartItem ci
+            JOIN Menu m ON ci.MenuID = m.MenuID
+            WHERE ci.UserID = %s
+            ORDER BY ci.AddedAt, ci.MenuID
+        """, (user_id,))
+        for menu_id, item_name, price, quantity, restaurant_id in cursor.fetchall():
+            cart.add(menu_id, item_name, price, quantity, restaurant_id)
+        cursor.close()
+    except Exception as e:
+        print(f"Error loading cart: {e}")
+    finally:
+        if conn.is_connected():
+            conn.close()
+    return cart
+
+
+class CartStore:
+    """
+    Write-behind persistence of one user's cart to the CartItem table.
+
+    The store listens to the cart's changes. A change only records the
+    line's new quantity and price in memory and, if no write is scheduled
+    yet, starts a timer; when it fires, every line changed since is saved
+    with one multi-row upsert and one delete in a single transaction.
+    Clicking never waits on the database.
+    """
+    def __init__(self, user_id, cart, flush_delay=FLUSH_DELAY, retry_delay=RETRY_DELAY):
+        self.user_id = user_id
+        self.cart = cart
+        self.flush_delay = flush_delay
+        self.retry_delay = retry_delay
+        self._pending = {}  # MenuID -> (Quantity, Price), or None to delete
+        self._cleared = False
+        self._lock = threading.Lock()
+        # Held for a whole write so batches commit in the order they were taken
+        self._flush_lock = threading.Lock()
+        self._timer = None
+        self._closed = False
+        cart.on_change = self.mark_dirty
+
+    def mark_dirty(self, menu_id):
+        """Record a changed cart line (None for a cleared cart) and schedule a write."""
+        line = self.cart.get(menu_id) if menu_id is not None else None
+        with self._lock:
+            if menu_id is None:
+                self._pending = {}
+                self._cleared = True
+            else:
+                self._pending[menu_id] = (line["Quantity"], line["Price"]) if line else None
+
+            # Unlike settings, the timer is not restarted: a steady stream of
+            # clicks is still saved every flush_delay seconds
+            self._schedule(self.flush_delay)
+
+    def _schedule(self, delay, retry=False):
+        """Start the flush timer unless one is already waiting. Call with _lock held."""
+        if self._timer is None:
+            self._timer = threading.Timer(delay, self.flush)
+            # Retries against an unreachable database must not hold up exit
+            self._timer.daemon = retry
+            self._timer.start()
+
+    def flush(self):
+        """Write all pending cart changes in one transaction."""
+        # A change made while a write is running arms a new timer; its flush
+        # waits here so it cannot commit before the earlier batch
+        with self._flush_lock:
+            return self._flush()
+
+    def _flush(self):
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            pending, self._pending = self._pending, {}
+            cleared, self._cleared = self._cleared, False
+
+        if not pending and not cleared:
+            return True
+
+        upserts = [(menu_id, values) for menu_id, values in pending.items() if values]
+        deletes = [menu_id for menu_id, values in pending.items() if not values]
+
+        conn = None
+        try:
+            # Runs on timer threads, so connect without any messagebox
+            conn = connect_in_background()
+            if not conn:
+                raise ConnectionError("No database connection")
+            cursor = conn.cursor()
+
+            if cleared:
+                cursor.execute("DELETE FROM CartItem WHERE UserID = %s", (self.user_id,))
+            elif deletes:
+                cursor.execute(
+                    f"DELETE FROM CartItem WHERE UserID = %s AND MenuID IN ({', '.join(['%s'] * len(deletes))})",
+                    (self.user_id, *deletes)
+                )
+
+            if upserts:
+                params = []
+                for menu_id, (quantity, price) in upserts:
+                    params.extend((self.user_id, menu_id, quantity, price))
+                cursor.execute(f"""
+                    INSERT INTO CartItem (UserID, MenuID, Quantity, Price)
+                    VALUES {", ".join(["(%s, %s, %s, %s)"] * len(upserts))}
+                    ON DUPLICATE KEY UPDATE Quantity = VALUES(Quantity), Price = VALUES(Price)
+                """, tuple(params))
+
+            conn.commit()
+            cursor.close()
+            return True
+        except Exception as e:
+            print(f"Error saving cart: {e}")
+            if conn and conn.is_connected():
+                conn.rollback()
+            # Put failed changes back unless they were changed again meanwhile,
+            # and try again later
+            with self._lock:
+                if not self._cleared:
+                    self._cleared = cleared
+                    for menu_id, values in pending.items():
+                        self._pending.setdefault(menu_id, values)
+                if not self._closed:
+                    self._schedule(self.retry_delay, retry=True)
+            return False
+        finally:
+            if conn and conn.is_connected():
+                conn.close()
+
+    def close(self):
+        """
+        Stop listening to the cart and write pending changes now, in the background.
+
+        Sign-out runs on the Tk thread, which must not wait for a write in
+        progress, so the final flush gets its own (non-daemon) thread; the
+        process waits for it before exiting.
+        """
+        if self.cart.on_change == self.mark_dirty:
+            self.cart.on_change = None
+        with self._lock:
+            self._closed = True
+        threading.Thread(target=self.flush).start()
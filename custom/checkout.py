@@ -0,0 +1,61 @@
+from custom.order_feed import record_order_events
+from utils import connect_to_database
+
+
+def place_orders(user_id, pricing):
+    """
+    Create one order per restaurant from a re-priced cart.
+
+    All orders, their items and their OrderEvent rows are written in a
+    single transaction, so a basket from several restaurants is placed
+    completely or not at all. Items go in with one executemany.
+
+    Args:
+        user_id (int): Customer placing the orders
+        pricing (PricedCart): Result of custom.pricing.price_cart
+
+    Returns:
+        list: New OrderIDs, one per restaurant; empty on failure
+    """
+    groups = pricing.by_restaurant()
+    if not groups:
+        return []
+
+    conn = connect_to_database()
+    if not conn:
+        return []
+
+    try:
+        cursor = conn.cursor()
+        order_ids = []
+        item_rows = []
+
+        for restaurant_id, (lines, total) in groups.items():
+            cursor.execute("""
+                INSERT INTO `Order` (UserID, RestaurantID, TotalAmount, OrderStatus, OrderDate)
+                VALUES (%s, %s, %s, 'pending', NOW())
+            """, (user_id, restaurant_id, total))
+            order_id = cursor.lastrowid
+            order_ids.append(order_id)
+            item_rows.extend(
+                (order_id, line["MenuID"], line["Quantity"], line["Subtotal"]) for line in lines
+            )
+
+        cursor.executemany("""
+            INSERT INTO OrderItem (OrderID, MenuID, Quantity, Subtotal)
+            VALUES (%s, %s, %s, %s)
+        """, item_rows)
+
+        # Announce the orders once their items are in place
+        record_order_events(cursor, order_ids)
+
+        conn.commit()
+        cursor.close()
+        return order_ids
+    except Exception as e:
+        print(f"Database error placing orders: {e}")
+        conn.rollback()
+        return []
+    finally:
+        if conn.is_connected():
+            conn.close()
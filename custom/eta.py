@@ -0,0 +1,231 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from utils import connect_in_background
+
+# Used until a restaurant has delivered orders of its own
+DEFAULT_MINUTES = 30
+
+# Durations outside this range (test orders, orders left open overnight)
+# are clipped so one bad row cannot skew a restaurant's estimate
+MIN_MINUTES = 5
+MAX_MINUTES = 180
+
+# Restaurants with few deliveries are pulled towards the overall average.
+# This is the number of "average" orders blended into every estimate.
+PRIOR_WEIGHT = 5
+
+# Seconds before refresh_if_stale() looks for newly delivered orders
+REFRESH_INTERVAL = 300
+
+_model = None
+_model_lock = threading.Lock()
+
+
+class EtaModel:
+    """
+    Predicts order-to-door time from delivered order history.
+
+    Running totals of delivery minutes are kept per restaurant and per
+    hour of day. Each refresh only reads orders delivered since the last
+    one, aggregates them with NumPy and rebuilds a small lookup table, so
+    predict_minutes() is two dict/list lookups and never touches the
+    database.
+
+    An order counts as delivered at its Delivery row's last update, or the
+    Order's last update when no courier was recorded. New orders are found
+    by the Order's UpdatedAt, which is stamped when it turns delivered and
+    never again, through the (OrderStatus, UpdatedAt) index.
+    """
+    def __init__(self):
+        self.table = {}  # RestaurantID -> expected minutes
+        self.hour_factors = [1.0] * 24
+        self.default_minutes = DEFAULT_MINUTES
+        self.refreshed_at = None
+
+        self._restaurant_counts = {}
+        self._restaurant_totals = {}
+        self._hour_counts = [0] * 24
+        self._hour_totals = [0.0] * 24
+        self._count = 0
+        self._total = 0.0
+
+        # Each refresh reads from the newest UpdatedAt seen. Only the orders
+        # stamped in that second are re-read, so only their IDs are kept.
+        self._watermark = None
+        self._at_watermark = set()
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def fetch_delivered(self, cursor, since=None):
+        """
+        Return orders that turned delivered at or after `since`.
+
+        Returns:
+            list: (OrderID, RestaurantID, OrderDate, DeliveredAt, UpdatedAt) rows
+        """
+        query = """
+            SELECT o.OrderID, o.RestaurantID, o.OrderDate,
+                   COALESCE(MAX(d.UpdatedAt), o.UpdatedAt) AS DeliveredAt,
+                   o.UpdatedAt
+            FROM `Order` o
+            LEFT JOIN Delivery d
+                ON d.OrderID = o.OrderID
+                AND d.IsActive = True
+                AND d.DeliveryStatus = 'delivered'
+            WHERE o.OrderStatus = 'delivered' AND o.UpdatedAt IS NOT NULL
+        """
+        params = ()
+        if since is not None:
+            query += " AND o.UpdatedAt >= %s"
+            params = (since,)
+        query += " GROUP BY o.OrderID, o.RestaurantID, o.OrderDate, o.UpdatedAt"
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+    def refresh(self):
+        """
+        Fold orders delivered since the last refresh into the model.
+
+        Runs on background threads, so failures are printed, not shown.
+
+        Returns:
+            int: Number of newly counted orders
+        """
+        conn = connect_in_background()
+        if not conn:
+            return 0
+        try:
+            cursor = conn.cursor()
+            rows = self.fetch_delivered(cursor, self._watermark)
+            cursor.close()
+        except Exception as e:
+            print(f"Error loading delivery history: {e}")
+            return 0
+        finally:
+            if conn.is_connected():
+                conn.close()
+
+        with self._lock:
+            rows = [row for row in rows if row[0] not in self._at_watermark]
+            if rows:
+                self._add([row[:4] for row in rows])
+                self._advance_watermark(rows)
+            self.refreshed_at = time.monotonic()
+        return len(rows)
+
+    def _advance_watermark(self, rows):
+        """Move the watermark to the newest UpdatedAt and remember the orders stamped then."""
+        latest = max(row[4] for row in rows)
+        if self._watermark is None or latest > self._watermark:
+            self._watermark = latest
+            self._at_watermark = set()
+        self._at_watermark.update(row[0] for row in rows if row[4] == latest)
+
+    def refresh_if_stale(self, max_age=REFRESH_INTERVAL):
+        """Refresh when the table is older than `max_age` seconds."""
+        if self.refreshed_at is None or time.monotonic() - self.refreshed_at >= max_age:
+            self.refresh()
+
+    def refresh_in_background(self, max_age=REFRESH_INTERVAL):
+        """Start a refresh on a background thread when the table is older than `max_age` seconds."""
+        with self._lock:
+            if self._refreshing:
+                return
+            if self.refreshed_at is not None and time.monotonic() - self.refreshed_at < max_age:
+                return
+            self._refreshing = True
+
+        def work():
+            try:
+                self.refresh()
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=work, daemon=True).start()
+
+    def _add(self, rows):
+        """Aggregate a batch of delivered orders and rebuild the lookup table."""
+        import numpy as np
+
+        _, restaurant_ids, ordered, delivered = zip(*rows)
+        ordered = np.array(ordered, dtype="datetime64[s]")
+        delivered = np.array(delivered, dtype="datetime64[s]")
+
+        minutes = (delivered - ordered).astype(np.int64) / 60.0
+        minutes = np.clip(minutes, MIN_MINUTES, MAX_MINUTES)
+        hours = ordered.astype("datetime64[h]").astype(np.int64) % 24
+
+        # Per-restaurant counts and totals for this batch in one pass each
+        ids, inverse = np.unique(np.array(restaurant_ids), return_inverse=True)
+        counts = np.bincount(inverse)
+        totals = np.bincount(inverse, weights=minutes)
+        for restaurant_id, count, total in zip(ids.tolist(), counts.tolist(), totals.tolist()):
+            self._restaurant_counts[restaurant_id] = self._restaurant_counts.get(restaurant_id, 0) + count
+            self._restaurant_totals[restaurant_id] = self._restaurant_totals.get(restaurant_id, 0.0) + total
+
+        hour_counts = np.bincount(hours, minlength=24)
+        hour_totals = np.bincount(hours, weights=minutes, minlength=24)
+        for hour in range(24):
+            self._hour_counts[hour] += int(hour_counts[hour])
+            self._hour_totals[hour] += float(hour_totals[hour])
+
+        self._count += len(rows)
+        self._total += float(minutes.sum())
+
+        self._rebuild_table()
+
+    def _rebuild_table(self):
+        """Recompute the smoothed per-restaurant and per-hour lookup tables."""
+        import numpy as np
+
+        average = self._total / self._count if self._count else DEFAULT_MINUTES
+        self.default_minutes = int(round(average))
+
+        ids = list(self._restaurant_counts)
+        counts = np.array([self._restaurant_counts[i] for i in ids], dtype=float)
+        totals = np.array([self._restaurant_totals[i] for i in ids], dtype=float)
+        estimates = (totals + PRIOR_WEIGHT * average) / (counts + PRIOR_WEIGHT)
+
+        hour_counts = np.array(self._hour_counts, dtype=float)
+        hour_totals = np.array(self._hour_totals, dtype=float)
+        hour_factors = (hour_totals + PRIOR_WEIGHT * average) / (hour_counts + PRIOR_WEIGHT) / average
+
+        # Swap in whole objects so readers never see a half-built table
+        self.table = dict(zip(ids, np.rint(estimates).astype(int).tolist()))
+        self.hour_factors = hour_factors.tolist()
+
+    def predict_minutes(self, restaurant_id, when=None):
+        """
+        Return the expected order-to-door time in minutes.
+
+        Args:
+            restaurant_id (int): Restaurant the order is placed with
+            when (datetime, optional): Order time (default: now)
+
+        Returns:
+            int: Predicted minutes
+        """
+        when = when or datetime.now()
+        base = self.table.get(restaurant_id, self.default_minutes)
+        return max(MIN_MINUTES, int(round(base * self.hour_factors[when.hour])))
+
+    def predict_arrival(self, restaurant_id, order_date):
+        """Return the predicted delivery datetime for an order placed at `order_date`."""
+        return order_date + timedelta(minutes=self.predict_minutes(restaurant_id, order_date))
+
+
+def get_eta_model():
+    """
+    Return the shared ETA model, starting the delivery history load on first use.
+
+    Predictions use DEFAULT_MINUTES until the first load finishes.
+    """
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = EtaModel()
+            _model.refresh_in_background()
+        return _model
@@ -0,0 +1,224 @@
+import bisect
+import threading
+import time
+
+from utils import execute_query
+
+# Seconds before get_facet_index() checks the database for restaurants
+# changed by other clients
+REFRESH_INTERVAL = 60
+
+# Restaurant columns the home screen's cards, facets and rankings use
+RESTAURANT_COLUMNS = (
+    "RestaurantID", "Name", "Cuisine", "Location",
+    "RatingCount", "RatingSum", "CreatedAt", "UpdatedAt",
+)
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def restaurant_columns(alias=None):
+    """Return RESTAURANT_COLUMNS as a SELECT list, optionally qualified with a table alias."""
+    return ", ".join(f"{alias}.{column}" if alias else column for column in RESTAURANT_COLUMNS)
+
+
+# Per-row version the probe sums over; rows in the index carry it as VersionStamp
+VERSION_STAMP = "UNIX_TIMESTAMP(COALESCE(UpdatedAt, CreatedAt))"
+
+
+def _sort_key(restaurant):
+    return ((restaurant.get("Name") or "").casefold(), restaurant["RestaurantID"])
+
+
+class FacetIndex:
+    """
+    The restaurant list with a cuisine facet over it.
+
+    Built from one query over the Restaurant table (only the
+    RESTAURANT_COLUMNS the home screen shows), it keeps the rows by
+    RestaurantID and, per cuisine, a sorted list of RestaurantIDs, so
+    listing cuisines with counts, filtering by cuisine and combining a
+    cuisine with other results are in-memory lookups. Changes made in this
+    process are applied one restaurant at a time with `restaurant_changed`;
+    changes made elsewhere are picked up by a cheap version probe every
+    REFRESH_INTERVAL seconds.
+    """
+    def __init__(self):
+        self.restaurants = {}  # RestaurantID -> row
+        self.by_cuisine = {}  # Cuisine -> sorted RestaurantIDs
+        self.version = None
+        self.checked_at = None
+        self._lock = threading.Lock()
+
+    def probe(self):
+        """
+        Return the version tuple of the Restaurant table.
+
+        (row count, sum of row version stamps, sum of RatingCount): adding,
+        deleting or editing a restaurant moves the first two and a rating
+        moves the third, by amounts `restaurant_changed` can predict.
+        """
+        result = execute_query(f"""
+            SELECT COUNT(*) AS RestaurantCount,
+                   SUM({VERSION_STAMP}) AS VersionSum,
+                   SUM(RatingCount) AS RatingTotal
+            FROM Restaurant
+        """, fetch=True)
+        if not result:
+            return None
+        row = result[0]
+        return (row["RestaurantCount"], row["VersionSum"] or 0, row["RatingTotal"] or 0)
+
+    def fetch(self, restaurant_id=None):
+        """Read restaurant rows with their VersionStamp (all of them for None)."""
+        query = f"SELECT {restaurant_columns()}, {VERSION_STAMP} AS VersionStamp FROM Restaurant"
+        if restaurant_id is None:
+            return execute_query(query, fetch=True)
+        return execute_query(query + " WHERE RestaurantID = %s", (restaurant_id,), fetch=True)
+
+    def load(self):
+        """Rebuild the index from the Restaurant table."""
+        version = self.probe()
+        rows = self.fetch()
+        if rows is None:
+            return self
+        with self._lock:
+            self.restaurants = {}
+            self.by_cuisine = {}
+            for row in rows:
+                self._add(row)
+            self.version = version
+            self.checked_at = time.monotonic()
+        return self
+
+    def refresh_if_stale(self, max_age=REFRESH_INTERVAL):
+        """Reload when another client changed restaurants since the last check."""
+        if self.checked_at is not None and time.monotonic() - self.checked_at < max_age:
+            return
+        version = self.probe()
+        if version is not None and version != self.version:
+            self.load()
+        else:
+            self.checked_at = time.monotonic()
+
+    def _add(self, row):
+        # Caller holds the lock
+        self.restaurants[row["RestaurantID"]] = row
+        cuisine = row.get("Cuisine")
+        if cuisine:
+            bisect.insort(self.by_cuisine.setdefault(cuisine, []), row["RestaurantID"])
+
+    def _remove(self, restaurant_id):
+        # Caller holds the lock
+        row = self.restaurants.pop(restaurant_id, None)
+        if row is None or not row.get("Cuisine"):
+            return
+        ids = self.by_cuisine[row["Cuisine"]]
+        del ids[bisect.bisect_left(ids, restaurant_id)]
+        if not ids:
+            del self.by_cuisine[row["Cuisine"]]
+
+    def upsert(self, row):
+        """Add a restaurant row or replace its previous version."""
+        with self._lock:
+            self._remove(row["RestaurantID"])
+            self._add(row)
+
+    def remove(self, restaurant_id):
+        """Drop a restaurant."""
+        with self._lock:
+            self._remove(restaurant_id)
+
+    def get(self, restaurant_id):
+        """Return one restaurant row, or None."""
+        with self._lock:
+            return self.restaurants.get(restaurant_id)
+
+    def cuisine_counts(self):
+        """Return (cuisine, restaurant count) pairs, most common first."""
+        with self._lock:
+            counts = [(cuisine, len(ids)) for cuisine, ids in self.by_cuisine.items()]
+        return sorted(counts, key=lambda item: (-item[1], item[0]))
+
+    def ids(self, cuisine=None):
+        """Return the set of RestaurantIDs with a cuisine (all of them for None)."""
+        with self._lock:
+            if cuisine is None:
+                return set(self.restaurants)
+            return set(self.by_cuisine.get(cuisine, ()))
+
+    def rows(self, restaurant_ids=None):
+        """Return restaurant rows ordered by name (all of them for None)."""
+        with self._lock:
+            if restaurant_ids is None:
+                rows = list(self.restaurants.values())
+            else:
+                rows = [self.restaurants[rid] for rid in restaurant_ids if rid in self.restaurants]
+        return sorted(rows, key=_sort_key)
+
+    def filter(self, cuisine=None, within=None):
+        """
+        Restaurants with a cuisine, optionally limited to other results.
+
+        Args:
+            cuisine (str, optional): Cuisine facet; None means any
+            within (iterable, optional): RestaurantIDs from another filter
+                (e.g. a search) to intersect with
+
+        Returns:
+            list: Matching restaurant rows ordered by name
+        """
+        ids = self.ids(cuisine)
+        if within is not None:
+            ids &= set(within)
+        return self.rows(ids)
+
+
+def get_facet_index():
+    """Return the shared facet index, building it on first use and checking it for outside changes."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = FacetIndex().load()
+            return _index
+    _index.refresh_if_stale()
+    return _index
+
+
+def restaurant_changed(restaurant_id):
+    """
+    Update the facet index after this process added, edited, rated or deleted a restaurant.
+
+    The row is re-read and swapped in. The stored version is only moved
+    forward when the table changed by exactly this row's difference;
+    anything else means another client changed restaurants too, and the
+    index is reloaded so those changes are not absorbed unseen.
+    """
+    with _index_lock:
+        index = _index
+    if index is None:
+        return
+    rows = index.fetch(restaurant_id)
+    if rows is None:
+        return
+    old = index.get(restaurant_id)
+    new = rows[0] if rows else None
+    if new:
+        index.upsert(new)
+    else:
+        index.remove(restaurant_id)
+
+    version = index.probe()
+    if index.version is None or version is None:
+        return
+    count, version_sum, rating_total = index.version
+    expected = (
+        count + (new is not None) - (old is not None),
+        version_sum + ((new or {}).get("VersionStamp") or 0) - ((old or {}).get("VersionStamp") or 0),
+        rating_total + ((new or {}).get("RatingCount") or 0) - ((old or {}).get("RatingCount") or 0),
+    )
+    if version == expected:
+        index.version = version
+    else:
+        index.load()
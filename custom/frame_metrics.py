@@ -0,0 +1,204 @@
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+
+import customtkinter as ctk
+
+from config import Config
+
+# Milliseconds between heartbeats; a heartbeat that runs late means the
+# event loop was blocked for the difference
+HEARTBEAT_MS = 100
+
+# Event-loop delays (seconds) worth recording
+STALL_THRESHOLD = 0.1
+
+# Metrics file rotation
+MAX_LOG_BYTES = 1024 * 1024
+LOG_BACKUPS = 3
+
+# Milliseconds between overlay updates
+OVERLAY_INTERVAL_MS = 1000
+
+# Heartbeats between widget counts; counting walks the whole tree, so it is
+# sampled rather than done after every timed handler
+WIDGET_COUNT_EVERY = 10
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def count_widgets(widget):
+    """Return the number of widgets in a widget's tree, including itself."""
+    count = 1
+    pending = list(widget.winfo_children())
+    while pending:
+        child = pending.pop()
+        count += 1
+        pending.extend(child.winfo_children())
+    return count
+
+
+class FrameMetrics:
+    """
+    Records how long UI handlers block the Tk event loop.
+
+    Handlers decorated with `timed` report their duration. A heartbeat
+    scheduled with `after` every HEARTBEAT_MS measures how late it runs;
+    lateness over STALL_THRESHOLD is recorded as a stall and blamed on the
+    last timed handler. Every WIDGET_COUNT_EVERY heartbeats it also counts
+    the window's widgets, and renders are logged with the latest count.
+    Records go to a rotating JSON-lines file through a queue, so the file
+    is written on a background thread, and the latest numbers can be shown
+    in a small overlay (Ctrl+Shift+M).
+    """
+    def __init__(self, path=Config.frame_metrics_path, enabled=Config.frame_metrics):
+        self.enabled = enabled
+        self.path = path
+        self.last_handler = None
+        self.last_render = None  # (label, seconds, widgets)
+        self.slowest = {}  # label -> slowest seconds seen
+        self.last_stall = None  # (seconds, blamed handler)
+        self.widget_count = 0
+        self._beats = 0
+        self._root = None
+        self._expected = None
+        self._overlay = None
+        self._logger = None
+        self._listener = None
+
+    def start(self, root, show_overlay=Config.frame_metrics_overlay):
+        """Start the heartbeat and the metrics file writer on the main window."""
+        if not self.enabled or self._root is not None:
+            return
+        self._root = root
+        self._open_log()
+        self._expected = time.perf_counter() + HEARTBEAT_MS / 1000
+        root.after(HEARTBEAT_MS, self._heartbeat)
+        root.bind_all("<Control-Shift-M>", lambda event: self.toggle_overlay())
+        if show_overlay:
+            self.toggle_overlay()
+
+    def stop(self):
+        """Flush and close the metrics file."""
+        if self._listener:
+            self._listener.stop()
+            self._listener = None
+
+    def _open_log(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        records = queue.Queue()
+        self._logger = logging.getLogger("frame_metrics")
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        self._logger.addHandler(logging.handlers.QueueHandler(records))
+        handler = logging.handlers.RotatingFileHandler(
+            self.path, maxBytes=MAX_LOG_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
+        )
+        self._listener = logging.handlers.QueueListener(records, handler)
+        self._listener.start()
+
+    def _emit(self, record):
+        if self._logger:
+            record["time"] = round(time.time(), 3)
+            self._logger.info(json.dumps(record))
+
+    def record_render(self, label, seconds):
+        """Record one timed handler run."""
+        widgets = self.widget_count
+        self.last_handler = label
+        self.last_render = (label, seconds, widgets)
+        self.slowest[label] = max(seconds, self.slowest.get(label, 0))
+        self._emit({"event": "render", "handler": label, "ms": round(seconds * 1000, 1), "widgets": widgets})
+
+    def _heartbeat(self):
+        now = time.perf_counter()
+        lag = now - self._expected
+        if lag > STALL_THRESHOLD:
+            self.last_stall = (lag, self.last_handler)
+            self._emit({"event": "stall", "ms": round(lag * 1000, 1), "handler": self.last_handler})
+        self.last_handler = None
+
+        self._beats += 1
+        if self._beats % WIDGET_COUNT_EVERY == 0:
+            self.widget_count = count_widgets(self._root)
+            # Do not count the walk itself as a stall on the next heartbeat
+            now = time.perf_counter()
+
+        self._expected = now + HEARTBEAT_MS / 1000
+        self._root.after(HEARTBEAT_MS, self._heartbeat)
+
+    def toggle_overlay(self):
+        """Show or hide the on-screen metrics overlay."""
+        if self._overlay is not None:
+            self._overlay.destroy()
+            self._overlay = None
+            return
+        self._overlay = ctk.CTkLabel(
+            self._root,
+            text="",
+            font=("Courier", 11),
+            fg_color="#222222",
+            text_color="#EEEEEE",
+            justify="left",
+            corner_radius=6
+        )
+        self._overlay.place(relx=1.0, rely=1.0, x=-5, y=-5, anchor="se")
+        self._update_overlay()
+
+    def _update_overlay(self):
+        if self._overlay is None:
+            return
+        lines = []
+        if self.last_render:
+            label, seconds, widgets = self.last_render
+            lines.append(f"last: {label} {seconds * 1000:.0f} ms, {widgets} widgets")
+        if self.last_stall:
+            seconds, label = self.last_stall
+            lines.append(f"stall: {seconds * 1000:.0f} ms ({label or 'untimed'})")
+        for label, seconds in sorted(self.slowest.items(), key=lambda item: -item[1])[:3]:
+            lines.append(f"worst: {label} {seconds * 1000:.0f} ms")
+        self._overlay.configure(text="\n".join(lines) or "no renders yet")
+        # Keep the overlay above screens packed after it
+        self._overlay.lift()
+        self._root.after(OVERLAY_INTERVAL_MS, self._update_overlay)
+
+
+def get_frame_metrics():
+    """Return the process-wide frame metrics recorder."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = FrameMetrics()
+        return _metrics
+
+
+def timed(method):
+    """
+    Decorator for widget methods that build or refresh a screen.
+
+    Records the call's duration, labelled with the class and method name
+    plus the screen name when the first argument is a string (e.g.
+    show_frame("orders")).
+    """
+    label = method.__qualname__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        metrics = get_frame_metrics()
+        if not metrics.enabled:
+            return method(self, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            name = f"{label}({args[0]})" if args and isinstance(args[0], str) else label
+            metrics.record_render(name, time.perf_counter() - start)
+    return wrapper
@@ -0,0 +1,200 @@
+import heapq
+import re
+import threading
+import time
+from array import array
+
+from utils import fetch_in_background
+
+# Seconds before get_fuzzy_index() rebuilds the index from the database
+REFRESH_INTERVAL = 300
+
+# Share of the query's trigrams a field must contain to count as a match
+MIN_SCORE = 0.45
+
+# How much a match in each field counts towards a restaurant's score
+FIELD_WEIGHTS = {
+    "name": 1.0,
+    "item": 0.9,
+    "cuisine": 0.8,
+    "description": 0.6,
+}
+FIELDS = tuple(FIELD_WEIGHTS)
+
+_index = None
+_index_lock = threading.Lock()
+_build_lock = threading.Lock()  # Serializes the first build
+_rebuilding = False
+
+_WORD = re.compile(r"\w+")
+
+
+def trigrams(text):
+    """
+    Return the set of trigrams in a text.
+
+    Words are case-folded and padded with two spaces in front and one
+    behind, so short words and word starts still produce trigrams and
+    "  p" / " pz" reward a correct first letter.
+    """
+    grams = set()
+    for word in _WORD.findall(text.casefold()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """
+    Inverted index from trigrams to the restaurant fields containing them.
+
+    Every indexed field (a restaurant name or cuisine, a dish name or
+    description) is a document numbered in insertion order. Postings are
+    `array('I')` runs of document numbers and per-document data sits in
+    parallel arrays, so tens of thousands of dishes take a few megabytes
+    and no text is kept.
+
+    A query adds up, per document, how many of its trigrams the document
+    shares, scores each document by the fraction of the query found
+    (weighted by field), keeps each restaurant's best score and picks the
+    top results with a heap.
+    """
+    def __init__(self):
+        self.built_at = None
+        self._postings = {}
+        self._restaurants = array("I")  # Document -> RestaurantID
+        self._fields = array("B")  # Document -> index into FIELDS
+
+    def __len__(self):
+        return len(self._restaurants)
+
+    def add(self, restaurant_id, field, text):
+        """Index one field of a restaurant or dish."""
+        if not text:
+            return
+        grams = trigrams(text)
+        if not grams:
+            return
+        document = len(self._restaurants)
+        self._restaurants.append(restaurant_id)
+        self._fields.append(FIELDS.index(field))
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[gram] = array("I")
+            postings.append(document)
+
+    def search(self, term, limit=10, min_score=MIN_SCORE):
+        """
+        Find the restaurants that best match a possibly misspelled term.
+
+        Args:
+            term (str): Search text
+            limit (int, optional): Number of restaurants to return
+            min_score (float, optional): Lowest share of the query's
+                trigrams a field must contain
+
+        Returns:
+            list: (score, RestaurantID) pairs, best first
+        """
+        grams = trigrams(term)
+        if not grams:
+            return []
+
+        shared = {}
+        for gram in grams:
+            for document in self._postings.get(gram, ()):
+                shared[document] = shared.get(document, 0) + 1
+
+        best = {}
+        needed = min_score * len(grams)
+        for document, count in shared.items():
+            if count < needed:
+                continue
+            score = count / len(grams) * FIELD_WEIGHTS[FIELDS[self._fields[document]]]
+            restaurant_id = self._restaurants[document]
+            if score > best.get(restaurant_id, 0):
+                best[restaurant_id] = score
+
+        top = heapq.nlargest(limit, best.items(), key=lambda item: item[1])
+        return [(score, restaurant_id) for restaurant_id, score in top]
+
+    def load(self):
+        """
+        Index every open restaurant and available dish (two queries).
+
+        Runs on worker threads, so it never shows UI.
+
+        Returns:
+            TrigramIndex: self, or None if either query failed
+        """
+        restaurants = fetch_in_background("""
+            SELECT RestaurantID, Name, Cuisine
+            FROM Restaurant
+            WHERE IsActive AND DeletedAt IS NULL
+        """)
+        if restaurants is None:
+            return None
+        for restaurant in restaurants:
+            self.add(restaurant["RestaurantID"], "name", restaurant["Name"])
+            self.add(restaurant["RestaurantID"], "cuisine", restaurant["Cuisine"])
+
+        items = fetch_in_background("""
+            SELECT RestaurantID, ItemName, Description
+            FROM Menu
+            WHERE IsActive AND DeletedAt IS NULL
+        """)
+        if items is None:
+            return None
+        for item in items:
+            self.add(item["RestaurantID"], "item", item["ItemName"])
+            self.add(item["RestaurantID"], "description", item["Description"])
+
+        self.built_at = time.monotonic()
+        return self
+
+
+def _rebuild():
+    """Build a fresh index and swap it in; searches keep using the old one meanwhile."""
+    global _index, _rebuilding
+    try:
+        index = TrigramIndex().load()
+        if index is not None:
+            with _index_lock:
+                _index = index
+    finally:
+        with _index_lock:
+            _rebuilding = False
+
+
+def get_fuzzy_index(max_age=REFRESH_INTERVAL):
+    """
+    Return the shared trigram index.
+
+    The first call builds it on the calling (worker) thread. Once it is
+    older than `max_age` seconds it is rebuilt on a background thread and
+    the old index keeps answering until the new one is ready.
+
+    Returns:
+        TrigramIndex: The index, or None if it could not be built yet
+    """
+    global _index, _rebuilding
+    with _index_lock:
+        index = _index
+        stale = index is not None and time.monotonic() - index.built_at >= max_age
+        if stale and not _rebuilding:
+            _rebuilding = True
+            threading.Thread(target=_rebuild, daemon=True).start()
+    if index is not None:
+        return index
+
+    # Nothing to serve yet: build here, one caller at a time
+    with _build_lock:
+        with _index_lock:
+            if _index is not None:
+                return _index
+        index = TrigramIndex().load()
+        if index is not None:
+            with _index_lock:
+                _index = index
+        return index
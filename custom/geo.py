@@ -0,0 +1,205 @@
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+EARTH_RADIUS_KM = 6371.0
+
+# Kilometres per degree of latitude
+KM_PER_DEGREE = 111.32
+
+# Seconds before an address whose lookup raised (network error, rate limit)
+# is tried again. Addresses the geocoder does not know are cached for good.
+FAILURE_TTL = 300.0
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in kilometres."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class Geocoder:
+    """
+    Address to (latitude, longitude) lookup with an in-memory cache.
+
+    Customers and restaurants reuse the same addresses, so after warm-up
+    almost every lookup is a dict hit. The lookup function defaults to
+    tkintermapview's OpenStreetMap geocoder and can be replaced (e.g. with
+    a local geocoding service) by passing `lookup`.
+
+    `geocode_many` resolves a batch of addresses with up to `max_workers`
+    lookups at a time. The public OSM service allows one request at a
+    time, so that is the default unless a custom lookup is given.
+    """
+    def __init__(self, lookup=None, max_workers=None, failure_ttl=FAILURE_TTL):
+        self._lookup = lookup
+        self.max_workers = max_workers or (1 if lookup is None else 8)
+        self.failure_ttl = failure_ttl
+        self._cache = {}  # key -> (coordinates, expires_at or None)
+        self._lock = threading.Lock()
+
+    def _default_lookup(self, address):
+        import tkintermapview
+        return tkintermapview.convert_address_to_coordinates(address)
+
+    @staticmethod
+    def _key(address):
+        return " ".join(address.lower().split())
+
+    def geocode(self, address):
+        """Return (lat, lon) for an address, or None if it cannot be resolved."""
+        if not address:
+            return None
+        key = self._key(address)
+
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                coordinates, expires_at = entry
+                if expires_at is None or time.monotonic() < expires_at:
+                    return coordinates
+                del self._cache[key]
+
+        expires_at = None
+        try:
+            lookup = self._lookup or self._default_lookup
+            result = lookup(address)
+            coordinates = (float(result[0]), float(result[1])) if result else None
+        except Exception as e:
+            print(f"Geocoding failed for '{address}': {e}")
+            coordinates = None
+            # A transient error must not block the address for the rest of the process
+            expires_at = time.monotonic() + self.failure_ttl
+
+        with self._lock:
+            self._cache[key] = (coordinates, expires_at)
+        return coordinates
+
+    def geocode_many(self, addresses):
+        """
+        Resolve several addresses at once.
+
+        Args:
+            addresses (iterable): Addresses, duplicates and blanks allowed
+
+        Returns:
+            dict: {address: (lat, lon) or None}
+        """
+        unique = list(dict.fromkeys(address for address in addresses if address))
+        if self.max_workers > 1 and len(unique) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(unique))) as pool:
+                results = list(pool.map(self.geocode, unique))
+        else:
+            results = [self.geocode(address) for address in unique]
+        return dict(zip(unique, results))
+
+    def prime(self, address, lat, lon):
+        """Seed the cache with known coordinates."""
+        with self._lock:
+            self._cache[self._key(address)] = ((lat, lon), None)
+
+
+class GridIndex:
+    """
+    Uniform grid spatial index for nearest-neighbour queries.
+
+    Points are bucketed into square cells of roughly `cell_size_km`. A
+    nearest query scans rings of cells outward from the query point and
+    stops once no unscanned cell can hold anything closer than the k-th
+    best match found so far.
+    """
+    def __init__(self, cell_size_km=2.0):
+        self.cell_size_km = cell_size_km
+        self.cell_degrees = cell_size_km / KM_PER_DEGREE
+        self._cells = {}
+        self._points = {}
+
+    def __len__(self):
+        return len(self._points)
+
+    def __contains__(self, key):
+        return key in self._points
+
+    def _cell(self, lat, lon):
+        return (int(math.floor(lat / self.cell_degrees)), int(math.floor(lon / self.cell_degrees)))
+
+    def insert(self, key, lat, lon):
+        """Add or move a point."""
+        if key in self._points:
+            self.remove(key)
+        cell = self._cell(lat, lon)
+        self._points[key] = (lat, lon, cell)
+        self._cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key):
+        """Remove a point if present."""
+        point = self._points.pop(key, None)
+        if point is None:
+            return
+        cell = point[2]
+        bucket = self._cells.get(cell)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._cells[cell]
+
+    def position(self, key):
+        """Return (lat, lon) for a key, or None."""
+        point = self._points.get(key)
+        return (point[0], point[1]) if point else None
+
+    def nearest(self, lat, lon, k=5, max_distance_km=None):
+        """
+        Return up to k (distance_km, key) pairs closest to a point.
+
+        Args:
+            lat (float): Query latitude
+            lon (float): Query longitude
+            k (int, optional): Maximum number of results
+            max_distance_km (float, optional): Ignore points further than this
+
+        Returns:
+            list: (distance_km, key) tuples sorted by distance
+        """
+        if not self._points:
+            return []
+
+        center_row, center_col = self._cell(lat, lon)
+        # Longitude cells shrink towards the poles; use the narrower width for the stop test
+        min_cell_km = self.cell_size_km * max(math.cos(math.radians(lat)), 0.01)
+        max_ring = None
+        if max_distance_km is not None:
+            max_ring = int(math.ceil(max_distance_km / min_cell_km)) + 1
+
+        found = []
+        ring = 0
+        while True:
+            for row in range(center_row - ring, center_row + ring + 1):
+                for col in range(center_col - ring, center_col + ring + 1):
+                    # Only the outer edge of the ring is new
+                    if ring and abs(row - center_row) != ring and abs(col - center_col) != ring:
+                        continue
+                    for key in self._cells.get((row, col), ()):
+                        p_lat, p_lon, _ = self._points[key]
+                        distance = haversine_km(lat, lon, p_lat, p_lon)
+                        if max_distance_km is None or distance <= max_distance_km:
+                            found.append((distance, key))
+
+            found.sort()
+            del found[k:]
+
+            # Everything in ring r+1 is at least r cells away from the query point
+            if len(found) >= k and found[-1][0] <= ring * min_cell_km:
+                break
+            if max_ring is not None and ring >= max_ring:
+                break
+            if len(found) == len(self._points):
+                break
+            if max_ring is None and ring * self.cell_degrees > 180:
+                break
+            ring += 1
+
+        return found
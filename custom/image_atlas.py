@@ -0,0 +1,141 @@
+import json
+import mmap
+import os
+import threading
+
+from PIL import Image
+
+from custom.asset_manifest import IMAGE_ROOT, get_asset_manifest
+
+# Folder whose images are packed, and the pixel sizes an atlas is built for
+# (the restaurant card at 1x and 2x)
+ATLAS_FOLDER = os.path.join(IMAGE_ROOT, 'restaurant')
+ATLAS_SIZES = [(300, 180), (600, 360)]
+
+# Tiles are stored as raw RGBA so PIL can wrap the mapped bytes without copying
+ATLAS_MODE = "RGBA"
+
+_atlases = {}
+_atlases_lock = threading.Lock()
+
+
+def atlas_paths(size, folder=ATLAS_FOLDER):
+    """Return the (data, index) file paths of the atlas for one pixel size."""
+    base = os.path.join(folder, f"atlas_{size[0]}x{size[1]}")
+    return base + ".rgba", base + ".json"
+
+
+class ImageAtlas:
+    """
+    Read-only view of a packed image atlas.
+
+    The data file holds every tile back to back as raw pixels and is
+    memory-mapped once; the JSON index maps each source file name to its
+    tile's byte offset. A tile is a PIL image over a slice of the shared
+    mapping, so cards open no files and hold no pixel copies of their own.
+
+    The index also records each source file's mtime and size when it was
+    packed. Those stamps are checked against the folder when the atlas is
+    opened and again whenever the asset manifest sees the folder change; a
+    tile whose source has been replaced is not served, so the caller
+    decodes the new file until the atlas is rebuilt.
+    """
+    def __init__(self, data_path, index_path):
+        with open(index_path) as f:
+            index = json.load(f)
+        self.size = tuple(index["size"])
+        self.offsets = index["tiles"]
+        self.sources = index.get("sources", {})  # File name -> [mtime_ns, size]
+        self.tile_bytes = self.size[0] * self.size[1] * len(ATLAS_MODE)
+        self.folder = os.path.dirname(data_path)
+        self._current = frozenset()  # Source file names unchanged since packing
+
+        with open(data_path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        self.check_sources()
+
+    def __contains__(self, filename):
+        return filename in self.offsets
+
+    def check_sources(self):
+        """Compare every packed source file with its stamp, in one directory scan."""
+        current = set()
+        try:
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    stamp = self.sources.get(entry.name)
+                    if stamp is None:
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    if [stat.st_mtime_ns, stat.st_size] == stamp:
+                        current.add(entry.name)
+        except OSError as e:
+            print(f"Error checking image atlas sources in {self.folder}: {e}")
+        self._current = frozenset(current)
+
+    def is_current(self, filename):
+        """Return True if the source file was unchanged at the last check."""
+        return filename in self._current
+
+    def tile(self, filename, current_only=True):
+        """
+        Return the tile for a source file name as a PIL image, or None.
+
+        Unless `current_only` is False, None is also returned if the source
+        file changed after the atlas was built.
+        """
+        offset = self.offsets.get(filename)
+        if offset is None:
+            return None
+        if current_only and not self.is_current(filename):
+            return None
+        data = self._view[offset:offset + self.tile_bytes]
+        return Image.frombuffer(ATLAS_MODE, self.size, data, "raw", ATLAS_MODE, 0, 1)
+
+
+def get_image_atlas(size, folder=ATLAS_FOLDER):
+    """
+    Return the atlas for one pixel size, opening it on first use.
+
+    Returns:
+        ImageAtlas: The atlas, or None if it has not been built
+    """
+    key = (folder, tuple(size))
+    with _atlases_lock:
+        if key not in _atlases:
+            data_path, index_path = atlas_paths(size, folder)
+            atlas = None
+            manifest = get_asset_manifest()
+            if manifest.exists(data_path) and manifest.exists(index_path):
+                try:
+                    atlas = ImageAtlas(data_path, index_path)
+                except Exception as e:
+                    print(f"Error opening image atlas {data_path}: {e}")
+                else:
+                    # Re-check the stamps only when files in the tree change
+                    manifest.add_listener(atlas.check_sources)
+            _atlases[key] = atlas
+        return _atlases[key]
+
+
+def atlas_tile(path, size):
+    """
+    Look up an image file in the atlas of its folder, if it has one.
+
+    Args:
+        path (str): Image file path
+        size (tuple): Pixel size wanted
+
+    Returns:
+        PIL.Image: The packed tile, or None if it is not in an atlas or the
+                   file was replaced after the atlas was built
+    """
+    folder, filename = os.path.split(os.path.normpath(path))
+    if folder != os.path.normpath(ATLAS_FOLDER) or tuple(size) not in ATLAS_SIZES:
+        return None
+    atlas = get_image_atlas(size)
+    return atlas.tile(filename) if atlas else None
@@ -0,0 +1,145 @@
+import json
+import os
+import re
+
+from PIL import Image
+
+from custom.asset_manifest import IMAGE_ROOT
+from custom.image_atlas import ATLAS_FOLDER, ATLAS_MODE, ATLAS_SIZES, atlas_paths
+from custom.image_loader import decode_image, rendition_path
+
+# Sizes (width, height) each image folder is displayed at
+DISPLAY_SIZES = {
+    "menu": [(100, 100), (80, 80), (60, 60)],
+    "restaurant": [(300, 180), (400, 150)],
+}
+
+# Renditions are written for normal and 2x (HiDPI) displays
+SCALES = (1, 2)
+
+WEBP_QUALITY = 80
+
+SOURCE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+# Files written by this module, e.g. menu_item_2_100x100.webp
+RENDITION_PATTERN = re.compile(r"_\d+x\d+\.webp$")
+
+
+def ingest_image(path, sizes):
+    """
+    Write the WebP renditions of one image that are missing or out of date.
+
+    The source is decoded once (in JPEG draft mode, at the scale the
+    largest rendition needs) and every rendition is resized from it.
+
+    Args:
+        path (str): Source image
+        sizes (list): Display sizes (width, height); each is written at
+            every scale in SCALES
+
+    Returns:
+        list: Paths of the renditions written
+    """
+    targets = []
+    source_mtime = os.path.getmtime(path)
+    for width, height in sizes:
+        for scale in SCALES:
+            size = (width * scale, height * scale)
+            target = rendition_path(path, size)
+            if not os.path.exists(target) or os.path.getmtime(target) < source_mtime:
+                targets.append((size, target))
+    if not targets:
+        return []
+
+    with Image.open(path) as image:
+        if image.format == "JPEG":
+            image.draft("RGB", (max(size[0] for size, _ in targets), max(size[1] for size, _ in targets)))
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+    for size, target in targets:
+        image.resize(size, Image.LANCZOS).save(target, "WEBP", quality=WEBP_QUALITY, method=6)
+    return [target for _, target in targets]
+
+
+def ingest_images(root=IMAGE_ROOT, progress=None):
+    """
+    Bring every image folder's renditions up to date.
+
+    Args:
+        root (str, optional): Directory holding the image folders
+        progress (callable, optional): Called as progress(path, written)
+            for each source image
+
+    Returns:
+        int: Number of renditions written
+    """
+    written = 0
+    for folder, sizes in DISPLAY_SIZES.items():
+        directory = os.path.join(root, folder)
+        if not os.path.isdir(directory):
+            continue
+        for filename in sorted(os.listdir(directory)):
+            if not filename.lower().endswith(SOURCE_EXTENSIONS) or RENDITION_PATTERN.search(filename):
+                continue
+            path = os.path.join(directory, filename)
+            try:
+                paths = ingest_image(path, sizes)
+            except Exception as e:
+                print(f"Error ingesting {path}: {e}")
+                continue
+            written += len(paths)
+            if progress:
+                progress(path, len(paths))
+    return written
+
+
+def build_atlas(size, folder=ATLAS_FOLDER):
+    """
+    Pack every image in a folder into one raw atlas file plus a JSON index.
+
+    Both files are written to temporary names and swapped in, so a running
+    app never sees a half-written atlas.
+
+    Args:
+        size (tuple): Tile size in pixels
+        folder (str, optional): Folder whose images are packed
+
+    Returns:
+        int: Number of tiles packed
+    """
+    data_path, index_path = atlas_paths(size, folder)
+    offsets = {}
+    sources = {}
+    offset = 0
+    with open(data_path + ".tmp", "wb") as f:
+        for filename in sorted(os.listdir(folder)):
+            if not filename.lower().endswith(SOURCE_EXTENSIONS) or RENDITION_PATTERN.search(filename):
+                continue
+            source = os.path.join(folder, filename)
+            try:
+                # Stat before decoding so a file replaced mid-build reads as stale
+                stat = os.stat(source)
+                tile = decode_image(source, size).convert(ATLAS_MODE)
+            except Exception as e:
+                print(f"Error packing {filename}: {e}")
+                continue
+            data = tile.tobytes()
+            f.write(data)
+            offsets[filename] = offset
+            sources[filename] = [stat.st_mtime_ns, stat.st_size]
+            offset += len(data)
+
+    if not offsets:
+        os.remove(data_path + ".tmp")
+        return 0
+
+    with open(index_path + ".tmp", "w") as f:
+        json.dump({"size": list(size), "tiles": offsets, "sources": sources}, f)
+    os.replace(data_path + ".tmp", data_path)
+    os.replace(index_path + ".tmp", index_path)
+    return len(offsets)
+
+
+def build_atlases():
+    """Rebuild the atlas for every size in ATLAS_SIZES. Returns the tiles packed."""
+    return sum(build_atlas(size) for size in ATLAS_SIZES)
@@ -0,0 +1,190 @@
+import itertools
+import os
+import queue
+import threading
+from collections import OrderedDict
+
+import customtkinter as ctk
+from PIL import Image
+
+from custom.asset_manifest import get_asset_manifest
+from custom.image_atlas import atlas_tile
+
+# Background threads decoding images
+WORKER_COUNT = 2
+
+# Decoded images kept in memory, keyed by (path, pixel size)
+MAX_CACHED_IMAGES = 256
+
+# Milliseconds between checks for finished images on the Tk thread
+DRAIN_INTERVAL_MS = 30
+
+_loader = None
+_loader_lock = threading.Lock()
+
+
+def rendition_path(path, size):
+    """Return where the ingest step stores `path` resized to `size` pixels."""
+    return f"{os.path.splitext(path)[0]}_{size[0]}x{size[1]}.webp"
+
+
+def decode_image(path, size):
+    """
+    Open an image file at `size` (width, height) pixels.
+
+    A pre-sized rendition written by the ingest step is used when there is
+    one. Otherwise JPEGs are decoded in draft mode, which lets libjpeg scale
+    by 1/2, 1/4 or 1/8 during decoding (the smallest reduction still at
+    least `size`), so a camera photo shown as a thumbnail is never expanded
+    to full resolution in memory.
+    """
+    rendition = rendition_path(path, size)
+    if get_asset_manifest().exists(rendition):
+        path = rendition
+
+    with Image.open(path) as image:
+        if image.format == "JPEG":
+            image.draft("RGB", size)
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    if image.size != size:
+        image = image.resize(size, Image.LANCZOS)
+    return image
+
+
+def pixel_size(widget, size):
+    """Scale a display size by the widget window's scaling factor (at most 2x)."""
+    try:
+        scale = ctk.ScalingTracker.get_window_scaling(widget.winfo_toplevel())
+    except Exception:
+        scale = 1
+    scale = min(max(scale, 1), 2)
+    return (round(size[0] * scale), round(size[1] * scale))
+
+
+class ImageLoader:
+    """
+    Decodes and resizes images on background threads.
+
+    `load` returns straight away: with a CTkImage if the image is packed in
+    an atlas or already cached, otherwise with None after queueing the file. Worker threads
+    only touch PIL; the CTkImage is built on the Tk thread, which picks up
+    finished images from a queue with `after` and hands them to the
+    caller's callback.
+
+    Requests are served newest batch first and, within a batch, in
+    priority order, so a grid that is being rebuilt decodes its top rows
+    (the visible ones) before anything else.
+    """
+    def __init__(self, workers=WORKER_COUNT, max_cached=MAX_CACHED_IMAGES):
+        self.workers = workers
+        self.max_cached = max_cached
+        self._jobs = queue.PriorityQueue()
+        self._results = queue.Queue()
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._order = itertools.count()
+        self._batch = 0
+        self._threads = []
+        self._outstanding = 0  # Only touched on the Tk thread
+        self._drain_widget = None
+
+    def new_batch(self):
+        """Start a new batch; its requests are decoded before older ones."""
+        self._batch += 1
+
+    def cached(self, path, size):
+        """Return the decoded PIL image if it is cached, else None."""
+        with self._lock:
+            image = self._cache.get((path, size))
+            if image is not None:
+                self._cache.move_to_end((path, size))
+            return image
+
+    def load(self, widget, path, size, on_ready, priority=0):
+        """
+        Get an image for a widget without blocking.
+
+        Args:
+            widget: Widget the image is for; the callback is skipped if it
+                has been destroyed by the time the image is ready
+            path (str): Image file
+            size (tuple): Display size (width, height)
+            on_ready (callable): Called on the Tk thread with the CTkImage,
+                or with None if the file could not be decoded
+            priority (int, optional): Lower numbers are decoded first
+
+        Returns:
+            CTkImage: The image if it was in an atlas or cached (on_ready
+                      is not called), otherwise None
+        """
+        # Decode at the size the image is drawn at on this display, so
+        # CTkImage does not have to resample it again
+        pixels = pixel_size(widget, size)
+        image = atlas_tile(path, pixels)
+        if image is None:
+            image = self.cached(path, pixels)
+        if image is not None:
+            return ctk.CTkImage(light_image=image, size=size)
+
+        self._start_workers()
+        self._jobs.put(((-self._batch, priority, next(self._order)), path, size, pixels, widget, on_ready))
+        self._outstanding += 1
+        if self._drain_widget is None:
+            self._drain_widget = widget.winfo_toplevel()
+            self._drain_widget.after(DRAIN_INTERVAL_MS, self._drain)
+        return None
+
+    def _start_workers(self):
+        if self._threads:
+            return
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            _, path, size, pixels, widget, on_ready = self._jobs.get()
+            image = self.cached(path, pixels)
+            if image is None:
+                try:
+                    image = decode_image(path, pixels)
+                    self._store((path, pixels), image)
+                except Exception as e:
+                    print(f"Error loading image {path}: {e}")
+            self._results.put((widget, size, image, on_ready))
+
+    def _store(self, key, image):
+        with self._lock:
+            self._cache[key] = image
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+
+    def _drain(self):
+        """Hand finished images to their callbacks (Tk thread)."""
+        while True:
+            try:
+                widget, size, image, on_ready = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._outstanding -= 1
+            try:
+                if widget.winfo_exists():
+                    on_ready(ctk.CTkImage(light_image=image, size=size) if image is not None else None)
+            except Exception as e:
+                print(f"Error showing image: {e}")
+
+        drain_widget = self._drain_widget
+        if self._outstanding > 0 and drain_widget.winfo_exists():
+            drain_widget.after(DRAIN_INTERVAL_MS, self._drain)
+        else:
+            self._drain_widget = None
+
+
+def get_image_loader():
+    """Return the process-wide image loader."""
+    global _loader
+    with _loader_lock:
+        if _loader is None:
+            _loader = ImageLoader()
+        return _loader
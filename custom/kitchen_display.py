@@ -0,0 +1,332 @@
+import heapq
+from datetime import datetime, timedelta
+
+import customtkinter as ctk
+from CTkMessagebox import CTkMessagebox
+
+from custom.order_feed import OrderFeedPoller, current_event_id
+from custom.order_lifecycle import (
+    KITCHEN_STATUSES, ORDER_TRANSITIONS, PROMISED_PREP_MINUTES, STATUS_COLORS, change_order_status
+)
+from utils import connect_to_database
+
+# Tickets shown per column; anything beyond is summarised as "+N more"
+TICKETS_PER_COLUMN = 8
+
+# Milliseconds between redraws of the countdowns
+CLOCK_INTERVAL_MS = 30000
+
+# Column headings and the button that moves a ticket on
+COLUMN_TITLES = {"pending": "New", "preparing": "Preparing"}
+ADVANCE_LABELS = {"pending": "Start", "preparing": "Ready"}
+
+
+def fetch_active_orders(cursor, restaurant_id, order_ids=None):
+    """
+    Read a restaurant's open kitchen orders with their items in two queries.
+
+    Args:
+        cursor: Open dictionary cursor
+        restaurant_id (int): Restaurant to load
+        order_ids (list, optional): Only load these orders
+
+    Returns:
+        list: Order dicts with OrderID, OrderDate, OrderStatus and Items
+    """
+    params = [restaurant_id] + list(KITCHEN_STATUSES)
+    id_filter = ""
+    if order_ids:
+        id_filter = f"AND OrderID IN ({', '.join(['%s'] * len(order_ids))})"
+        params.extend(order_ids)
+
+    # Served by idx_order_restaurant_status (RestaurantID, OrderStatus, OrderDate)
+    cursor.execute(f"""
+        SELECT OrderID, OrderDate, OrderStatus
+        FROM `Order`
+        WHERE RestaurantID = %s
+            AND OrderStatus IN ({', '.join(['%s'] * len(KITCHEN_STATUSES))})
+            {id_filter}
+    """, tuple(params))
+    orders = cursor.fetchall()
+    if not orders:
+        return []
+
+    by_id = {order["OrderID"]: order for order in orders}
+    for order in orders:
+        order["Items"] = []
+
+    cursor.execute(f"""
+        SELECT oi.OrderID, oi.Quantity, m.ItemName
+        FROM OrderItem oi
+        JOIN Menu m ON oi.MenuID = m.MenuID
+        WHERE oi.OrderID IN ({', '.join(['%s'] * len(by_id))})
+    """, tuple(by_id))
+    for item in cursor.fetchall():
+        by_id[item["OrderID"]]["Items"].append(item)
+
+    return orders
+
+
+def load_active_orders(restaurant_id):
+    """Load a restaurant's open kitchen orders over a connection of their own."""
+    conn = connect_to_database()
+    if not conn:
+        return []
+    try:
+        cursor = conn.cursor(dictionary=True)
+        orders = fetch_active_orders(cursor, restaurant_id)
+        cursor.close()
+        return orders
+    except Exception as e:
+        print(f"Error loading kitchen orders: {e}")
+        return []
+    finally:
+        if conn.is_connected():
+            conn.close()
+
+
+class KitchenQueue:
+    """
+    Open orders grouped by status, each group a heap ordered by promised
+    ready time.
+
+    Moving or finishing an order marks its heap entry stale instead of
+    searching the heap; stale entries are skipped on read and the heap is
+    rebuilt once they outnumber live ones, so memory stays proportional to
+    the number of open orders however long the queue runs.
+    """
+    def __init__(self, prep_minutes=PROMISED_PREP_MINUTES):
+        self.prep_minutes = prep_minutes
+        self.orders = {}  # OrderID -> order dict
+        self._heaps = {status: [] for status in KITCHEN_STATUSES}
+        self._entries = {}  # OrderID -> live heap entry
+        self._stale = {status: 0 for status in KITCHEN_STATUSES}
+
+    def __len__(self):
+        return len(self.orders)
+
+    def __contains__(self, order_id):
+        return order_id in self.orders
+
+    def add(self, order):
+        """Add an order, or replace it if it is already queued."""
+        order_id = order["OrderID"]
+        self.remove(order_id)
+        if order["OrderStatus"] not in self._heaps:
+            return
+
+        order["ReadyAt"] = order["OrderDate"] + timedelta(minutes=self.prep_minutes)
+        entry = [order["ReadyAt"], order_id, order["OrderStatus"], True]
+        heapq.heappush(self._heaps[order["OrderStatus"]], entry)
+        self._entries[order_id] = entry
+        self.orders[order_id] = order
+
+    def remove(self, order_id):
+        """Drop an order from the queue if present."""
+        entry = self._entries.pop(order_id, None)
+        if entry is None:
+            return
+        self.orders.pop(order_id, None)
+        entry[3] = False
+        status = entry[2]
+        self._stale[status] += 1
+        if self._stale[status] > len(self._heaps[status]) // 2:
+            self._heaps[status] = [e for e in self._heaps[status] if e[3]]
+            heapq.heapify(self._heaps[status])
+            self._stale[status] = 0
+
+    def set_status(self, order_id, status):
+        """
+        Move a queued order to a new status.
+
+        Returns:
+            bool: False if the order is not queued (it has to be loaded)
+        """
+        order = self.orders.get(order_id)
+        if order is None:
+            return False
+        order["OrderStatus"] = status
+        self.add(order)
+        return True
+
+    def count(self, status):
+        """Number of queued orders with a status."""
+        return len(self._heaps[status]) - self._stale[status]
+
+    def first(self, status, n):
+        """Return the n orders with a status that are due soonest."""
+        live = (entry for entry in self._heaps[status] if entry[3])
+        return [self.orders[entry[1]] for entry in heapq.nsmallest(n, live)]
+
+
+class KitchenDisplay(ctk.CTkToplevel):
+    """
+    Full-screen queue of a restaurant's open orders for the kitchen.
+
+    Every ticket widget is created once up front and reconfigured on each
+    redraw, so running all shift does not accumulate widgets. Changes
+    arrive through the order feed; press Escape to close.
+    """
+    def __init__(self, master, restaurant_id, restaurant_name="Kitchen"):
+        super().__init__(master)
+        self.restaurant_id = restaurant_id
+        self.queue = KitchenQueue()
+        self.title(f"{restaurant_name} - Kitchen Display")
+        self.configure(fg_color="#1E1E1E")
+        self.attributes("-fullscreen", True)
+        self.bind("<Escape>", lambda event: self.close())
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+        header = ctk.CTkFrame(self, fg_color="transparent")
+        header.pack(fill="x", padx=20, pady=(15, 5))
+        ctk.CTkLabel(
+            header,
+            text=restaurant_name,
+            font=("Arial", 28, "bold"),
+            text_color="white"
+        ).pack(side="left")
+        self.clock_label = ctk.CTkLabel(header, text="", font=("Arial", 24), text_color="#CCCCCC")
+        self.clock_label.pack(side="right")
+
+        columns = ctk.CTkFrame(self, fg_color="transparent")
+        columns.pack(fill="both", expand=True, padx=10, pady=10)
+
+        self.columns = {}
+        columns.rowconfigure(0, weight=1)
+        for index, status in enumerate(KITCHEN_STATUSES):
+            columns.columnconfigure(index, weight=1, uniform="kitchen_col")
+            column = ctk.CTkFrame(columns, fg_color="#2A2A2A", corner_radius=10)
+            column.grid(row=0, column=index, sticky="nsew", padx=10)
+
+            title = ctk.CTkLabel(
+                column,
+                text=COLUMN_TITLES[status],
+                font=("Arial", 22, "bold"),
+                text_color=STATUS_COLORS[status]
+            )
+            title.pack(pady=(10, 5))
+
+            tickets = [self.create_ticket(column, status) for _ in range(TICKETS_PER_COLUMN)]
+            overflow = ctk.CTkLabel(column, text="", font=("Arial", 16), text_color="#CCCCCC")
+            overflow.pack(pady=5)
+            self.columns[status] = {"title": title, "tickets": tickets, "overflow": overflow}
+
+        since_event_id = current_event_id("restaurant", restaurant_id)
+        for order in load_active_orders(restaurant_id):
+            self.queue.add(order)
+        self.redraw()
+
+        self.feed = OrderFeedPoller(
+            self, "restaurant", restaurant_id, self.apply_order_changes,
+            fetch_rows=self.fetch_missing_orders, min_interval=2.0
+        )
+        self.feed.start(since_event_id)
+        self.after(CLOCK_INTERVAL_MS, self.tick)
+
+    def create_ticket(self, column, status):
+        """Create one reusable ticket slot (hidden until filled)."""
+        frame = ctk.CTkFrame(column, fg_color="#3A3A3A", corner_radius=8)
+        top = ctk.CTkFrame(frame, fg_color="transparent")
+        top.pack(fill="x", padx=10, pady=(8, 0))
+        order_label = ctk.CTkLabel(top, text="", font=("Arial", 18, "bold"), text_color="white")
+        order_label.pack(side="left")
+        due_label = ctk.CTkLabel(top, text="", font=("Arial", 16, "bold"))
+        due_label.pack(side="right")
+        items_label = ctk.CTkLabel(
+            frame, text="", font=("Arial", 15), text_color="#DDDDDD", justify="left", anchor="w"
+        )
+        items_label.pack(fill="x", padx=10, pady=4)
+        button = ctk.CTkButton(frame, text=ADVANCE_LABELS[status], height=32)
+        button.pack(fill="x", padx=10, pady=(0, 8))
+        return {
+            "frame": frame,
+            "order_label": order_label,
+            "due_label": due_label,
+            "items_label": items_label,
+            "button": button,
+            "visible": False
+        }
+
+    def redraw(self):
+        """Fill the ticket slots from the queue."""
+        now = datetime.now()
+        self.clock_label.configure(text=now.strftime("%H:%M"))
+
+        for status, column in self.columns.items():
+            orders = self.queue.first(status, TICKETS_PER_COLUMN)
+            column["title"].configure(text=f"{COLUMN_TITLES[status]} ({self.queue.count(status)})")
+
+            for slot, ticket in enumerate(column["tickets"]):
+                if slot >= len(orders):
+                    if ticket["visible"]:
+                        ticket["frame"].pack_forget()
+                        ticket["visible"] = False
+                    continue
+
+                order = orders[slot]
+                minutes_left = int((order["ReadyAt"] - now).total_seconds() // 60)
+                ticket["order_label"].configure(text=f"#{order['OrderID']}")
+                ticket["due_label"].configure(
+                    text=f"{minutes_left} min" if minutes_left >= 0 else f"{-minutes_left} min late",
+                    text_color="#F44336" if minutes_left < 0 else "#4CAF50"
+                )
+                ticket["items_label"].configure(
+                    text="\n".join(f"{item['Quantity']} x {item['ItemName']}" for item in order["Items"])
+                )
+                ticket["button"].configure(
+                    command=lambda o_id=order["OrderID"], current=status: self.advance(o_id, current)
+                )
+                if not ticket["visible"]:
+                    ticket["frame"].pack(fill="x", padx=10, pady=5, before=column["overflow"])
+                    ticket["visible"] = True
+
+            hidden = self.queue.count(status) - len(orders)
+            column["overflow"].configure(text=f"+{hidden} more" if hidden > 0 else "")
+
+    def fetch_missing_orders(self, cursor, changes):
+        """Read the open orders the queue does not hold yet (runs on the feed's thread)."""
+        missing = [
+            order_id for order_id, status in changes.items()
+            if status in KITCHEN_STATUSES and order_id not in self.queue
+        ]
+        if not missing:
+            return {}
+        return {order["OrderID"]: order for order in fetch_active_orders(cursor, self.restaurant_id, missing)}
+
+    def apply_order_changes(self, changes, rows=None):
+        """Update the queue from order feed changes and redraw once."""
+        rows = rows or {}
+        for order_id, status in changes.items():
+            if status not in KITCHEN_STATUSES:
+                self.queue.remove(order_id)
+            elif not self.queue.set_status(order_id, status) and order_id in rows:
+                # Fetched by the feed; a later event may have moved it on since
+                rows[order_id]["OrderStatus"] = status
+                self.queue.add(rows[order_id])
+        self.redraw()
+
+    def advance(self, order_id, current_status):
+        """Move an order to its next kitchen step."""
+        new_status = ORDER_TRANSITIONS[current_status][0]
+        success, status = change_order_status(order_id, current_status, new_status)
+        if not success and status == current_status:
+            CTkMessagebox(
+                title="Database Error",
+                message="Failed to update order status.",
+                icon="cancel",
+                option_1="OK"
+            )
+            return
+        self.apply_order_changes({order_id: status})
+
+    def tick(self):
+        """Refresh countdowns periodically."""
+        if not self.winfo_exists():
+            return
+        self.redraw()
+        self.after(CLOCK_INTERVAL_MS, self.tick)
+
+    def close(self):
+        """Stop following the feed and close the window."""
+        self.feed.stop()
+        self.destroy()
@@ -0,0 +1,122 @@
+import importlib
+import subprocess
+import sys
+import threading
+
+# Heavy libraries that are only needed once an admin opens the reports screen
+CHART_MODULES = [
+    "matplotlib.figure",
+    "matplotlib.backends.backend_tkagg",
+    "matplotlib.pyplot",
+]
+
+# Libraries only needed when exporting PDF reports
+REPORT_MODULES = [
+    "pandas",
+    "reportlab.platypus",
+    "matplotlib.backends.backend_pdf",
+]
+
+# Modules on the path to the landing page, profiled by `main.py --profile-imports`
+STARTUP_MODULES = [
+    "customtkinter",
+    "PIL.Image",
+    "bcrypt",
+    "mysql.connector",
+    "CTkMessagebox",
+]
+
+
+def import_modules(modules):
+    """
+    Import the given modules, ignoring any that are not installed.
+
+    Args:
+        modules (list): Dotted module names to import
+
+    Returns:
+        list: Names of the modules that were imported successfully
+    """
+    loaded = []
+    for module_name in modules:
+        try:
+            importlib.import_module(module_name)
+            loaded.append(module_name)
+        except Exception as e:
+            print(f"Could not prewarm {module_name}: {e}")
+    return loaded
+
+
+def prewarm_modules(widget, modules, delay_ms=1500):
+    """
+    Import heavy modules in the background once the UI has gone idle.
+
+    The import runs on a daemon thread so the Tk event loop keeps handling
+    input while the modules load. Later local imports then hit sys.modules.
+
+    Args:
+        widget: Any Tk widget, used to schedule the prewarm
+        modules (list): Dotted module names to import
+        delay_ms (int, optional): Delay before the prewarm starts
+    """
+    pending = [name for name in modules if name not in sys.modules]
+    if not pending:
+        return
+
+    def start():
+        thread = threading.Thread(target=import_modules, args=(pending,), daemon=True)
+        thread.start()
+
+    widget.after(delay_ms, lambda: widget.after_idle(start))
+
+
+def profile_imports(modules):
+    """
+    Measure the cold import cost of each module in a fresh interpreter.
+
+    Uses `python -X importtime` so that every module is timed without
+    anything already cached in sys.modules.
+
+    Args:
+        modules (list): Dotted module names to profile
+
+    Returns:
+        list: (module_name, milliseconds) tuples, slowest first; modules
+              that fail to import are reported with a time of None
+    """
+    results = []
+    for module_name in modules:
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+            capture_output=True,
+            text=True
+        )
+        if proc.returncode != 0:
+            results.append((module_name, None))
+            continue
+
+        # Each line is "import time: self [us] | cumulative | imported package"
+        total_us = 0
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:"):
+                continue
+            parts = line.split("|")
+            if len(parts) < 3 or parts[2].strip() != module_name:
+                continue
+            try:
+                total_us = int(parts[1].strip())
+            except ValueError:
+                pass
+        results.append((module_name, total_us / 1000.0))
+
+    results.sort(key=lambda item: -1 if item[1] is None else item[1], reverse=True)
+    return results
+
+
+def print_import_profile(modules):
+    """Print a per-module import cost table to stdout."""
+    print(f"{'Module':<40} {'Import time':>12}")
+    print("-" * 53)
+    for module_name, ms in profile_imports(modules):
+        cost = "not installed" if ms is None else f"{ms:.1f} ms"
+        print(f"{module_name:<40} {cost:>12}")
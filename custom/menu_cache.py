@@ -0,0 +1,174 @@
+import threading
+from collections import OrderedDict
+
+from utils import execute_query
+
+# Restaurants whose menus are kept in memory at once
+MAX_CACHED_MENUS = 64
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _row_version(row):
+    return row.get("UpdatedAt") or row.get("CreatedAt")
+
+
+class MenuSnapshot:
+    """A restaurant row and its menu as loaded at one version."""
+    def __init__(self, restaurant, items):
+        self.restaurant = restaurant
+        self.items = items
+        self.items_by_id = {item["MenuID"]: item for item in items}
+        self.version = self.compute_version(restaurant, items)
+
+    @staticmethod
+    def compute_version(restaurant, items):
+        """
+        Build the same tuple the version probe returns.
+
+        Inserts change the count and highest MenuID, deletes change the
+        count, and updates move the newest UpdatedAt.
+        """
+        return (
+            _row_version(restaurant),
+            len(items),
+            max((item["MenuID"] for item in items), default=None),
+            max((_row_version(item) for item in items), default=None)
+        )
+
+    def item(self, menu_id):
+        """Return a menu item by MenuID, or None."""
+        return self.items_by_id.get(menu_id)
+
+
+class MenuCache:
+    """
+    Bounded LRU of per-restaurant menu snapshots.
+
+    Opening a cached restaurant costs one aggregate probe, answered from
+    the (RestaurantID, UpdatedAt, CreatedAt) index; the restaurant and menu
+    are only re-read when the probe shows a change. MenuID lookups made at
+    cart and checkout time are served from the cached snapshots.
+    """
+    def __init__(self, max_restaurants=MAX_CACHED_MENUS):
+        self.max_restaurants = max_restaurants
+        self._snapshots = OrderedDict()  # RestaurantID -> MenuSnapshot
+        self._menu_owner = {}  # MenuID -> RestaurantID for cached snapshots
+        self._lock = threading.Lock()
+
+    def probe(self, restaurant_id):
+        """Return the current version tuple of a restaurant's menu, or None if it is gone."""
+        result = execute_query("""
+            SELECT COALESCE(r.UpdatedAt, r.CreatedAt) AS RestaurantVersion,
+                   COUNT(m.MenuID) AS ItemCount,
+                   MAX(m.MenuID) AS MaxMenuID,
+                   MAX(COALESCE(m.UpdatedAt, m.CreatedAt)) AS MenuVersion
+            FROM Restaurant r
+            LEFT JOIN Menu m ON m.RestaurantID = r.RestaurantID
+            WHERE r.RestaurantID = %s
+            GROUP BY r.RestaurantID
+        """, (restaurant_id,), fetch=True)
+        if not result:
+            return None
+        row = result[0]
+        return (row["RestaurantVersion"], row["ItemCount"], row["MaxMenuID"], row["MenuVersion"])
+
+    def load(self, restaurant_id):
+        """Read a restaurant and its menu from the database."""
+        restaurant = execute_query("SELECT * FROM Restaurant WHERE RestaurantID = %s", (restaurant_id,), fetch=True)
+        if not restaurant:
+            return None
+        items = execute_query("SELECT * FROM Menu WHERE RestaurantID = %s", (restaurant_id,), fetch=True) or []
+        return MenuSnapshot(restaurant[0], items)
+
+    def get(self, restaurant_id, validate=True):
+        """
+        Return a current snapshot of a restaurant's menu.
+
+        Args:
+            restaurant_id (int): Restaurant to look up
+            validate (bool, optional): Probe the database before trusting
+                a cached snapshot
+
+        Returns:
+            MenuSnapshot: The snapshot, or None if the restaurant does not exist
+        """
+        with self._lock:
+            snapshot = self._snapshots.get(restaurant_id)
+
+        if snapshot is not None and validate:
+            version = self.probe(restaurant_id)
+            if version != snapshot.version:
+                snapshot = None
+
+        if snapshot is None:
+            snapshot = self.load(restaurant_id)
+            if snapshot is None:
+                self.invalidate(restaurant_id)
+                return None
+            self._store(restaurant_id, snapshot)
+        else:
+            with self._lock:
+                if restaurant_id in self._snapshots:
+                    self._snapshots.move_to_end(restaurant_id)
+
+        return snapshot
+
+    def _store(self, restaurant_id, snapshot):
+        with self._lock:
+            self._drop(restaurant_id)
+            self._snapshots[restaurant_id] = snapshot
+            for menu_id in snapshot.items_by_id:
+                self._menu_owner[menu_id] = restaurant_id
+            while len(self._snapshots) > self.max_restaurants:
+                self._drop(next(iter(self._snapshots)))
+
+    def _drop(self, restaurant_id):
+        # Caller holds the lock
+        snapshot = self._snapshots.pop(restaurant_id, None)
+        if snapshot:
+            for menu_id in snapshot.items_by_id:
+                if self._menu_owner.get(menu_id) == restaurant_id:
+                    del self._menu_owner[menu_id]
+
+    def invalidate(self, restaurant_id):
+        """Forget a restaurant's snapshot (e.g. after editing its menu)."""
+        with self._lock:
+            self._drop(restaurant_id)
+
+    def restaurant_id_for(self, menu_id):
+        """Return the RestaurantID a menu item belongs to."""
+        with self._lock:
+            restaurant_id = self._menu_owner.get(menu_id)
+        if restaurant_id is not None:
+            return restaurant_id
+
+        result = execute_query("SELECT RestaurantID FROM Menu WHERE MenuID = %s", (menu_id,), fetch=True)
+        return result[0]["RestaurantID"] if result else None
+
+    def menu_item(self, menu_id, validate=False):
+        """
+        Return a menu item by MenuID from its restaurant's snapshot.
+
+        Args:
+            menu_id (int): Item to look up
+            validate (bool, optional): Probe for menu changes first
+
+        Returns:
+            dict: The Menu row, or None if it does not exist
+        """
+        restaurant_id = self.restaurant_id_for(menu_id)
+        if restaurant_id is None:
+            return None
+        snapshot = self.get(restaurant_id, validate=validate)
+        return snapshot.item(menu_id) if snapshot else None
+
+
+def get_menu_cache():
+    """Return the process-wide menu cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = MenuCache()
+        return _cache
@@ -0,0 +1,331 @@
+import queue
+import random
+import threading
+from tkinter import TclError
+
+import mysql.connector
+
+from config import Config
+from utils import execute_query
+
+# Seconds between polls while orders are changing, and the ceiling the
+# interval backs off to while nothing happens
+MIN_POLL_INTERVAL = 3.0
+MAX_POLL_INTERVAL = 30.0
+
+# Events read per poll; a client that falls further behind catches up over several polls
+MAX_EVENTS_PER_POLL = 500
+
+# EventIDs are handed out when the row is inserted but only become visible
+# when its transaction commits, so an event can show up below an ID that was
+# already read. Each poll re-reads this many IDs below the cursor to catch it.
+EVENT_LOOKBACK = 1000
+
+# Milliseconds between checks of the poller's queue on the Tk thread
+DRAIN_INTERVAL_MS = 250
+
+# OrderEvent column each kind of screen follows
+FEED_SCOPES = {
+    "user": "UserID",
+    "restaurant": "RestaurantID",
+}
+
+# One autocommit connection shared by every poller in the process; a poll
+# holds the lock for as long as it uses it
+_connection = None
+_connection_lock = threading.Lock()
+_connection_users = 0
+
+
+def record_order_event(cursor, order_id):
+    """
+    Append the order's current status to the OrderEvent log.
+
+    Call this on the same cursor and in the same transaction as the insert
+    or update that changed the order, so the event commits with it.
+
+    Args:
+        cursor: Open database cursor
+        order_id (int): Order that was created or changed
+    """
+    record_order_events(cursor, [order_id])
+
+
+def record_order_events(cursor, order_ids):
+    """Append the current status of several orders to the OrderEvent log in one statement."""
+    if not order_ids:
+        return
+    placeholders = ", ".join(["%s"] * len(order_ids))
+    cursor.execute(f"""
+        INSERT INTO OrderEvent (OrderID, UserID, RestaurantID, OrderStatus)
+        SELECT OrderID, UserID, RestaurantID, OrderStatus
+        FROM `Order`
+        WHERE OrderID IN ({placeholders})
+        ORDER BY OrderID
+    """, tuple(order_ids))
+
+
+def latest_event_id(cursor, scope, scope_id):
+    """Return the newest EventID visible to a user or restaurant, or 0."""
+    column = FEED_SCOPES[scope]
+    cursor.execute(f"SELECT MAX(EventID) FROM OrderEvent WHERE {column} = %s", (scope_id,))
+    row = cursor.fetchone()
+    return (row[0] or 0) if row else 0
+
+
+def current_event_id(scope, scope_id):
+    """
+    Return the newest EventID for a user or restaurant.
+
+    Read this before loading a screen's orders and pass it to
+    OrderFeedPoller.start so no change between the two is missed.
+    """
+    column = FEED_SCOPES[scope]
+    result = execute_query(
+        f"SELECT MAX(EventID) AS EventID FROM OrderEvent WHERE {column} = %s", (scope_id,), fetch=True
+    )
+    return (result[0]["EventID"] or 0) if result else 0
+
+
+def fetch_order_changes(cursor, scope, scope_id, since_event_id, applied=None, limit=MAX_EVENTS_PER_POLL):
+    """
+    Return order status changes after an event ID.
+
+    Uses the (scope column, EventID) index, so an idle poll reads only the
+    few rows in the look-back window.
+
+    Args:
+        cursor: Open database cursor
+        scope (str): "user" or "restaurant"
+        scope_id (int): UserID or RestaurantID
+        since_event_id (int): Last event already read
+        applied (dict, optional): {OrderID: EventID} of the newest event
+            applied per order. When given, events up to EVENT_LOOKBACK below
+            since_event_id are read again so late commits are not missed;
+            events at or below the one already applied for their order are
+            skipped, and the dict is updated in place.
+        limit (int, optional): Maximum new events to read
+
+    Returns:
+        tuple: (changes, last_event_id) where changes maps OrderID to its
+               newest OrderStatus
+    """
+    column = FEED_SCOPES[scope]
+    if applied is None:
+        floor, row_limit = since_event_id, limit
+    else:
+        floor, row_limit = max(since_event_id - EVENT_LOOKBACK, 0), limit + EVENT_LOOKBACK
+    cursor.execute(f"""
+        SELECT EventID, OrderID, OrderStatus
+        FROM OrderEvent
+        WHERE {column} = %s AND EventID > %s
+        ORDER BY EventID
+        LIMIT %s
+    """, (scope_id, floor, row_limit))
+
+    changes = {}
+    last_event_id = since_event_id
+    for event_id, order_id, status in cursor.fetchall():
+        last_event_id = max(last_event_id, event_id)
+        if applied is not None:
+            if event_id <= applied.get(order_id, 0):
+                continue
+            applied[order_id] = event_id
+        # Later events for the same order replace earlier ones
+        changes[order_id] = status
+
+    if applied is not None:
+        # Orders whose last event fell out of the window can only see newer IDs
+        cutoff = last_event_id - EVENT_LOOKBACK
+        for order_id in [oid for oid, eid in applied.items() if eid <= cutoff]:
+            del applied[order_id]
+    return changes, last_event_id
+
+
+def _feed_connection():
+    """Return the shared poller connection, reconnecting if needed. Call with _connection_lock held."""
+    global _connection
+    if _connection is None or not _connection.is_connected():
+        # Autocommit so every poll sees a fresh snapshot rather than the
+        # one from the first read on this connection
+        try:
+            _connection = mysql.connector.connect(
+                host=Config.db_host,
+                user=Config.user,
+                password=Config.password,
+                database=Config.database,
+                autocommit=True
+            )
+        except mysql.connector.Error as e:
+            print(f"Order feed connection failed: {e}")
+            _connection = None
+    return _connection
+
+
+def _acquire_connection():
+    global _connection_users
+    with _connection_lock:
+        _connection_users += 1
+
+
+def _release_connection():
+    """Close the shared connection once its last poller has stopped."""
+    global _connection, _connection_users
+    with _connection_lock:
+        _connection_users -= 1
+        if _connection_users == 0 and _connection is not None:
+            if _connection.is_connected():
+                _connection.close()
+            _connection = None
+
+
+class OrderFeedPoller:
+    """
+    Follows the OrderEvent log for one user or restaurant.
+
+    A background thread polls over a long-lived connection, shared with
+    every other poller in the process, and puts each batch of changes on
+    a queue. The Tk thread drains the queue with
+    `after` and calls `on_changes(changes)` with an {OrderID: OrderStatus}
+    dict, so screens can patch the affected orders instead of reloading.
+
+    Screens that need rows for orders they are not showing yet pass
+    `fetch_rows(cursor, changes)`. It runs on the polling thread with a
+    dictionary cursor and returns {OrderID: row}; `on_changes(changes, rows)`
+    then receives those rows, so the Tk thread never queries.
+
+    The interval doubles up to MAX_POLL_INTERVAL while nothing changes and
+    every wait is jittered, so thousands of open clients spread their
+    queries out instead of arriving together.
+    """
+    def __init__(self, widget, scope, scope_id, on_changes, fetch_rows=None,
+                 min_interval=MIN_POLL_INTERVAL, max_interval=MAX_POLL_INTERVAL):
+        if scope not in FEED_SCOPES:
+            raise ValueError(f"Unknown order feed scope: {scope}")
+        self.widget = widget
+        self.scope = scope
+        self.scope_id = scope_id
+        self.on_changes = on_changes
+        self.fetch_rows = fetch_rows
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.last_event_id = None
+        # Newest EventID applied per order, for de-duplicating the look-back window
+        self._applied = {}
+
+        self._queue = queue.Queue()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self, since_event_id=None):
+        """
+        Start polling.
+
+        Args:
+            since_event_id (int, optional): Last event the screen already
+                reflects (default: the newest event when polling starts)
+        """
+        if self._thread:
+            return
+        self.last_event_id = since_event_id
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        # Stop with the screen, not only on logout
+        self.widget.bind("<Destroy>", self._on_destroy, add="+")
+        self.widget.after(DRAIN_INTERVAL_MS, self._drain)
+
+    def stop(self):
+        """Stop polling; the shared connection closes with the last poller."""
+        self._stop_event.set()
+
+    def _on_destroy(self, event):
+        # Toplevel bindings also fire for every child being destroyed
+        if event.widget is self.widget:
+            self.stop()
+
+    def _poll(self):
+        """Run one poll. Returns (changes, rows), possibly empty."""
+        global _connection
+        with _connection_lock:
+            conn = _feed_connection()
+            if not conn:
+                return {}, {}
+            try:
+                return self._read(conn)
+            except mysql.connector.Error:
+                # Reconnect on the next poll, whichever poller makes it
+                _connection = None
+                raise
+
+    def _read(self, conn):
+        cursor = conn.cursor()
+        try:
+            if self.last_event_id is None:
+                # Screens load their own starting state; only follow what happens next
+                self.last_event_id = latest_event_id(cursor, self.scope, self.scope_id)
+                return {}, {}
+            # Work on a copy so a failed row fetch leaves the events to be read again
+            applied = dict(self._applied)
+            changes, last_event_id = fetch_order_changes(
+                cursor, self.scope, self.scope_id, self.last_event_id, applied
+            )
+        finally:
+            cursor.close()
+
+        rows = {}
+        if changes and self.fetch_rows:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                rows = self.fetch_rows(cursor, changes)
+            finally:
+                cursor.close()
+        self.last_event_id, self._applied = last_event_id, applied
+        return changes, rows
+
+    def _run(self):
+        _acquire_connection()
+        interval = self.min_interval
+        while not self._stop_event.is_set():
+            try:
+                changes, rows = self._poll()
+            except mysql.connector.Error as e:
+                print(f"Order feed poll failed: {e}")
+                changes, rows = {}, {}
+
+            if changes:
+                self._queue.put((changes, rows))
+                interval = self.min_interval
+            else:
+                interval = min(interval * 2, self.max_interval)
+
+            self._stop_event.wait(interval * random.uniform(0.8, 1.2))
+
+        _release_connection()
+
+    def _drain(self):
+        """Deliver queued changes on the Tk thread."""
+        if self._stop_event.is_set():
+            return
+        try:
+            alive = self.widget.winfo_exists()
+        except TclError:
+            alive = False
+        if not alive:
+            self.stop()
+            return
+
+        changes, rows = {}, {}
+        while True:
+            try:
+                batch, batch_rows = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            changes.update(batch)
+            rows.update(batch_rows)
+        if changes:
+            if self.fetch_rows:
+                self.on_changes(changes, rows)
+            else:
+                self.on_changes(changes)
+
+        self.widget.after(DRAIN_INTERVAL_MS, self._drain)
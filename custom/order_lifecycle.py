@@ -0,0 +1,92 @@
+from custom.order_feed import record_order_event
+from utils import connect_to_database
+
+# Allowed next statuses for each order status. Orders only move forward,
+# so the current status doubles as the version checked on every update.
+ORDER_TRANSITIONS = {
+    "pending": ("preparing", "cancelled"),
+    "preparing": ("shipped", "cancelled"),
+    "shipped": ("delivered",),
+    "delivered": (),
+    "cancelled": (),
+}
+
+ORDER_STATUSES = tuple(ORDER_TRANSITIONS)
+
+# Orders the kitchen still has to work on
+KITCHEN_STATUSES = ("pending", "preparing")
+
+# Minutes after an order is placed that its food is promised to be ready
+PROMISED_PREP_MINUTES = 15
+
+# Label colours used by the staff order cards
+STATUS_COLORS = {
+    "pending": "#FFA000",
+    "preparing": "#2196F3",
+    "shipped": "#9C27B0",
+    "delivered": "#4CAF50",
+    "cancelled": "#F44336",
+}
+
+
+def can_transition(current_status, new_status):
+    """Return True if an order may move from current_status to new_status."""
+    return new_status in ORDER_TRANSITIONS.get(current_status, ())
+
+
+def status_choices(current_status):
+    """Return the current status followed by the statuses it can move to, for dropdowns."""
+    return [current_status] + list(ORDER_TRANSITIONS.get(current_status, ()))
+
+
+def change_order_status(order_id, expected_status, new_status):
+    """
+    Move an order to a new status if nobody changed it in the meantime.
+
+    The UPDATE only matches while the order still has `expected_status`, so
+    two staff members acting on the same order cannot overwrite each other;
+    the second one gets the status the first one set. The change is logged
+    to OrderEvent, with its timestamp, in the same transaction.
+
+    Args:
+        order_id (int): Order to update
+        expected_status (str): Status the caller last saw
+        new_status (str): Requested status
+
+    Returns:
+        tuple: (success, status) where status is the order's status after
+               the call, or None if the order no longer exists
+    """
+    if not can_transition(expected_status, new_status):
+        return False, expected_status
+
+    conn = connect_to_database()
+    if not conn:
+        return False, expected_status
+
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE `Order` SET OrderStatus = %s WHERE OrderID = %s AND OrderStatus = %s",
+            (new_status, order_id, expected_status)
+        )
+
+        if cursor.rowcount == 0:
+            # Someone else moved the order first (or it was deleted)
+            conn.rollback()
+            cursor.execute("SELECT OrderStatus FROM `Order` WHERE OrderID = %s", (order_id,))
+            row = cursor.fetchone()
+            cursor.close()
+            return False, row[0] if row else None
+
+        record_order_event(cursor, order_id)
+        conn.commit()
+        cursor.close()
+        return True, new_status
+    except Exception as e:
+        print(f"Error updating order status: {e}")
+        conn.rollback()
+        return False, expected_status
+    finally:
+        if conn.is_connected():
+            conn.close()
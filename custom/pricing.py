@@ -0,0 +1,108 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+from utils import execute_query
+
+CENT = Decimal("0.01")
+
+
+def to_money(value):
+    """Convert a price (Decimal, float, int or str) to a Decimal rounded to cents."""
+    if not isinstance(value, Decimal):
+        # Go through str so floats like 12.99 do not pick up binary noise
+        value = Decimal(str(value))
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+class PricedCart:
+    """Result of re-pricing a cart against the current menu."""
+    def __init__(self):
+        self.lines = []  # Dicts with MenuID, RestaurantID, ItemName, Quantity, UnitPrice, Subtotal
+        self.total = Decimal("0.00")
+        self.price_changes = []  # (ItemName, cart price, current price)
+        self.unavailable = []  # (MenuID, ItemName) of items that can no longer be ordered
+
+    @property
+    def ok(self):
+        """True when every item can be ordered."""
+        return not self.unavailable
+
+    def by_restaurant(self):
+        """
+        Group lines by restaurant.
+
+        Returns:
+            dict: RestaurantID -> (lines, Decimal total), in first-seen order
+        """
+        groups = {}
+        for line in self.lines:
+            lines, total = groups.get(line["RestaurantID"], ([], Decimal("0.00")))
+            lines.append(line)
+            groups[line["RestaurantID"]] = (lines, total + line["Subtotal"])
+        return groups
+
+    def describe_changes(self):
+        """Return a user-facing summary of price changes and unavailable items."""
+        lines = []
+        for name, old_price, new_price in self.price_changes:
+            lines.append(f"{name}: ${old_price:.2f} → ${new_price:.2f}")
+        for _, name in self.unavailable:
+            lines.append(f"{name} is no longer available")
+        return "\n".join(lines)
+
+
+def price_cart(cart):
+    """
+    Re-price cart lines against the current Menu rows in a single query.
+
+    Args:
+        cart (iterable): Lines with MenuID, Quantity and the Price the
+            customer was shown (and optionally ItemName)
+
+    Returns:
+        PricedCart: Current prices, Decimal subtotals and total, plus any
+                    price changes and unavailable items; None if the menu
+                    could not be read
+    """
+    cart = list(cart)
+    priced = PricedCart()
+    if not cart:
+        return priced
+
+    menu_ids = list({line["MenuID"] for line in cart})
+    placeholders = ", ".join(["%s"] * len(menu_ids))
+    rows = execute_query(f"""
+        SELECT m.MenuID, m.RestaurantID, m.ItemName, m.Price,
+               m.IsActive AND m.DeletedAt IS NULL
+                   AND r.IsActive AND r.DeletedAt IS NULL AS Available
+        FROM Menu m
+        JOIN Restaurant r ON m.RestaurantID = r.RestaurantID
+        WHERE m.MenuID IN ({placeholders})
+    """, tuple(menu_ids), fetch=True)
+    if rows is None:
+        return None
+
+    menu = {row["MenuID"]: row for row in rows}
+
+    for line in cart:
+        row = menu.get(line["MenuID"])
+        if not row or not row["Available"]:
+            name = row["ItemName"] if row else line.get("ItemName", f"Item #{line['MenuID']}")
+            priced.unavailable.append((line["MenuID"], name))
+            continue
+
+        unit_price = to_money(row["Price"])
+        if "Price" in line and to_money(line["Price"]) != unit_price:
+            priced.price_changes.append((row["ItemName"], to_money(line["Price"]), unit_price))
+
+        subtotal = unit_price * line["Quantity"]
+        priced.lines.append({
+            "MenuID": row["MenuID"],
+            "RestaurantID": row["RestaurantID"],
+            "ItemName": row["ItemName"],
+            "Quantity": line["Quantity"],
+            "UnitPrice": unit_price,
+            "Subtotal": subtotal
+        })
+        priced.total += subtotal
+
+    return priced
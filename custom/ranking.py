@@ -0,0 +1,125 @@
+import heapq
+import threading
+import time
+
+from custom.eta import get_eta_model
+from custom.geo import Geocoder, haversine_km
+from utils import fetch_in_background
+
+# Orderings offered on the home screen. "Default" keeps the order the
+# restaurants were listed in (by name, or by search relevance).
+SORT_OPTIONS = ("Default", "Popularity", "Rating", "Delivery Time", "Distance")
+
+# Cards rendered per page as the home screen is scrolled
+PAGE_SIZE = 12
+
+# Ratings of restaurants with few reviews are pulled towards the overall
+# average; this is the number of "average" ratings blended in
+RATING_PRIOR = 5
+
+# Seconds before order counts are re-read for the popularity ranking
+POPULARITY_REFRESH = 300
+
+_order_counts = {}
+_order_counts_at = None
+_order_counts_lock = threading.Lock()
+
+_geocoder = Geocoder()
+
+
+def order_counts():
+    """Return the cached RestaurantID -> number of non-cancelled orders (empty until first loaded)."""
+    return _order_counts
+
+
+def refresh_order_counts(max_age=POPULARITY_REFRESH):
+    """
+    Re-read order counts when the cached copy is older than `max_age` seconds.
+
+    One GROUP BY over the (RestaurantID, OrderStatus, OrderDate) index. Call
+    this from a background thread; sort_keys() ranks from the cached copy.
+
+    Returns:
+        bool: True if the counts were re-read
+    """
+    global _order_counts, _order_counts_at
+    with _order_counts_lock:
+        if _order_counts_at is not None and time.monotonic() - _order_counts_at < max_age:
+            return False
+        rows = fetch_in_background("""
+            SELECT RestaurantID, COUNT(*) AS OrderCount
+            FROM `Order`
+            WHERE OrderStatus != 'cancelled'
+            GROUP BY RestaurantID
+        """)
+        if rows is None:
+            return False
+        _order_counts = {row["RestaurantID"]: row["OrderCount"] for row in rows}
+        _order_counts_at = time.monotonic()
+        return True
+
+
+def restaurant_distances(address, restaurants):
+    """
+    Distance in km from an address to each restaurant's Location.
+
+    Every distinct address is geocoded once through Geocoder.geocode_many;
+    restaurants sharing a Location cost one lookup, and lookups that failed
+    are retried after geo.FAILURE_TTL rather than never. On a cold cache the
+    public OSM geocoder answers one request at a time, so call this from a
+    background thread.
+
+    Returns:
+        dict: RestaurantID -> km, for restaurants that could be located
+    """
+    origin = _geocoder.geocode(address)
+    if origin is None:
+        return {}
+    locations = _geocoder.geocode_many(restaurant.get("Location") for restaurant in restaurants)
+    distances = {}
+    for restaurant in restaurants:
+        location = locations.get(restaurant.get("Location"))
+        if location is not None:
+            distances[restaurant["RestaurantID"]] = haversine_km(*origin, *location)
+    return distances
+
+
+def sort_keys(restaurants, option, distances=None):
+    """
+    Precompute one sort key per restaurant for an ordering (smaller ranks first).
+
+    Ties, and restaurants the ordering knows nothing about, keep their
+    listed order.
+
+    Args:
+        restaurants (list): Restaurant rows in listed order
+        option (str): One of SORT_OPTIONS
+        distances (dict, optional): RestaurantID -> km for "Distance"
+
+    Returns:
+        list: Keys aligned with `restaurants`
+    """
+    if option == "Popularity":
+        counts = order_counts()
+        score = lambda r: -counts.get(r["RestaurantID"], 0)
+    elif option == "Rating":
+        total_count = sum(r.get("RatingCount") or 0 for r in restaurants)
+        total_sum = sum(r.get("RatingSum") or 0 for r in restaurants)
+        mean = total_sum / total_count if total_count else 0
+        # Unrated restaurants (score 0) go after every rated one
+        score = lambda r: -(((r.get("RatingSum") or 0) + RATING_PRIOR * mean)
+                            / ((r.get("RatingCount") or 0) + RATING_PRIOR)) if r.get("RatingCount") else 0
+    elif option == "Delivery Time":
+        model = get_eta_model()
+        score = lambda r: model.predict_minutes(r["RestaurantID"])
+    elif option == "Distance" and distances is not None:
+        score = lambda r: distances.get(r["RestaurantID"], float("inf"))
+    else:
+        score = lambda r: 0
+    return [(score(restaurant), position) for position, restaurant in enumerate(restaurants)]
+
+
+def top_k(restaurants, keys, k):
+    """Return the k best-ranked restaurants in order, selected with a heap."""
+    positions = heapq.nsmallest(k, range(len(restaurants)), key=keys.__getitem__)
+    return [restaurants[position] for position in positions]
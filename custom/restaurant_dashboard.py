@@ -1,10 +1,58 @@
 import customtkinter as ctk
-from PIL import Image
-import os
-from datetime import datetime
 from custom.navigation_frame_restaurant import NavigationFrameRestaurant
 from utils import connect_to_database, execute_query
 from CTkMessagebox import CTkMessagebox
+from custom.order_feed import OrderFeedPoller, current_event_id
+from custom.order_lifecycle import change_order_status, status_choices
+from custom.menu_cache import get_menu_cache
+from custom.image_loader import decode_image
+from custom.asset_manifest import get_asset_manifest
+from custom.frame_metrics import timed
+from custom.facets import restaurant_changed
+
+def fetch_orders(cursor, restaurant_id, order_ids=None):
+    """
+    Read a restaurant's orders, newest first, with their items in two queries.
+
+    Args:
+        cursor: Open dictionary cursor
+        restaurant_id (int): Restaurant to load
+        order_ids (list, optional): Only load these orders
+
+    Returns:
+        list: Order dicts with the customer's name and an Items list
+    """
+    params = [restaurant_id]
+    id_filter = ""
+    if order_ids:
+        id_filter = f"AND o.OrderID IN ({', '.join(['%s'] * len(order_ids))})"
+        params.extend(order_ids)
+    
+    cursor.execute(f"""
+        SELECT o.*, u.FirstName, u.LastName 
+        FROM `Order` o
+        JOIN User u ON o.UserID = u.UserID
+        WHERE o.RestaurantID = %s {id_filter}
+        ORDER BY o.OrderDate DESC
+    """, tuple(params))
+    orders = cursor.fetchall()
+    if not orders:
+        return []
+    
+    # Fetch the items of every order in one query
+    by_id = {order['OrderID']: order for order in orders}
+    for order in orders:
+        order['Items'] = []
+    cursor.execute(f"""
+        SELECT oi.*, m.ItemName 
+        FROM OrderItem oi
+        JOIN Menu m ON oi.MenuID = m.MenuID
+        WHERE oi.OrderID IN ({', '.join(['%s'] * len(by_id))})
+    """, tuple(by_id))
+    for item in cursor.fetchall():
+        by_id[item['OrderID']]['Items'].append(item)
+    
+    return orders
 
 class RestaurantDashboard(ctk.CTkFrame):
     """Dashboard for restaurant owners to manage their restaurant."""
@@ -56,6 +104,7 @@ class RestaurantDashboard(ctk.CTkFrame):
         else:
             return {"Name": "Restaurant", "RestaurantID": None}
     
+    @timed
     def show_frame(self, frame_name, **kwargs):
         """Show selected frame and hide others."""
         # Hide all frames
@@ -92,6 +141,8 @@ class RestaurantDashboard(ctk.CTkFrame):
             option_2="No"
         )
         if confirm.get() == "Yes":
+            if self.orders_frame.feed:
+                self.orders_frame.feed.stop()
             self.master.current_user = None
             self.master.user_role = None
             self.master.show_login_window()
@@ -257,6 +308,7 @@ class MenuFrame(ctk.CTkFrame):
         # Refresh menu items
         self.refresh_menu()
     
+    @timed
     def refresh_menu(self):
         """Refresh and display menu items."""
         # Clear existing items
@@ -287,8 +339,15 @@ class MenuFrame(ctk.CTkFrame):
         if not restaurant_id:
             return []
         
-        query = "SELECT * FROM Menu WHERE RestaurantID = %s"
-        return execute_query(query, (restaurant_id,), fetch=True) or []
+        snapshot = get_menu_cache().get(restaurant_id)
+        return snapshot.items if snapshot else []
+    
+    def menu_changed(self):
+        """Drop the cached menu after an edit and show the new one."""
+        restaurant_id = self.controller.restaurant_data.get("RestaurantID")
+        if restaurant_id:
+            get_menu_cache().invalidate(restaurant_id)
+        self.refresh_menu()
     
     def create_menu_item_card(self, item):
         """Create a card for a menu item."""
@@ -307,7 +366,7 @@ class MenuFrame(ctk.CTkFrame):
             
             if image_path:
                 image = ctk.CTkImage(
-                    light_image=Image.open(image_path),
+                    light_image=decode_image(image_path, (80, 80)),
                     size=(80, 80)
                 )
                 image_label = ctk.CTkLabel(
@@ -414,17 +473,8 @@ class MenuFrame(ctk.CTkFrame):
     
     def get_image_path(self, filename):
         """Get the full path to an image file."""
-        base_path = os.path.join('static', 'images', 'menu')
-        full_path = os.path.join(base_path, filename)
-        
-        # Fallback image if specific image not found
-        if not os.path.exists(full_path):
-            fallback_path = os.path.join(base_path, 'default.png')
-            if os.path.exists(fallback_path):
-                return fallback_path
-            return None
-        
-        return full_path
+        # Served from the in-memory manifest; no filesystem calls per card
+        return get_asset_manifest().image_path(filename, 'menu')
     
     def open_add_item_dialog(self):
         """Open dialog to add a new menu item."""
@@ -537,7 +587,7 @@ class MenuFrame(ctk.CTkFrame):
             conn.close()
             
             # Refresh menu
-            self.refresh_menu()
+            self.menu_changed()
             
             # Close dialog
             dialog.destroy()
@@ -653,7 +703,7 @@ class MenuFrame(ctk.CTkFrame):
             conn.close()
             
             # Refresh menu
-            self.refresh_menu()
+            self.menu_changed()
             
             # Close dialog
             dialog.destroy()
@@ -697,7 +747,7 @@ class MenuFrame(ctk.CTkFrame):
                 conn.close()
                 
                 # Refresh menu
-                self.refresh_menu()
+                self.menu_changed()
                 
                 # Show success message
                 CTkMessagebox(
@@ -727,7 +777,19 @@ class OrdersFrame(ctk.CTkFrame):
             font=("Arial", 24, "bold"),
             text_color="#333333"
         )
-        self.title_label.pack(pady=(20, 15))
+        self.title_label.pack(pady=(20, 5))
+        
+        # Full-screen queue of open orders for the kitchen
+        self.kitchen_button = ctk.CTkButton(
+            self,
+            text="Kitchen Display",
+            command=self.open_kitchen_display,
+            fg_color="#22C55E",
+            hover_color="#1DA346",
+            corner_radius=8,
+            width=150
+        )
+        self.kitchen_button.pack(pady=(0, 10))
         
         # Orders container
         self.orders_container = ctk.CTkScrollableFrame(
@@ -738,14 +800,30 @@ class OrdersFrame(ctk.CTkFrame):
         )
         self.orders_container.pack(fill="both", expand=True, padx=15, pady=10)
         
+        # Status widgets of each displayed order, keyed by OrderID
+        self.order_cards = {}
+        
+        # Follow new orders and status changes without reloading the list
+        self.feed = None
+        restaurant_id = self.controller.restaurant_data.get("RestaurantID")
+        since_event_id = current_event_id("restaurant", restaurant_id) if restaurant_id else None
+        
         # Refresh orders
         self.refresh_orders()
+        
+        if restaurant_id:
+            self.feed = OrderFeedPoller(
+                self, "restaurant", restaurant_id, self.apply_order_changes, fetch_rows=self.fetch_new_orders
+            )
+            self.feed.start(since_event_id)
     
+    @timed
     def refresh_orders(self):
         """Refresh and display orders."""
         # Clear existing items
         for widget in self.orders_container.winfo_children():
             widget.destroy()
+        self.order_cards = {}
         
         # Get orders
         orders = self.get_orders()
@@ -766,36 +844,50 @@ class OrdersFrame(ctk.CTkFrame):
             self.create_order_card(order)
     
     def get_orders(self):
-        """Get orders for the restaurant."""
+        """Get every order for the restaurant, newest first."""
         restaurant_id = self.controller.restaurant_data.get("RestaurantID")
         if not restaurant_id:
             return []
         
-        query = """
-            SELECT o.*, u.FirstName, u.LastName 
-            FROM `Order` o
-            JOIN User u ON o.UserID = u.UserID
-            WHERE o.RestaurantID = %s
-            ORDER BY o.OrderDate DESC
-        """
-        orders = execute_query(query, (restaurant_id,), fetch=True)
+        conn = connect_to_database()
+        if not conn:
+            return []
+        try:
+            cursor = conn.cursor(dictionary=True)
+            orders = fetch_orders(cursor, restaurant_id)
+            cursor.close()
+            return orders
+        except Exception as e:
+            print(f"Error loading orders: {e}")
+            return []
+        finally:
+            if conn.is_connected():
+                conn.close()
+    
+    def fetch_new_orders(self, cursor, changes):
+        """Read the orders not shown yet (runs on the order feed's thread)."""
+        new_order_ids = [order_id for order_id in changes if order_id not in self.order_cards]
+        if not new_order_ids:
+            return {}
+        restaurant_id = self.controller.restaurant_data.get("RestaurantID")
+        return {order["OrderID"]: order for order in fetch_orders(cursor, restaurant_id, new_order_ids)}
+    
+    def open_kitchen_display(self):
+        """Open the full-screen kitchen queue for this restaurant."""
+        from custom.kitchen_display import KitchenDisplay
         
-        # Fetch order items for each order
-        for order in orders:
-            items_query = """
-                SELECT oi.*, m.ItemName 
-                FROM OrderItem oi
-                JOIN Menu m ON oi.MenuID = m.MenuID
-                WHERE oi.OrderID = %s
-            """
-            order['Items'] = execute_query(items_query, (order['OrderID'],), fetch=True) or []
-        
-        return orders
+        restaurant = self.controller.restaurant_data
+        if not restaurant.get("RestaurantID"):
+            return
+        KitchenDisplay(self, restaurant["RestaurantID"], restaurant.get("Name", "Kitchen"))
     
-    def create_order_card(self, order):
-        """Create a card for an order."""
+    def create_order_card(self, order, before=None):
+        """Create a card for an order, optionally packed above another card."""
         card = ctk.CTkFrame(self.orders_container, fg_color="white", corner_radius=10)
-        card.pack(fill="x", pady=5, ipady=10)
+        if before:
+            card.pack(fill="x", pady=5, ipady=10, before=before)
+        else:
+            card.pack(fill="x", pady=5, ipady=10)
         
         # Order details header
         header_frame = ctk.CTkFrame(card, fg_color="transparent")
@@ -870,45 +962,99 @@ class OrdersFrame(ctk.CTkFrame):
         )
         status_label.pack(side="left")
         
-        # Update status dropdown
-        status_options = ["pending", "preparing", "shipped", "delivered"]
+        # Update status dropdown (only the moves allowed from the current status)
         current_status = order['OrderStatus']
         status_var = ctk.StringVar(value=current_status)
         
         status_dropdown = ctk.CTkOptionMenu(
             status_frame,
-            values=status_options,
+            values=status_choices(current_status),
             variable=status_var,
             command=lambda value, o_id=order['OrderID']: self.update_order_status(o_id, value)
         )
         status_dropdown.pack(side="right")
+        
+        self.order_cards[order['OrderID']] = {
+            "card": card,
+            "status": current_status,
+            "status_label": status_label,
+            "status_var": status_var,
+            "status_dropdown": status_dropdown
+        }
+    
+    def set_card_status(self, order_id, status):
+        """Show a new status on an order's card without rebuilding it."""
+        widgets = self.order_cards.get(order_id)
+        if not widgets:
+            return
+        widgets["status"] = status
+        widgets["status_label"].configure(text=f"Status: {status}")
+        widgets["status_dropdown"].configure(values=status_choices(status))
+        widgets["status_var"].set(status)
+    
+    def apply_order_changes(self, changes, rows):
+        """
+        Apply status changes from the order feed to the displayed cards.
+        
+        Known orders have their status patched in place; new orders arrive
+        in `rows`, already fetched by the feed, and are added to the top of
+        the list.
+        """
+        new_orders = []
+        for order_id, status in changes.items():
+            if order_id in self.order_cards:
+                self.set_card_status(order_id, status)
+            elif order_id in rows:
+                rows[order_id]["OrderStatus"] = status
+                new_orders.append(rows[order_id])
+        
+        if not new_orders:
+            return
+        new_orders.sort(key=lambda order: order["OrderDate"], reverse=True)
+        
+        # Drop the "No orders yet." placeholder
+        if not self.order_cards:
+            for widget in self.orders_container.winfo_children():
+                widget.destroy()
+        
+        # Newest first, above the cards already shown
+        shown = self.orders_container.pack_slaves()
+        top = shown[0] if shown else None
+        for order in new_orders:
+            self.create_order_card(order, before=top)
     
     def update_order_status(self, order_id, new_status):
         """Update order status in the database."""
-        query = "UPDATE `Order` SET OrderStatus = %s WHERE OrderID = %s"
+        expected_status = self.order_cards[order_id]["status"]
+        if new_status == expected_status:
+            return
         
-        try:
-            conn = connect_to_database()
-            cursor = conn.cursor()
-            cursor.execute(query, (new_status, order_id))
-            conn.commit()
-            cursor.close()
-            conn.close()
-            
-            # Refresh orders
-            self.refresh_orders()
-            
-            # Show success message
+        success, status = change_order_status(order_id, expected_status, new_status)
+        
+        if success:
+            self.set_card_status(order_id, status)
             CTkMessagebox(
                 title="Success",
                 message="Order status updated successfully!",
                 icon="check",
                 option_1="OK"
             )
-        except Exception as e:
+        elif status != expected_status:
+            # Another change won; show what the order is now
+            if status:
+                self.set_card_status(order_id, status)
+            CTkMessagebox(
+                title="Order Changed",
+                message=(f"Order #{order_id} was already updated to '{status}' by someone else."
+                         if status else f"Order #{order_id} no longer exists."),
+                icon="warning",
+                option_1="OK"
+            )
+        else:
+            self.set_card_status(order_id, expected_status)
             CTkMessagebox(
                 title="Database Error",
-                message=f"Failed to update order status: {e}",
+                message="Failed to update order status.",
                 icon="cancel",
                 option_1="OK"
             )
@@ -968,6 +1114,7 @@ class AnalyticsFrame(ctk.CTkFrame):
         # Load and display analytics
         self.load_analytics()
     
+    @timed
     def load_analytics(self):
         """Load and display various analytics metrics."""
         import tkinter as tk
@@ -1515,6 +1662,7 @@ class SettingsFrame(ctk.CTkFrame):
             conn.commit()
             cursor.close()
             conn.close()
+            restaurant_changed(restaurant_id)
             
             # Update local restaurant data
             self.controller.restaurant_data.update({
@@ -1743,6 +1891,7 @@ class SettingsFrame(ctk.CTkFrame):
             conn.commit()
             cursor.close()
             conn.close()
+            restaurant_changed(restaurant_id)
             
             # Update local restaurant data
             self.controller.restaurant_data['Contact'] = phone
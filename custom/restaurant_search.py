@@ -0,0 +1,240 @@
+import queue
+import threading
+
+from custom.facets import restaurant_columns
+from custom.fuzzy_search import get_fuzzy_index
+from utils import connect_in_background, fetch_in_background
+
+# Milliseconds to wait after the last keystroke before searching
+SEARCH_DELAY_MS = 250
+
+# Milliseconds between checks for finished searches on the Tk thread
+DRAIN_INTERVAL_MS = 50
+
+# Searches with fewer exact matches than this are topped up with fuzzy ones
+FUZZY_FILL = 6
+
+# Session limit for MatchedItems; MySQL's 1024-byte default cuts short terms off
+GROUP_CONCAT_MAX_LEN = 1024 * 1024
+
+
+def like_pattern(term):
+    """Return a LIKE pattern matching `term` anywhere, with wildcards in it escaped."""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def search_restaurants(term):
+    """
+    Find restaurants whose name, cuisine or a menu item contains `term`.
+
+    Each row also carries MatchedItems, the names of its matching menu
+    items, and MatchedCount, how many there are, so a longer term can
+    later be matched against the rows in memory (see `narrow`).
+
+    Args:
+        term (str): Search text
+
+    Returns:
+        list: Restaurant rows ordered by name, or None if the query failed
+    """
+    pattern = like_pattern(term)
+    # Called from LiveSearch's worker threads, so no messagebox on failure
+    conn = connect_in_background()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SET SESSION group_concat_max_len = %s", (GROUP_CONCAT_MAX_LEN,))
+        cursor.execute(f"""
+            SELECT {restaurant_columns("r")},
+                   GROUP_CONCAT(DISTINCT m.ItemName SEPARATOR '\\n') AS MatchedItems,
+                   COUNT(DISTINCT m.ItemName) AS MatchedCount
+            FROM Restaurant r
+            LEFT JOIN Menu m ON r.RestaurantID = m.RestaurantID AND m.ItemName LIKE %s
+            WHERE r.Name LIKE %s OR r.Cuisine LIKE %s OR m.MenuID IS NOT NULL
+            GROUP BY r.RestaurantID
+            ORDER BY r.Name
+        """, (pattern, pattern, pattern))
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+    except Exception as e:
+        print(f"Error searching restaurants: {e}")
+        return None
+    finally:
+        if conn.is_connected():
+            conn.close()
+
+
+def fuzzy_restaurants(term, exclude=(), limit=FUZZY_FILL):
+    """
+    Find restaurants matching a possibly misspelled term through the trigram index.
+
+    Args:
+        term (str): Search text
+        exclude (set, optional): RestaurantIDs already found
+        limit (int, optional): Number of restaurants to return
+
+    Returns:
+        list: Restaurant rows, best match first
+    """
+    index = get_fuzzy_index()
+    if index is None:
+        return []
+    ranked = index.search(term, limit + len(exclude))
+    restaurant_ids = [restaurant_id for _, restaurant_id in ranked if restaurant_id not in exclude][:limit]
+    if not restaurant_ids:
+        return []
+    rows = fetch_in_background(
+        f"SELECT {restaurant_columns()} FROM Restaurant "
+        f"WHERE RestaurantID IN ({', '.join(['%s'] * len(restaurant_ids))})",
+        tuple(restaurant_ids)
+    ) or []
+    by_id = {row["RestaurantID"]: row for row in rows}
+    for row in rows:
+        row["Fuzzy"] = True
+    return [by_id[restaurant_id] for restaurant_id in restaurant_ids if restaurant_id in by_id]
+
+
+def find_restaurants(term):
+    """
+    Exact substring matches, followed by fuzzy matches when there are few.
+
+    Returns:
+        list: Restaurant rows, or None if the search query failed
+    """
+    rows = search_restaurants(term)
+    if rows is not None and len(rows) < FUZZY_FILL:
+        found = {row["RestaurantID"] for row in rows}
+        rows = rows + fuzzy_restaurants(term, found, FUZZY_FILL - len(rows))
+    return rows
+
+
+def matches(restaurant, key):
+    """Return True if a search row matches a case-folded term."""
+    if key in (restaurant.get("Name") or "").casefold():
+        return True
+    if key in (restaurant.get("Cuisine") or "").casefold():
+        return True
+    return any(key in item.casefold() for item in (restaurant.get("MatchedItems") or "").split("\n"))
+
+
+def can_narrow(restaurants):
+    """
+    Return True if a longer term can be answered from these rows in memory.
+
+    Fuzzy top-ups carry no MatchedItems, and a MatchedItems list cut off by
+    group_concat_max_len may be missing the item a longer term matches.
+    """
+    for restaurant in restaurants:
+        if restaurant.get("Fuzzy"):
+            return False
+        items = restaurant.get("MatchedItems")
+        if len(items.split("\n") if items else []) != (restaurant.get("MatchedCount") or 0):
+            return False
+    return True
+
+
+def narrow(restaurants, key):
+    """
+    Filter rows returned for a shorter term down to those matching `key`.
+
+    Any text containing the longer term also contains the shorter one, so
+    the rows for the shorter term are a superset of the answer, and the
+    menu items that could match are among their MatchedItems. Only use
+    this on rows that pass `can_narrow`.
+    """
+    return [restaurant for restaurant in restaurants if matches(restaurant, key)]
+
+
+class LiveSearch:
+    """
+    Search-as-you-type for a Tk screen.
+
+    Keystrokes restart a short timer, so only the text the user pauses on
+    is searched. A term that extends the last one queried is answered from
+    that query's rows in memory when enough of them still match that no
+    fuzzy top-up is needed; anything else
+    is queried on a background thread, with misspellings caught by the
+    trigram index. Every new keystroke makes the searches already running stale,
+    and their results are dropped when they arrive instead of being shown.
+    """
+    def __init__(self, widget, on_results, delay_ms=SEARCH_DELAY_MS):
+        """
+        Args:
+            widget: Widget used to schedule work on the Tk thread
+            on_results (callable): Called on the Tk thread as
+                on_results(term, restaurants); restaurants is None when the
+                term is empty and the screen should show everything
+            delay_ms (int, optional): Debounce delay
+        """
+        self.widget = widget
+        self.on_results = on_results
+        self.delay_ms = delay_ms
+        self._after_id = None
+        self._generation = 0
+        self._cached_key = None
+        self._cached_rows = None
+        self._results = queue.Queue()
+        self._running = 0
+        self._draining = False
+
+    def update(self, term, delay_ms=None):
+        """Schedule a search for the current text, cancelling older ones."""
+        self._generation += 1
+        if self._after_id:
+            self.widget.after_cancel(self._after_id)
+        generation = self._generation
+        self._after_id = self.widget.after(
+            self.delay_ms if delay_ms is None else delay_ms,
+            lambda: self._run(term.strip(), generation)
+        )
+
+    def reset(self):
+        """Forget cached rows (e.g. after restaurants or menus change)."""
+        self._cached_key = None
+        self._cached_rows = None
+
+    def _run(self, term, generation):
+        self._after_id = None
+        if not term:
+            self.on_results(term, None)
+            return
+
+        key = term.casefold()
+        if self._cached_key is not None and self._cached_key in key:
+            rows = narrow(self._cached_rows, key)
+            if len(rows) >= FUZZY_FILL:
+                self.on_results(term, rows)
+                return
+
+        def work():
+            self._results.put((generation, term, find_restaurants(term)))
+
+        self._running += 1
+        threading.Thread(target=work, daemon=True).start()
+        if not self._draining:
+            self._draining = True
+            self.widget.after(DRAIN_INTERVAL_MS, self._drain)
+
+    def _drain(self):
+        while True:
+            try:
+                generation, term, rows = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._running -= 1
+            if generation != self._generation or rows is None:
+                continue  # Superseded by a newer keystroke, or the query failed
+            if can_narrow(rows):
+                self._cached_key = term.casefold()
+                self._cached_rows = rows
+            else:
+                self.reset()
+            self.on_results(term, rows)
+
+        if self._running > 0 and self.widget.winfo_exists():
+            self.widget.after(DRAIN_INTERVAL_MS, self._drain)
+        else:
+            self._draining = False
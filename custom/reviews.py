@@ -0,0 +1,89 @@
+import mysql.connector
+
+from utils import connect_to_database
+
+RATING_CHOICES = (1, 2, 3, 4, 5)
+
+
+def rating_summary(restaurant):
+    """
+    Read a restaurant's rating from its running aggregate columns.
+
+    Args:
+        restaurant (dict): Restaurant row with RatingCount and RatingSum
+
+    Returns:
+        tuple: (average rounded to one decimal or None, number of ratings)
+    """
+    count = restaurant.get("RatingCount") or 0
+    if not count:
+        return None, 0
+    return round(restaurant["RatingSum"] / count, 1), count
+
+
+def stars_text(rating):
+    """Return five Unicode stars for a rating (rounded to the nearest star)."""
+    full = int(round(rating or 0))
+    return "★" * full + "☆" * (5 - full)
+
+
+def submit_review(user_id, order_id, rating, comment=None):
+    """
+    Record a customer's rating of a delivered order.
+
+    The Review row and the restaurant's running totals (RatingCount,
+    RatingSum) change in one transaction, so the average shown on cards
+    never needs an aggregate query over Review. Restaurant.UpdatedAt is
+    left alone: a rating is not an edit, and bumping it would invalidate
+    the restaurant's cached menu snapshot.
+
+    Args:
+        user_id (int): Customer leaving the review
+        order_id (int): Delivered order being rated
+        rating (int): 1 to 5 stars
+        comment (str, optional): Free text
+
+    Returns:
+        tuple: (success, message)
+    """
+    if rating not in RATING_CHOICES:
+        return False, "Please choose a rating from 1 to 5 stars."
+
+    conn = connect_to_database()
+    if not conn:
+        return False, "Could not connect to the database."
+
+    try:
+        cursor = conn.cursor()
+        # Only the customer's own delivered orders can be rated
+        cursor.execute("""
+            INSERT INTO Review (OrderID, UserID, RestaurantID, Rating, Comment)
+            SELECT OrderID, UserID, RestaurantID, %s, %s
+            FROM `Order`
+            WHERE OrderID = %s AND UserID = %s AND OrderStatus = 'delivered'
+        """, (rating, comment or None, order_id, user_id))
+        if cursor.rowcount == 0:
+            conn.rollback()
+            cursor.close()
+            return False, "Only delivered orders can be rated."
+
+        cursor.execute("""
+            UPDATE Restaurant r
+            JOIN `Order` o ON o.RestaurantID = r.RestaurantID
+            SET r.RatingCount = r.RatingCount + 1, r.RatingSum = r.RatingSum + %s,
+                r.UpdatedAt = r.UpdatedAt
+            WHERE o.OrderID = %s
+        """, (rating, order_id))
+        conn.commit()
+        cursor.close()
+        return True, "Thanks for rating your order!"
+    except mysql.connector.IntegrityError:
+        conn.rollback()
+        return False, "You have already rated this order."
+    except Exception as e:
+        print(f"Error saving review: {e}")
+        conn.rollback()
+        return False, "Failed to save your rating."
+    finally:
+        if conn.is_connected():
+            conn.close()
@@ -0,0 +1,168 @@
+import threading
+
+from utils import connect_in_background, DEFAULT_USER_SETTINGS
+
+# Seconds to wait after the last change before writing to the database.
+# Rapid toggles of the same switch collapse into one write.
+FLUSH_DELAY = 0.5
+
+# Seconds before a failed write is tried again
+RETRY_DELAY = 5.0
+
+# One store per signed-in user, kept for the whole session
+_stores = {}
+
+
+class SettingsStore:
+    """
+    In-memory copy of one user's UserSettings rows.
+
+    Settings are loaded with a single query on a background thread, reads
+    are served from memory (defaults until `loaded` is set) and changes are
+    written back on a background timer with one INSERT ... ON DUPLICATE KEY
+    UPDATE statement.
+    """
+    def __init__(self, user_id, flush_delay=FLUSH_DELAY, retry_delay=RETRY_DELAY):
+        self.user_id = user_id
+        self.flush_delay = flush_delay
+        self.retry_delay = retry_delay
+        self.loaded = False
+        self.load_done = threading.Event()  # Set when a load finished, even if it failed
+        self._values = dict(DEFAULT_USER_SETTINGS)
+        self._pending = {}
+        self._lock = threading.Lock()
+        # Held for a whole write so a timer flush and close() commit in order
+        self._flush_lock = threading.Lock()
+        self._timer = None
+        self._closed = False
+
+    def load_in_background(self):
+        """Start loading the settings without blocking the caller."""
+        threading.Thread(target=self.load, daemon=True).start()
+
+    def load(self):
+        """Load all settings for the user with one query (runs on a background thread)."""
+        conn = connect_in_background()
+        if not conn:
+            self.load_done.set()
+            return
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT SettingName, SettingValue FROM UserSettings WHERE UserID = %s", (self.user_id,))
+            rows = cursor.fetchall()
+            cursor.close()
+            with self._lock:
+                for name, value in rows:
+                    # Local changes made before the load finished win
+                    if name not in self._pending:
+                        self._values[name] = bool(value)
+                self.loaded = True
+        except Exception as e:
+            print(f"Error loading settings: {e}")
+        finally:
+            if conn.is_connected():
+                conn.close()
+            self.load_done.set()
+
+    def get(self, setting_name, default=False):
+        """Return a setting value from memory."""
+        with self._lock:
+            return self._values.get(setting_name, default)
+
+    def all(self):
+        """Return a copy of every setting."""
+        with self._lock:
+            return dict(self._values)
+
+    def set(self, setting_name, setting_value):
+        """Change a setting in memory and schedule a write-through."""
+        setting_value = bool(setting_value)
+        with self._lock:
+            self._values[setting_name] = setting_value
+            self._pending[setting_name] = setting_value
+
+            # Restart the timer so a burst of toggles becomes one write
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.start()
+
+    def flush(self):
+        """Write all pending changes in a single upsert."""
+        with self._flush_lock:
+            return self._flush()
+
+    def _flush(self):
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            pending, self._pending = self._pending, {}
+
+        if not pending:
+            return True
+
+        values = ", ".join(["(%s, %s, %s)"] * len(pending))
+        query = f"""
+            INSERT INTO UserSettings (UserID, SettingName, SettingValue)
+            VALUES {values}
+            ON DUPLICATE KEY UPDATE SettingValue = VALUES(SettingValue), UpdatedAt = NOW()
+        """
+        params = []
+        for setting_name, setting_value in pending.items():
+            params.extend((self.user_id, setting_name, setting_value))
+
+        conn = None
+        try:
+            conn = connect_in_background()
+            if not conn:
+                raise ConnectionError("No database connection")
+            cursor = conn.cursor()
+            cursor.execute(query, tuple(params))
+            conn.commit()
+            cursor.close()
+            return True
+        except Exception as e:
+            print(f"Error saving settings: {e}")
+            # Put failed changes back unless they were changed again meanwhile,
+            # and try again later
+            with self._lock:
+                for setting_name, setting_value in pending.items():
+                    self._pending.setdefault(setting_name, setting_value)
+                if self._timer is None and not self._closed:
+                    self._timer = threading.Timer(self.retry_delay, self.flush)
+                    # Retries against an unreachable database must not hold up exit
+                    self._timer.daemon = True
+                    self._timer.start()
+            return False
+        finally:
+            if conn and conn.is_connected():
+                conn.close()
+
+    def close(self):
+        """
+        Write any pending changes now (e.g. on sign out) without blocking the caller.
+
+        The final flush runs on its own non-daemon thread, so the process
+        still waits for it before exiting.
+        """
+        with self._lock:
+            self._closed = True
+        threading.Thread(target=self.flush).start()
+
+
+def get_settings_store(user_id):
+    """Return the session's settings store for a user, starting its load on first use."""
+    store = _stores.get(user_id)
+    if store is None:
+        store = SettingsStore(user_id)
+        store.load_in_background()
+        _stores[user_id] = store
+    return store
+
+
+def release_settings_store(user_id):
+    """Flush and forget a user's settings store at the end of their session."""
+    store = _stores.pop(user_id, None)
+    if store:
+        store.close()
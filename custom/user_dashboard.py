@@ -1,10 +1,26 @@
 import customtkinter as ctk
 from PIL import Image
 import os
+import queue
+import threading
 from datetime import datetime
 from custom.navigation_frame_user import NavigationFrameUser
-from utils import connect_to_database, execute_query
+from utils import execute_query
 from CTkMessagebox import CTkMessagebox
+from custom.settings_store import get_settings_store, release_settings_store
+from custom.eta import get_eta_model
+from custom.order_feed import OrderFeedPoller, current_event_id
+from custom.menu_cache import get_menu_cache
+from custom.pricing import price_cart
+from custom.checkout import place_orders
+from custom.cart_store import CartStore, load_cart
+from custom.image_loader import decode_image, get_image_loader
+from custom.asset_manifest import get_asset_manifest
+from custom.frame_metrics import timed
+from custom.restaurant_search import LiveSearch
+from custom.facets import get_facet_index, restaurant_changed
+from custom.reviews import RATING_CHOICES, rating_summary, stars_text, submit_review
+from custom.ranking import PAGE_SIZE, SORT_OPTIONS, refresh_order_counts, restaurant_distances, sort_keys, top_k
 
 class UserDashboard(ctk.CTkFrame):
     """Dashboard for regular customers to browse restaurants and place orders."""
@@ -16,8 +32,12 @@ class UserDashboard(ctk.CTkFrame):
         self.user_id = user_id
         self.user_data = self.get_user_data()
         
-        # Initialize shopping cart
-        self.cart = []
+        # Restore the saved shopping cart; later changes are saved in the background
+        self.cart = load_cart(self.user_id)
+        self.cart_store = CartStore(self.user_id, self.cart)
+        
+        # Load the user's settings once for the whole session
+        self.settings_store = get_settings_store(self.user_id)
         
         # Configure this frame
         self.configure(fg_color="#f5f5f5")
@@ -56,6 +76,7 @@ class UserDashboard(ctk.CTkFrame):
         else:
             return {"FirstName": "User", "LastName": ""}
     
+    @timed
     def show_frame(self, frame_name, **kwargs):
         """Show selected frame and hide others."""
         # Hide all frames
@@ -92,6 +113,10 @@ class UserDashboard(ctk.CTkFrame):
             option_2="No"
         )
         if confirm.get() == "Yes":
+            if self.orders_frame.feed:
+                self.orders_frame.feed.stop()
+            self.cart_store.close()
+            release_settings_store(self.user_id)
             self.master.current_user = None
             self.master.user_role = None
             self.master.show_login_window()
@@ -104,17 +129,8 @@ class UserDashboard(ctk.CTkFrame):
         :param folder: Subfolder in static/images (restaurant or menu)
         :return: Full path to the image
         """
-        base_path = os.path.join('static', 'images', folder)
-        full_path = os.path.join(base_path, filename)
-        
-        # Fallback image if specific image not found
-        if not os.path.exists(full_path):
-            fallback_path = os.path.join(base_path, 'default.png')
-            if os.path.exists(fallback_path):
-                return fallback_path
-            return None
-        
-        return full_path
+        # Served from the in-memory manifest; no filesystem calls per card
+        return get_asset_manifest().image_path(filename, folder)
 class HomeFrame(ctk.CTkScrollableFrame):
     """Home screen with restaurant listings and search functionality."""
     def __init__(self, parent, controller):
@@ -140,8 +156,21 @@ class HomeFrame(ctk.CTkScrollableFrame):
             border_color="#e0e0e0"
         )
         self.search_entry.pack(pady=(0, 15))
+        
+        # Search as the user types; Return searches without waiting
+        self.live_search = LiveSearch(self, self.show_search_results)
+        self.search_entry.bind("<KeyRelease>", lambda e: self.live_search.update(self.search_entry.get()))
         self.search_entry.bind("<Return>", lambda e: self.search_restaurants())
         
+        # Sort order for the restaurant grid
+        self.sort_menu = ctk.CTkOptionMenu(
+            self,
+            values=list(SORT_OPTIONS),
+            command=self.change_sort,
+            width=180
+        )
+        self.sort_menu.pack(pady=(0, 15))
+        
         # Category buttons in horizontal row
         self.categories_frame = ctk.CTkFrame(self, fg_color="transparent")
         self.categories_frame.pack(pady=(0, 15))
@@ -163,7 +192,7 @@ class HomeFrame(ctk.CTkScrollableFrame):
             corner_radius=15,
             width=120,  # Make it wider than other category buttons
             height=30,
-            command=lambda: self.load_restaurants()
+            command=self.clear_cuisine_filter
         )
         all_btn.pack(side="left", padx=5)
         
@@ -190,18 +219,41 @@ class HomeFrame(ctk.CTkScrollableFrame):
         for i in range(3):
             self.restaurants_container.columnconfigure(i, weight=1, uniform="column")
         
+        # Cards currently shown, by RestaurantID, so the grid can be updated in place
+        self.restaurant_cards = {}
+        self.no_results_label = None
+        
+        # Current listing: rows, their sort keys, and how many are rendered
+        self.sort_option = SORT_OPTIONS[0]
+        self.distances = None
+        self.listing = []
+        self.listing_keys = []
+        self.empty_message = ""
+        self.shown_count = 0
+        
+        # Further pages are rendered on request, below the grid
+        self.show_more_button = ctk.CTkButton(
+            self,
+            text="Show more restaurants",
+            command=self.load_next_page,
+            fg_color="#3498db",
+            hover_color="#2980b9",
+            corner_radius=8,
+            height=36
+        )
+        
+        # Active filters: the selected cuisine and the live search results (None when off)
+        self.selected_cuisine = None
+        self.search_results = None
+        
         # Load all restaurants by default
         self.load_restaurants()
     
 
     
     def get_cuisines(self):
-        """Get unique cuisines from the database."""
-        query = "SELECT DISTINCT Cuisine FROM Restaurant WHERE Cuisine IS NOT NULL AND Cuisine != ''"
-        result = execute_query(query, fetch=True)
-        if result:
-            return [item["Cuisine"] for item in result]
-        return []
+        """Get cuisines from the facet index, most common first."""
+        return [cuisine for cuisine, _ in get_facet_index().cuisine_counts()]
     
     def adjust_color_brightness(self, hex_color, brightness_offset=0):
         """Adjust the brightness of a hex color."""
@@ -216,99 +268,193 @@ class HomeFrame(ctk.CTkScrollableFrame):
         return f'#{rgb[0]:02x}{rgb[1]:02x}{rgb[2]:02x}'
     
     def search_restaurants(self):
-        """Search restaurants by name or menu items."""
-        search_term = self.search_entry.get().strip()
-        if not search_term:
-            self.load_restaurants()
+        """Search restaurants by name or menu items right away."""
+        self.live_search.update(self.search_entry.get(), delay_ms=0)
+    
+    def show_search_results(self, search_term, restaurants):
+        """Show live search results (all restaurants when the search box is empty)."""
+        self.search_results = restaurants
+        if restaurants is None:
+            if self.selected_cuisine:
+                self.filter_by_cuisine(self.selected_cuisine)
+            else:
+                self.load_restaurants()
             return
-            
-        # Search in restaurant names and menu items
-        query = """
-            SELECT DISTINCT r.* FROM Restaurant r
-            LEFT JOIN Menu m ON r.RestaurantID = m.RestaurantID
-            WHERE r.Name LIKE %s OR m.ItemName LIKE %s OR r.Cuisine LIKE %s
-        """
-        search_pattern = f"%{search_term}%"
-        restaurants = execute_query(query, (search_pattern, search_pattern, search_pattern), fetch=True)
-        
-        # Clear existing restaurants
-        for widget in self.restaurants_container.winfo_children():
-            widget.destroy()
         
-        if restaurants and len(restaurants) > 0:
-            # Create a restaurant card for each restaurant in grid layout
-            row_size = 3  # Number of restaurants per row
-            for i, restaurant in enumerate(restaurants):
-                row = i // row_size
-                col = i % row_size
-                self.create_restaurant_card(restaurant, i, row, col)
-        else:
-            # No results found
-            no_results = ctk.CTkLabel(
-                self.restaurants_container,
-                text="No restaurants found matching your search.",
-                font=("Arial", 14),
-                text_color="#999999"
-            )
-            no_results.grid(row=0, column=0, columnspan=3, pady=50)
+        if self.selected_cuisine:
+            # Keep the search ranking, limited to the selected cuisine
+            cuisine_ids = get_facet_index().ids(self.selected_cuisine)
+            restaurants = [r for r in restaurants if r["RestaurantID"] in cuisine_ids]
+        self.show_restaurants(restaurants, "No restaurants found matching your search.")
     
     def filter_by_cuisine(self, cuisine):
-        """Filter restaurants by cuisine."""
-        query = "SELECT * FROM Restaurant WHERE Cuisine = %s"
-        restaurants = execute_query(query, (cuisine,), fetch=True)
-        
-        # Clear existing restaurants
-        for widget in self.restaurants_container.winfo_children():
-            widget.destroy()
-        
-        if restaurants and len(restaurants) > 0:
-            # Create a restaurant card for each restaurant in grid layout
-            row_size = 3  # Number of restaurants per row
-            for i, restaurant in enumerate(restaurants):
-                row = i // row_size
-                col = i % row_size
-                self.create_restaurant_card(restaurant, i, row, col)
+        """Filter restaurants by cuisine, within the current search results if any."""
+        self.selected_cuisine = cuisine
+        if self.search_results is not None:
+            self.show_search_results(self.search_entry.get().strip(), self.search_results)
+            return
+        restaurants = get_facet_index().filter(cuisine)
+        self.show_restaurants(restaurants, f"No restaurants found with cuisine: {cuisine}")
+    
+    def clear_cuisine_filter(self):
+        """Show every cuisine again (still within the current search, if any)."""
+        self.selected_cuisine = None
+        if self.search_results is not None:
+            self.show_search_results(self.search_entry.get().strip(), self.search_results)
         else:
-            # No results found
-            no_results = ctk.CTkLabel(
-                self.restaurants_container,
-                text=f"No restaurants found with cuisine: {cuisine}",
-                font=("Arial", 14),
-                text_color="#999999"
-            )
-            no_results.grid(row=0, column=0, columnspan=3, pady=50)
+            self.load_restaurants()
     
+    @timed
     def load_restaurants(self):
         """Load all restaurants."""
-        # Clear existing restaurants
-        for widget in self.restaurants_container.winfo_children():
-            widget.destroy()
+        self.selected_cuisine = None
         
         # Get restaurants from database
         restaurants = self.get_restaurants()
         
+        # Pick up orders delivered since the delivery estimates were last built
+        get_eta_model().refresh_in_background()
+        
+        self.show_restaurants(restaurants, "No restaurants available.")
+    
+    def show_restaurants(self, restaurants, empty_message):
+        """
+        List restaurants in the current sort order and render the first page.
+        
+        Sort keys are computed once here; each page then takes the top
+        restaurants with a heap instead of sorting the whole list.
+        """
+        self.listing = restaurants
+        self.listing_keys = sort_keys(restaurants, self.sort_option, self.distances)
+        self.empty_message = empty_message
+        self.render_restaurants(PAGE_SIZE)
+        self.scroll_to_top()
+    
+    def scroll_to_top(self):
+        """Scroll the home screen back to the top, if this customtkinter version allows it."""
+        # CTkScrollableFrame has no public scrolling API; skip quietly if its canvas moves
+        canvas = getattr(self, "_parent_canvas", None)
+        if canvas is not None:
+            try:
+                canvas.yview_moveto(0)
+            except Exception:
+                pass
+    
+    def load_next_page(self):
+        """Render one more page of the current listing, if there is one."""
+        if self.shown_count < len(self.listing):
+            self.render_restaurants(self.shown_count + PAGE_SIZE)
+    
+    def update_show_more_button(self):
+        """Show the "Show more" button only while part of the listing is not rendered."""
+        remaining = len(self.listing) - self.shown_count
+        if remaining > 0:
+            self.show_more_button.configure(text=f"Show more restaurants ({remaining})")
+            self.show_more_button.pack(pady=(0, 20))
+        else:
+            self.show_more_button.pack_forget()
+    
+    def render_restaurants(self, count):
+        """
+        Show the first `count` restaurants of the listing, reusing the cards already on screen.
+        
+        Cards for restaurants that are no longer shown are destroyed, cards
+        whose restaurant and delivery estimate are unchanged are only moved
+        to their new grid cell, and the rest are created.
+        """
+        if self.no_results_label:
+            self.no_results_label.destroy()
+            self.no_results_label = None
+        
+        restaurants = top_k(self.listing, self.listing_keys, count)
+        self.shown_count = len(restaurants)
+        self.update_show_more_button()
+        
+        listed = {restaurant["RestaurantID"] for restaurant in restaurants}
+        for restaurant_id in list(self.restaurant_cards):
+            if restaurant_id not in listed:
+                self.restaurant_cards.pop(restaurant_id)[0].destroy()
+        
         if not restaurants:
             # No restaurants found
-            no_results = ctk.CTkLabel(
+            self.no_results_label = ctk.CTkLabel(
                 self.restaurants_container,
-                text="No restaurants available.",
+                text=self.empty_message,
                 font=("Arial", 14),
                 text_color="#999999"
             )
-            no_results.grid(row=0, column=0, columnspan=3, pady=50)
+            self.no_results_label.grid(row=0, column=0, columnspan=3, pady=50)
             return
         
-        # Create a restaurant card for each restaurant in a grid layout
+        # Place a restaurant card for each restaurant in a grid layout
+        get_image_loader().new_batch()
         row_size = 3  # Number of restaurants per row
         for i, restaurant in enumerate(restaurants):
             row = i // row_size
             col = i % row_size
-            self.create_restaurant_card(restaurant, i, row, col)
+            version = (
+                restaurant["Name"],
+                restaurant.get("UpdatedAt"),
+                restaurant.get("RatingCount"),
+                get_eta_model().predict_minutes(restaurant["RestaurantID"])
+            )
+            existing = self.restaurant_cards.get(restaurant["RestaurantID"])
+            if existing and existing[1] == version:
+                existing[0].grid(row=row, column=col)
+                continue
+            if existing:
+                existing[0].destroy()
+            card = self.create_restaurant_card(restaurant, i, row, col)
+            self.restaurant_cards[restaurant["RestaurantID"]] = (card, version)
+    
+    def change_sort(self, option):
+        """Re-rank the current listing by a different ordering."""
+        self.sort_option = option
+        if option == "Distance" and self.distances is None:
+            self.start_distance_lookup()
+        elif option == "Popularity":
+            self.start_popularity_lookup()
+        self.show_restaurants(self.listing, self.empty_message)
+    
+    def start_popularity_lookup(self):
+        """Re-read order counts in the background if they are stale, then re-rank."""
+        results = queue.Queue()
+        threading.Thread(target=lambda: results.put(refresh_order_counts()), daemon=True).start()
+        
+        def check():
+            try:
+                refreshed = results.get_nowait()
+            except queue.Empty:
+                self.after(200, check)
+                return
+            if refreshed and self.sort_option == "Popularity":
+                self.show_restaurants(self.listing, self.empty_message)
+        self.after(200, check)
+    
+    def start_distance_lookup(self):
+        """Geocode the customer and the restaurants in the background, then re-rank."""
+        address = self.controller.user_data.get("Address")
+        restaurants = get_facet_index().rows()
+        results = queue.Queue()
+        threading.Thread(
+            target=lambda: results.put(restaurant_distances(address, restaurants)),
+            daemon=True
+        ).start()
+        
+        def check():
+            try:
+                # Nothing located (e.g. geocoder unreachable): try again next time Distance is picked
+                self.distances = results.get_nowait() or None
+            except queue.Empty:
+                self.after(200, check)
+                return
+            if self.sort_option == "Distance":
+                self.show_restaurants(self.listing, self.empty_message)
+        self.after(200, check)
     
     def get_restaurants(self):
-        """Fetch restaurant data from database."""
-        query = "SELECT * FROM Restaurant ORDER BY Name"
-        return execute_query(query, fetch=True) or []
+        """Return every restaurant, ordered by name, from the facet index."""
+        return get_facet_index().rows()
     
     def create_restaurant_card(self, restaurant, index, row=0, col=0):
         """Create a card displaying restaurant information with actual image."""
@@ -331,47 +477,36 @@ class HomeFrame(ctk.CTkScrollableFrame):
         image_frame.pack(padx=0, pady=0)
         image_frame.restaurant_id = restaurant["RestaurantID"]
         
-        # Try to load restaurant image
+        # Grey placeholder with text until (or unless) the image is loaded
+        placeholder_label = ctk.CTkLabel(
+            image_frame,
+            text=f"Restaurant {restaurant['RestaurantID']}",
+            font=("Arial", 16),
+            text_color="#888888"
+        )
+        placeholder_label.place(relx=0.5, rely=0.5, anchor="center")
+        placeholder_label.restaurant_id = restaurant["RestaurantID"]
+        
+        def show_image(image):
+            if image is None:
+                return
+            placeholder_label.destroy()
+            image_label = ctk.CTkLabel(
+                image_frame, 
+                image=image, 
+                text=""
+            )
+            image_label.pack(fill="both", expand=True)
+            image_label.restaurant_id = restaurant["RestaurantID"]
+        
+        # Load the restaurant image in the background; earlier cards (the
+        # top rows, which are visible first) are decoded first
         image_filename = f"restaurant_{restaurant['RestaurantID']}.png"
         image_path = self.controller.get_image_path(image_filename)
-        
         if image_path:
-            try:
-                # Use CTkImage for proper scaling
-                image = ctk.CTkImage(
-                    light_image=Image.open(image_path),
-                    size=(300, 180)
-                )
-                
-                # Create label with image
-                image_label = ctk.CTkLabel(
-                    image_frame, 
-                    image=image, 
-                    text=""
-                )
-                image_label.pack(fill="both", expand=True)
-                image_label.restaurant_id = restaurant["RestaurantID"]
-            except Exception as e:
-                print(f"Error loading image: {e}")
-                # Fallback to placeholder if image fails to load
-                name_label = ctk.CTkLabel(
-                    image_frame,
-                    text=f"Restaurant {restaurant['RestaurantID']}",
-                    font=("Arial", 16),
-                    text_color="#888888"
-                )
-                name_label.place(relx=0.5, rely=0.5, anchor="center")
-                name_label.restaurant_id = restaurant["RestaurantID"]
-        else:
-            # No image found, use grey placeholder with text
-            name_label = ctk.CTkLabel(
-                image_frame,
-                text=f"Restaurant {restaurant['RestaurantID']}",
-                font=("Arial", 16),
-                text_color="#888888"
-            )
-            name_label.place(relx=0.5, rely=0.5, anchor="center")
-            name_label.restaurant_id = restaurant["RestaurantID"]
+            image = get_image_loader().load(image_frame, image_path, (300, 180), show_image, priority=index)
+            if image:
+                show_image(image)
         
         # Restaurant name (large, bold)
         name_label = ctk.CTkLabel(
@@ -384,19 +519,9 @@ class HomeFrame(ctk.CTkScrollableFrame):
         name_label.pack(anchor="w", padx=15, pady=(10, 0))
         name_label.restaurant_id = restaurant["RestaurantID"]
         
-        # Star rating display
-        ratings = {"Pizza Place": 4.4, "Burger Haven": 4.5, "Sweet Treats": 3.5}
-        rating_value = ratings.get(restaurant["Name"], round(3.5 + (index % 15) / 10, 1))  # Fallback to generated rating
-        
-        # Create star rating with Unicode stars
-        rating_text = ""
-        for i in range(5):
-            if i < int(rating_value):
-                rating_text += "★"  # Full star
-            elif i < rating_value:
-                rating_text += "★"  # Should be half star but using full for simplicity
-            else:
-                rating_text += "☆"  # Empty star
+        # Star rating from the restaurant's running rating totals (loaded with the row)
+        rating_value, rating_count = rating_summary(restaurant)
+        rating_text = stars_text(rating_value)
                 
         rating_frame = ctk.CTkFrame(card, fg_color="transparent")
         rating_frame.pack(fill="x", anchor="w", padx=15, pady=(5, 0))
@@ -414,7 +539,7 @@ class HomeFrame(ctk.CTkScrollableFrame):
         
         rating_number = ctk.CTkLabel(
             rating_frame,
-            text=f"({rating_value})",
+            text=f"({rating_value} · {rating_count})" if rating_count else "(No ratings yet)",
             font=("Arial", 12),
             text_color="#666666",
             anchor="w"
@@ -422,9 +547,8 @@ class HomeFrame(ctk.CTkScrollableFrame):
         rating_number.pack(side="left", padx=(5, 0))
         rating_number.restaurant_id = restaurant["RestaurantID"]
         
-        # Delivery time 
-        delivery_times = {"Pizza Place": 30, "Burger Haven": 25, "Sweet Treats": 20}
-        delivery_time = delivery_times.get(restaurant["Name"], 20 + (index % 3) * 5)
+        # Delivery time predicted from this restaurant's delivered orders
+        delivery_time = get_eta_model().predict_minutes(restaurant["RestaurantID"])
         
         delivery_label = ctk.CTkLabel(
             card,
@@ -462,6 +586,8 @@ class HomeFrame(ctk.CTkScrollableFrame):
         # Simplified hover effect - only change the outer card color
         outer_card.bind("<Enter>", lambda e: outer_card.configure(cursor="hand2"))
         outer_card.bind("<Leave>", lambda e: outer_card.configure(cursor=""))
+        
+        return outer_card
     
     def view_restaurant_menu(self, restaurant_id):
         """Open the restaurant menu screen."""
@@ -514,12 +640,14 @@ class RestaurantMenuFrame(ctk.CTkScrollableFrame):
         self.menu_items_frame.pack(fill="both", expand=True, padx=10)
     
     # Update the load_restaurant method in RestaurantMenuFrame class
+    @timed
     def load_restaurant(self, restaurant_id):
         """Load restaurant information and menu items."""
         self.current_restaurant_id = restaurant_id
         
-        # Get restaurant data
-        restaurant = self.get_restaurant_data(restaurant_id)
+        # Get restaurant data and menu from one (validated) snapshot
+        snapshot = get_menu_cache().get(restaurant_id)
+        restaurant = snapshot.restaurant if snapshot else None
         if restaurant:
             # Update top frame with restaurant banner
             self.top_frame.configure(height=180)
@@ -549,7 +677,7 @@ class RestaurantMenuFrame(ctk.CTkScrollableFrame):
                 try:
                     # Load and resize image
                     banner_image = ctk.CTkImage(
-                        light_image=Image.open(image_path),
+                        light_image=decode_image(image_path, (400, 150)),
                         size=(400, 150)
                     )
                     banner_label = ctk.CTkLabel(
@@ -604,7 +732,7 @@ class RestaurantMenuFrame(ctk.CTkScrollableFrame):
                 widget.destroy()
             
             # Load menu items
-            menu_items = self.get_menu_items(restaurant_id)
+            menu_items = snapshot.items
             
             if not menu_items:
                 no_menu = ctk.CTkLabel(
@@ -626,12 +754,13 @@ class RestaurantMenuFrame(ctk.CTkScrollableFrame):
             parent.grid_columnconfigure(i, weight=1, uniform="column")
         
         # Create menu items
+        get_image_loader().new_batch()
         for i, item in enumerate(items):
             row = i // 3
             col = i % 3
-            self.create_menu_item(parent, item, row, col)
+            self.create_menu_item(parent, item, row, col, priority=i)
     
-    def create_menu_item(self, parent, item, row, col):
+    def create_menu_item(self, parent, item, row, col, priority=0):
         """Create a menu item card with actual image."""
         # Item frame
         item_frame = ctk.CTkFrame(parent, corner_radius=10, fg_color="white", width=100, height=200)
@@ -641,41 +770,33 @@ class RestaurantMenuFrame(ctk.CTkScrollableFrame):
         image_frame = ctk.CTkFrame(item_frame, width=100, height=100, fg_color="#e0e0e0")
         image_frame.pack(fill="x", padx=5, pady=5)
         
-        # Try to load menu item image
+        # Text placeholder until (or unless) the image is loaded
+        placeholder_label = ctk.CTkLabel(
+            image_frame,
+            text="Food",
+            font=("Arial", 20, "bold"),
+            text_color="#888888"
+        )
+        placeholder_label.place(relx=0.5, rely=0.5, anchor="center")
+        
+        def show_image(image):
+            if image is None:
+                return
+            placeholder_label.destroy()
+            image_label = ctk.CTkLabel(
+                image_frame, 
+                image=image, 
+                text=""
+            )
+            image_label.pack(expand=True, fill="both")
+        
+        # Load the menu item image in the background
         image_filename = f"menu_item_{item['MenuID']}.jpg"
         image_path = self.controller.get_image_path(image_filename, folder='menu')
-        
         if image_path:
-            try:
-                # Load and resize image
-                image = ctk.CTkImage(
-                    light_image=Image.open(image_path),
-                    size=(100, 100)
-                )
-                image_label = ctk.CTkLabel(
-                    image_frame, 
-                    image=image, 
-                    text=""
-                )
-                image_label.pack(expand=True, fill="both")
-            except Exception as e:
-                # Fallback to text placeholder if image loading fails
-                placeholder_label = ctk.CTkLabel(
-                    image_frame,
-                    text="Food",
-                    font=("Arial", 20, "bold"),
-                    text_color="#888888"
-                )
-                placeholder_label.place(relx=0.5, rely=0.5, anchor="center")
-        else:
-            # No image found, use text placeholder
-            placeholder_label = ctk.CTkLabel(
-                image_frame,
-                text="Food",
-                font=("Arial", 20, "bold"),
-                text_color="#888888"
-            )
-            placeholder_label.place(relx=0.5, rely=0.5, anchor="center")
+            image = get_image_loader().load(image_frame, image_path, (100, 100), show_image, priority=priority)
+            if image:
+                show_image(image)
         
         # Item name
         name_label = ctk.CTkLabel(
@@ -720,41 +841,36 @@ class RestaurantMenuFrame(ctk.CTkScrollableFrame):
         add_button.pack(pady=10)
     
     def get_restaurant_data(self, restaurant_id):
-        """Get restaurant data from database."""
-        query = "SELECT * FROM Restaurant WHERE RestaurantID = %s"
-        result = execute_query(query, (restaurant_id,), fetch=True)
-        
-        if result and len(result) > 0:
-            return result[0]
-        return None
+        """Get restaurant data from the menu cache."""
+        snapshot = get_menu_cache().get(restaurant_id)
+        return snapshot.restaurant if snapshot else None
     
     def get_menu_items(self, restaurant_id):
-        """Get menu items for the restaurant."""
-        query = "SELECT * FROM Menu WHERE RestaurantID = %s"
-        return execute_query(query, (restaurant_id,), fetch=True) or []
+        """Get menu items for the restaurant from the menu cache."""
+        snapshot = get_menu_cache().get(restaurant_id)
+        return snapshot.items if snapshot else []
     
     def add_to_cart(self, item):
         """Add item to cart."""
         # Check if item is already in cart
-        for cart_item in self.controller.cart:
-            if cart_item["MenuID"] == item["MenuID"]:
-                # Just increment quantity
-                cart_item["Quantity"] += 1
-                CTkMessagebox(
-                    title="Added to Cart",
-                    message=f"{item['ItemName']} quantity increased in your cart.",
-                    icon="check",
-                    option_1="OK"
-                )
-                return
+        if item["MenuID"] in self.controller.cart:
+            # Just increment quantity
+            self.controller.cart.change_quantity(item["MenuID"], 1)
+            CTkMessagebox(
+                title="Added to Cart",
+                message=f"{item['ItemName']} quantity increased in your cart.",
+                icon="check",
+                option_1="OK"
+            )
+            return
         
         # Add new item to cart
-        self.controller.cart.append({
-            "MenuID": item["MenuID"],
-            "ItemName": item["ItemName"],
-            "Price": float(item["Price"]),
-            "Quantity": 1
-        })
+        self.controller.cart.add(
+            item["MenuID"],
+            item["ItemName"],
+            item["Price"],
+            restaurant_id=item.get("RestaurantID")
+        )
         
         # Show confirmation
         CTkMessagebox(
@@ -824,12 +940,17 @@ class CartFrame(ctk.CTkFrame):
         )
         self.checkout_button.pack(pady=(10, 20))
     
+    @timed
     def refresh_cart(self):
         """Refresh cart items display."""
         # Clear existing items
         for widget in self.cart_items_frame.winfo_children():
             widget.destroy()
         
+        # Widgets of each displayed line and restaurant heading, kept out of the cart data
+        self.line_widgets = {}
+        self.group_headers = {}
+        
         # Get cart
         cart = self.controller.cart
         
@@ -847,13 +968,29 @@ class CartFrame(ctk.CTkFrame):
             self.update_total(0)
             return
         
-        # Add items to display
+        # Add items to display, grouped by restaurant (each becomes its own order)
+        groups = {}
         for item in cart:
-            self.create_cart_item(item)
+            if item["RestaurantID"] is None:
+                item["RestaurantID"] = self.get_restaurant_id_from_menu(item["MenuID"])
+            groups.setdefault(item["RestaurantID"], []).append(item)
+        
+        for restaurant_id, items in groups.items():
+            if len(groups) > 1:
+                snapshot = get_menu_cache().get(restaurant_id, validate=False) if restaurant_id else None
+                restaurant_label = ctk.CTkLabel(
+                    self.cart_items_frame,
+                    text=snapshot.restaurant["Name"] if snapshot else "Other items",
+                    font=("Arial", 16, "bold"),
+                    text_color="#333333"
+                )
+                restaurant_label.pack(anchor="w", padx=5, pady=(10, 0))
+                self.group_headers[restaurant_id] = [restaurant_label, len(items)]
+            for item in items:
+                self.create_cart_item(item)
         
         # Update total
-        total = sum(item["Price"] * item["Quantity"] for item in cart)
-        self.update_total(total)
+        self.update_total(cart.total)
     
     def create_cart_item(self, item):
         """Create a cart item display with actual image."""
@@ -873,7 +1010,7 @@ class CartFrame(ctk.CTkFrame):
             try:
                 # Load and resize image
                 image = ctk.CTkImage(
-                    light_image=Image.open(image_path),
+                    light_image=decode_image(image_path, (60, 60)),
                     size=(60, 60)
                 )
                 image_label = ctk.CTkLabel(
@@ -929,7 +1066,7 @@ class CartFrame(ctk.CTkFrame):
             fg_color="#f2f2f2",
             hover_color="#e0e0e0",
             text_color="#333333",
-            command=lambda i=item: self.update_quantity(i, -1)
+            command=lambda m_id=item["MenuID"]: self.update_quantity(m_id, -1)
         )
         decrease_btn.pack(side="left", padx=(0, 5))
         
@@ -952,7 +1089,7 @@ class CartFrame(ctk.CTkFrame):
             fg_color="#f2f2f2",
             hover_color="#e0e0e0",
             text_color="#333333",
-            command=lambda i=item: self.update_quantity(i, 1)
+            command=lambda m_id=item["MenuID"]: self.update_quantity(m_id, 1)
         )
         increase_btn.pack(side="left", padx=(5, 0))
 
@@ -966,26 +1103,28 @@ class CartFrame(ctk.CTkFrame):
             fg_color="#F44336",
             hover_color="#D32F2F",
             text_color="white",
-            command=lambda i=item: self.delete_item(i)
+            command=lambda m_id=item["MenuID"]: self.delete_item(m_id)
         )
         delete_btn.pack(side="right", padx=10)
         
-        # Store reference to quantity label in item for updates
-        item["quantity_label"] = quantity_label
+        # Keep widget references for in-place updates
+        self.line_widgets[item["MenuID"]] = {
+            "frame": item_frame,
+            "quantity_label": quantity_label,
+            "restaurant_id": item["RestaurantID"]
+        }
     
-    def update_quantity(self, item, change):
+    def update_quantity(self, menu_id, change):
         """Update item quantity when + or - is clicked."""
-        new_quantity = max(1, item["Quantity"] + change)
-        item["Quantity"] = new_quantity
+        line = self.controller.cart.change_quantity(menu_id, change)
         
         # Update displayed quantity
-        if "quantity_label" in item:
-            item["quantity_label"].configure(text=str(new_quantity))
+        widgets = self.line_widgets.get(menu_id)
+        if widgets:
+            widgets["quantity_label"].configure(text=str(line["Quantity"]))
         
-        # Update total
-        cart = self.controller.cart
-        total = sum(item["Price"] * item["Quantity"] for item in cart)
-        self.update_total(total)
+        # Update total (kept running by the cart)
+        self.update_total(self.controller.cart.total)
     
     def update_total(self, total):
         """Update the total amount displayed."""
@@ -1004,63 +1143,73 @@ class CartFrame(ctk.CTkFrame):
             )
             return
         
+        # Re-price the whole cart against the current menu (one query)
+        pricing = price_cart(cart)
+        if pricing is None:
+            CTkMessagebox(
+                title="Order Error",
+                message="Could not check current prices. Please try again.",
+                icon="cancel",
+                option_1="OK"
+            )
+            return
+        
+        if not pricing.ok:
+            # Drop items that can no longer be ordered and let the customer review the cart
+            for menu_id, _ in pricing.unavailable:
+                cart.remove(menu_id)
+            self.refresh_cart()
+            CTkMessagebox(
+                title="Cart Updated",
+                message=f"Some items were removed from your cart:\n\n{pricing.describe_changes()}",
+                icon="warning",
+                option_1="OK"
+            )
+            return
+        
+        message = "Proceed with your order?"
+        if pricing.price_changes:
+            # Show the customer what they will actually pay
+            for line in pricing.lines:
+                cart.set_price(line["MenuID"], line["UnitPrice"])
+            self.refresh_cart()
+            message = (
+                f"Some prices have changed:\n\n{pricing.describe_changes()}\n\n"
+                f"New total: ${pricing.total:.2f}. Proceed with your order?"
+            )
+        
         # Show confirmation and process order
         confirm = CTkMessagebox(
             title="Confirm Order",
-            message="Proceed with your order?",
+            message=message,
             icon="question",
             option_1="Yes",
             option_2="No"
         )
         
         if confirm.get() == "Yes":
-            # Calculate total price
-            total_amount = sum(item["Price"] * item["Quantity"] for item in cart)
+            # One order per restaurant, all placed in a single transaction
+            order_ids = place_orders(self.controller.user_id, pricing)
             
-            # Get user ID and restaurant ID (assuming all items from same restaurant)
-            user_id = self.controller.user_id
-            restaurant_id = self.get_restaurant_id_from_menu(cart[0]["MenuID"])
-            
-            if not restaurant_id:
+            if order_ids:
                 CTkMessagebox(
-                    title="Order Error",
-                    message="Could not determine restaurant. Please try again.",
-                    icon="cancel",
+                    title="Order Placed",
+                    message=(
+                        "Your order has been placed successfully!" if len(order_ids) == 1
+                        else f"Your {len(order_ids)} orders have been placed successfully (one per restaurant)!"
+                    ),
+                    icon="check",
                     option_1="OK"
                 )
-                return
                 
-            # Insert order in database
-            order_id = self.create_order(user_id, restaurant_id, total_amount)
-            
-            if order_id:
-                # Insert order items
-                success = self.create_order_items(order_id, cart)
+                # Clear cart
+                self.controller.cart.clear()
                 
-                if success:
-                    CTkMessagebox(
-                        title="Order Placed",
-                        message="Your order has been placed successfully!",
-                        icon="check",
-                        option_1="OK"
-                    )
-                    
-                    # Clear cart
-                    self.controller.cart = []
-                    
-                    # Show empty cart
-                    self.refresh_cart()
-                    
-                    # Navigate to orders page to see the order
-                    self.controller.show_frame("orders")
-                else:
-                    # Report error
-                    CTkMessagebox(
-                        title="Order Error",
-                        message="There was an error processing your order items.",
-                        icon="cancel",
-                        option_1="OK"
-                    )
+                # Show empty cart
+                self.refresh_cart()
+                
+                # Navigate to orders page to see the order
+                self.controller.show_frame("orders")
             else:
                 # Report error
                 CTkMessagebox(
@@ -1072,63 +1221,30 @@ class CartFrame(ctk.CTkFrame):
     
     def get_restaurant_id_from_menu(self, menu_id):
         """Get restaurant ID from a menu item ID."""
-        query = "SELECT RestaurantID FROM Menu WHERE MenuID = %s"
-        result = execute_query(query, (menu_id,), fetch=True)
-        
-        if result and len(result) > 0:
-            return result[0]["RestaurantID"]
-        return None
-    
-    def create_order(self, user_id, restaurant_id, total_amount):
-        """Create a new order in the database."""
-        query = """
-            INSERT INTO `Order` (UserID, RestaurantID, TotalAmount, OrderStatus, OrderDate)
-            VALUES (%s, %s, %s, 'pending', NOW())
-        """
-        try:
-            conn = connect_to_database()
-            cursor = conn.cursor()
-            cursor.execute(query, (user_id, restaurant_id, total_amount))
-            order_id = cursor.lastrowid
-            conn.commit()
-            cursor.close()
-            conn.close()
-            return order_id
-        except Exception as e:
-            print(f"Database error creating order: {e}")
-            return None
+        return get_menu_cache().restaurant_id_for(menu_id)
     
-    def create_order_items(self, order_id, cart):
-        """Create order items in the database."""
-        try:
-            conn = connect_to_database()
-            cursor = conn.cursor()
-            
-            for item in cart:
-                query = """
-                    INSERT INTO OrderItem (OrderID, MenuID, Quantity, Subtotal)
-                    VALUES (%s, %s, %s, %s)
-                """
-                subtotal = item["Price"] * item["Quantity"]
-                cursor.execute(query, (order_id, item["MenuID"], item["Quantity"], subtotal))
-            
-            conn.commit()
-            cursor.close()
-            conn.close()
-            return True
-        except Exception as e:
-            print(f"Database error creating order items: {e}")
-            return False
-    def delete_item(self, item):
+    def delete_item(self, menu_id):
         """Remove item from cart."""
-        # Find and remove item from cart
-        for i, cart_item in enumerate(self.controller.cart):
-            if cart_item["MenuID"] == item["MenuID"]:
-                self.controller.cart.pop(i)
-                break
+        cart = self.controller.cart
+        cart.remove(menu_id)
         
-        # Refresh cart display
-        self.refresh_cart()
+        if not cart:
+            # Show the empty cart message
+            self.refresh_cart()
+            return
+        
+        # Remove just this line (and its restaurant heading if it was the last one)
+        widgets = self.line_widgets.pop(menu_id, None)
+        if widgets:
+            widgets["frame"].destroy()
+            header = self.group_headers.get(widgets["restaurant_id"])
+            if header:
+                header[1] -= 1
+                if header[1] == 0:
+                    header[0].destroy()
+                    del self.group_headers[widgets["restaurant_id"]]
+        
+        self.update_total(cart.total)
 
 class OrdersFrame(ctk.CTkScrollableFrame):
     """Orders screen showing past and current orders."""
@@ -1149,9 +1265,22 @@ class OrdersFrame(ctk.CTkScrollableFrame):
         self.order_container = ctk.CTkFrame(self, fg_color="white", corner_radius=15)
         self.order_container.pack(fill="x", padx=15, pady=10)
         
+        # Order currently on screen
+        self.current_order = None
+        
+        # Follow status changes of this user's orders
+        self.feed = None
+        user_id = self.controller.user_id
+        since_event_id = current_event_id("user", user_id) if user_id else None
+        
         # Initialize with mock order or empty state
         self.refresh_orders()
+        
+        if user_id:
+            self.feed = OrderFeedPoller(self, "user", user_id, self.apply_order_changes)
+            self.feed.start(since_event_id)
     
+    @timed
     def refresh_orders(self):
         """Refresh orders display."""
         # Clear container
@@ -1160,6 +1289,7 @@ class OrdersFrame(ctk.CTkScrollableFrame):
         
         # Fetch orders from database
         orders = self.get_orders()
+        self.current_order = orders[0] if orders else None
         
         if not orders:
             # No orders
@@ -1175,15 +1305,31 @@ class OrdersFrame(ctk.CTkScrollableFrame):
         # Display first (most recent) order
         self.display_order(orders[0])
     
+    def apply_order_changes(self, changes):
+        """Redraw the tracked order when the order feed reports a change."""
+        current_id = self.current_order["OrderID"] if self.current_order else 0
+        
+        # A newer order (e.g. placed from another session) takes over the screen
+        if any(order_id > current_id for order_id in changes):
+            self.refresh_orders()
+            return
+        
+        if current_id in changes:
+            self.current_order["OrderStatus"] = changes[current_id]
+            for widget in self.order_container.winfo_children():
+                widget.destroy()
+            self.display_order(self.current_order)
+    
     def get_orders(self):
         """Get orders from database."""
         # Try to fetch from database based on user_id
         user_id = self.controller.user_id
         if user_id:
             query = """
-                SELECT o.*, r.Name as RestaurantName 
+                SELECT o.*, r.Name as RestaurantName, d.EstimatedTime
                 FROM `Order` o
                 JOIN Restaurant r ON o.RestaurantID = r.RestaurantID
+                LEFT JOIN Delivery d ON d.OrderID = o.OrderID AND d.IsActive = True
                 WHERE o.UserID = %s
                 ORDER BY o.OrderDate DESC
             """
@@ -1229,19 +1375,25 @@ class OrdersFrame(ctk.CTkScrollableFrame):
         )
         delivery_label.pack(side="left")
         
-        # Calculate estimated time (15-45 minutes from order time)
+        # Use the dispatcher's estimate, otherwise predict from delivery history
         import datetime
-        if "OrderDate" in order:
-            from datetime import datetime, timedelta
+        if order.get("EstimatedTime"):
+            # Set by the dispatcher once a courier is assigned
+            time_str = order["EstimatedTime"].strftime("%H:%M")
+        elif "OrderDate" in order:
+            from datetime import datetime
             try:
                 order_time = datetime.strptime(str(order["OrderDate"]), "%Y-%m-%d %H:%M:%S")
-                delivery_time = order_time + timedelta(minutes=30)
+                delivery_time = get_eta_model().predict_arrival(order["RestaurantID"], order_time)
                 time_str = delivery_time.strftime("%H:%M")
             except Exception:
                 time_str = "15:00"  # Fallback
         else:
             time_str = "15:00"  # Fallback
         
+        if order.get("OrderStatus") == "cancelled":
+            time_str = "Cancelled"
+        
         time_label = ctk.CTkLabel(
             delivery_frame,
             text=time_str,
@@ -1269,6 +1421,7 @@ class OrdersFrame(ctk.CTkScrollableFrame):
         status_map = {
             "pending": "Order Placed",
             "preparing": "Preparing",
+            "shipped": "Out for Delivery",
             "shipping": "Out for Delivery",
             "delivered": "Delivered"
         }
@@ -1342,7 +1495,7 @@ class OrdersFrame(ctk.CTkScrollableFrame):
                 try:
                     # Load and resize image
                     image = ctk.CTkImage(
-                        light_image=Image.open(image_path),
+                        light_image=decode_image(image_path, (60, 60)),
                         size=(60, 60)
                     )
                     image_label = ctk.CTkLabel(
@@ -1409,7 +1562,7 @@ class OrdersFrame(ctk.CTkScrollableFrame):
         # Try to load a map image
         map_path = os.path.join('static', 'images', 'Map.png')
         
-        if os.path.exists(map_path):
+        if get_asset_manifest().exists(map_path):
             try:
                 map_image = ctk.CTkImage(
                     light_image=Image.open(map_path),
@@ -1566,9 +1719,11 @@ class ProfileFrame(ctk.CTkScrollableFrame):
             return []
             
         query = """
-            SELECT o.OrderID, o.TotalAmount, o.OrderDate, r.Name as restaurant
+            SELECT o.OrderID, o.RestaurantID, o.TotalAmount, o.OrderDate, o.OrderStatus, r.Name as restaurant,
+                   rv.Rating
             FROM `Order` o
             JOIN Restaurant r ON o.RestaurantID = r.RestaurantID
+            LEFT JOIN Review rv ON rv.OrderID = o.OrderID
             WHERE o.UserID = %s
             ORDER BY o.OrderDate DESC
             LIMIT 3
@@ -1599,7 +1754,7 @@ class ProfileFrame(ctk.CTkScrollableFrame):
                 
                 if image_path:
                     image = ctk.CTkImage(
-                        light_image=Image.open(image_path),
+                        light_image=decode_image(image_path, (60, 60)),
                         size=(60, 60)
                     )
                     image_label = ctk.CTkLabel(
@@ -1671,6 +1826,85 @@ class ProfileFrame(ctk.CTkScrollableFrame):
             width=card.winfo_width() - 30
         )
         reorder.pack(fill="x", padx=15, pady=(0, 10))
+        
+        # Rating: stars once rated, otherwise a button for delivered orders
+        if order.get("Rating"):
+            ctk.CTkLabel(
+                card,
+                text=f"Your rating: {stars_text(order['Rating'])}",
+                font=("Arial", 13),
+                text_color="#FFC107"
+            ).pack(anchor="w", padx=15, pady=(0, 10))
+        elif order.get("OrderStatus") == "delivered":
+            rate_button = ctk.CTkButton(
+                card,
+                text="Rate Order",
+                fg_color="#FFC107",
+                hover_color="#FFA000",
+                text_color="#333333",
+                corner_radius=5,
+                font=("Arial", 14),
+                height=35
+            )
+            rate_button.configure(command=lambda o=order, b=rate_button: self.rate_order(o, b))
+            rate_button.pack(fill="x", padx=15, pady=(0, 10))
+    
+    def rate_order(self, order, rate_button):
+        """Open a dialog to rate a delivered order."""
+        dialog = ctk.CTkToplevel(self)
+        dialog.title("Rate Order")
+        x = (dialog.winfo_screenwidth() - 400) // 2
+        y = (dialog.winfo_screenheight() - 330) // 2
+        dialog.geometry(f"400x330+{x}+{y}")
+        dialog.resizable(False, False)
+        dialog.transient(self.master)
+        dialog.grab_set()
+        
+        ctk.CTkLabel(
+            dialog,
+            text=f"How was your order from {order.get('restaurant', 'the restaurant')}?",
+            font=("Arial", 16, "bold"),
+            text_color="#333333",
+            wraplength=360
+        ).pack(pady=(20, 15))
+        
+        rating_var = ctk.StringVar(value="5")
+        ctk.CTkSegmentedButton(
+            dialog,
+            values=[str(rating) for rating in RATING_CHOICES],
+            variable=rating_var,
+            width=300
+        ).pack(pady=(0, 15))
+        
+        ctk.CTkLabel(dialog, text="Comment (Optional):", anchor="w").pack(anchor="w", padx=30)
+        comment_box = ctk.CTkTextbox(dialog, width=340, height=90)
+        comment_box.pack(padx=30, pady=(5, 15))
+        
+        def submit():
+            success, message = submit_review(
+                self.controller.user_id,
+                order["OrderID"],
+                int(rating_var.get()),
+                comment_box.get("1.0", "end").strip()
+            )
+            if not success:
+                CTkMessagebox(title="Rating", message=message, icon="warning", option_1="OK")
+                return
+            dialog.destroy()
+            order["Rating"] = int(rating_var.get())
+            rate_button.configure(text=f"Your rating: {stars_text(order['Rating'])}", state="disabled")
+            # Card averages come from the restaurant row, so refresh it in the facet index
+            restaurant_changed(order["RestaurantID"])
+            CTkMessagebox(title="Rating", message=message, icon="check", option_1="OK")
+        
+        ctk.CTkButton(
+            dialog,
+            text="Submit Rating",
+            command=submit,
+            fg_color="#22C55E",
+            hover_color="#1DA346",
+            height=35
+        ).pack(pady=(0, 20))
     
     def reorder(self, order):
         """Process reorder of a past order."""
@@ -1686,7 +1920,7 @@ class ProfileFrame(ctk.CTkScrollableFrame):
             return
             
         query = """
-            SELECT oi.MenuID, m.ItemName, m.Price, oi.Quantity
+            SELECT oi.MenuID, m.RestaurantID, m.ItemName, m.Price, oi.Quantity
             FROM OrderItem oi
             JOIN Menu m ON oi.MenuID = m.MenuID
             WHERE oi.OrderID = %s
@@ -1704,16 +1938,17 @@ class ProfileFrame(ctk.CTkScrollableFrame):
             return
             
         # Clear current cart
-        self.controller.cart = []
+        self.controller.cart.clear()
         
         # Add items to cart
         for item in items:
-            self.controller.cart.append({
-                "MenuID": item["MenuID"],
-                "ItemName": item["ItemName"],
-                "Price": float(item["Price"]),
-                "Quantity": item["Quantity"]
-            })
+            self.controller.cart.add(
+                item["MenuID"],
+                item["ItemName"],
+                item["Price"],
+                item["Quantity"],
+                item["RestaurantID"]
+            )
         
         # Show confirmation
         CTkMessagebox(
@@ -1951,17 +2186,21 @@ class SettingsFrame(ctk.CTkFrame):
         self.settings_container = ctk.CTkFrame(self, fg_color="white", corner_radius=15)
         self.settings_container.pack(fill="x", padx=15, pady=(0, 20))
         
-        # Settings options
+        # Settings options (display label, UserSettings.SettingName)
         settings = [
-            ("Notifications", True),
-            ("Dark Mode", False),
-            ("Auto-Save Address", True),
-            ("Save Payment Info", False)
+            ("Notifications", "Notifications"),
+            ("Dark Mode", "DarkMode"),
+            ("Auto-Save Address", "AutoSaveAddress"),
+            ("Save Payment Info", "SavePaymentInfo")
         ]
         
         self.setting_switches = {}  # Store references to switches
+        self.setting_names = dict(settings)
         
-        for setting, value in settings:
+        for setting, setting_name in settings:
+            # Current value comes from the in-memory settings store
+            value = self.controller.settings_store.get(setting_name)
+            
             # Setting container
             setting_frame = ctk.CTkFrame(self.settings_container, fg_color="transparent")
             setting_frame.pack(fill="x", padx=15, pady=10)
@@ -1995,6 +2234,9 @@ class SettingsFrame(ctk.CTkFrame):
             # Store reference to switch
             self.setting_switches[setting] = (switch_var, setting_switch)
         
+        # Settings load in the background; show the saved values once they arrive
+        self.sync_settings()
+        
         # Account section
         self.account_label = ctk.CTkLabel(
             self,
@@ -2028,12 +2270,25 @@ class SettingsFrame(ctk.CTkFrame):
             )
             option_button.pack(fill="x", padx=5, pady=2)
     
+    def sync_settings(self):
+        """Update the switches from the settings store once its load has finished."""
+        store = self.controller.settings_store
+        if not store.load_done.is_set():
+            self.after(100, self.sync_settings)
+            return
+        if not self.winfo_exists():
+            return
+        for setting, (switch_var, _) in self.setting_switches.items():
+            switch_var.set(store.get(self.setting_names[setting]))
+    
     def toggle_setting(self, setting):
         """Handle toggling a setting."""
         switch_var, _ = self.setting_switches.get(setting, (None, None))
         if switch_var:
             is_enabled = switch_var.get()
-            print(f"Setting '{setting}' is now {'enabled' if is_enabled else 'disabled'}")
+            
+            # Update memory now; the database write happens in the background
+            self.controller.settings_store.set(self.setting_names[setting], is_enabled)
             
             # Show confirmation toast
             CTkMessagebox(
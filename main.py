@@ -1,10 +1,100 @@
 import customtkinter as ctk
 from custom.auth import LoginWindow  # Import the login window to handle user authentication
 from utils import connect_to_database  # Import the database connection utility
-from tkinter import messagebox
 from PIL import Image
-import bcrypt
-from datetime import datetime
+import argparse
+from config import Config
+
+# Bump SCHEMA_VERSION and add an entry to SCHEMA_MIGRATIONS whenever the schema changes
+SCHEMA_VERSION = 8
+
+# Statements that upgrade the database to each version. Version 1 is the
+# baseline created by create_tables(); later versions build on top of it.
+SCHEMA_MIGRATIONS = {
+    2: [
+        # Courier dispatch: find busy couriers and waiting orders without table scans
+        "CREATE INDEX idx_delivery_personnel_status ON Delivery (PersonnelID, DeliveryStatus)",
+        "CREATE INDEX idx_order_status ON `Order` (OrderStatus)",
+    ],
+    3: [
+        # Append-only log of order status changes, polled by open order screens
+        """
+            CREATE TABLE IF NOT EXISTS OrderEvent (
+                EventID BIGINT NOT NULL AUTO_INCREMENT,
+                OrderID INT NOT NULL,
+                UserID INT NOT NULL,
+                RestaurantID INT NOT NULL,
+                OrderStatus VARCHAR(20) NOT NULL,
+                CreatedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (EventID),
+                KEY idx_order_event_user (UserID, EventID),
+                KEY idx_order_event_restaurant (RestaurantID, EventID),
+                FOREIGN KEY (OrderID) REFERENCES `Order`(OrderID) ON DELETE CASCADE
+            );
+        """,
+    ],
+    4: [
+        # Kitchen display: a restaurant's open orders in due order
+        "CREATE INDEX idx_order_restaurant_status ON `Order` (RestaurantID, OrderStatus, OrderDate)",
+    ],
+    5: [
+        # Covers the menu cache's version probe
+        "CREATE INDEX idx_menu_restaurant_version ON Menu (RestaurantID, UpdatedAt, CreatedAt)",
+    ],
+    6: [
+        # Saved shopping carts, written behind by custom/cart_store.py
+        """
+            CREATE TABLE IF NOT EXISTS CartItem (
+                UserID INT NOT NULL,
+                MenuID INT NOT NULL,
+                Quantity INT NOT NULL,
+                Price DECIMAL(10,2) NOT NULL,
+                AddedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                UpdatedAt TIMESTAMP NULL ON UPDATE CURRENT_TIMESTAMP,
+                PRIMARY KEY (UserID, MenuID),
+                FOREIGN KEY (UserID) REFERENCES User(UserID) ON DELETE CASCADE,
+                FOREIGN KEY (MenuID) REFERENCES Menu(MenuID) ON DELETE CASCADE
+            );
+        """,
+    ],
+    7: [
+        # Customer ratings, one per delivered order
+        """
+            CREATE TABLE IF NOT EXISTS Review (
+                ReviewID INT NOT NULL AUTO_INCREMENT,
+                OrderID INT NOT NULL,
+                UserID INT NOT NULL,
+                RestaurantID INT NOT NULL,
+                Rating TINYINT NOT NULL,
+                Comment TEXT,
+                CreatedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (ReviewID),
+                UNIQUE KEY unique_review_order (OrderID),
+                KEY idx_review_restaurant (RestaurantID, CreatedAt),
+                FOREIGN KEY (OrderID) REFERENCES `Order`(OrderID) ON DELETE CASCADE,
+                FOREIGN KEY (UserID) REFERENCES User(UserID) ON DELETE CASCADE,
+                FOREIGN KEY (RestaurantID) REFERENCES Restaurant(RestaurantID) ON DELETE CASCADE
+            );
+        """,
+        # Running totals kept by custom/reviews.py, read with the restaurant row
+        """
+            ALTER TABLE Restaurant
+                ADD COLUMN RatingCount INT NOT NULL DEFAULT 0,
+                ADD COLUMN RatingSum INT NOT NULL DEFAULT 0
+        """,
+    ],
+    8: [
+        # Delivery-time model: orders that turned delivered since its last refresh
+        "CREATE INDEX idx_order_status_updated ON `Order` (OrderStatus, UpdatedAt)",
+    ],
+}
+
+# MySQL errors that mean a migration statement has already been applied
+ALREADY_APPLIED_ERRORS = (
+    1050,  # Table already exists
+    1060,  # Duplicate column name
+    1061,  # Duplicate key name
+)
 
 # Function to create the required tables for the Online Food Ordering system
 def create_tables():
@@ -135,6 +225,13 @@ def create_tables():
                 UNIQUE KEY unique_user_setting (UserID, SettingName),
                 FOREIGN KEY (UserID) REFERENCES User(UserID) ON DELETE CASCADE
             );
+        """,
+        "schema_version": """
+            CREATE TABLE IF NOT EXISTS SchemaVersion (
+                Version INT NOT NULL,
+                AppliedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (Version)
+            );
         """
     }
 
@@ -147,15 +244,90 @@ def create_tables():
                 cursor.execute(query)
             conn.commit()
             print("Tables created successfully!")
+            return True
     except Exception as e:
         print(f"Error creating tables: {e}")
     finally:
         if conn and conn.is_connected():
             conn.close()
+    return False
+
+# Function to read the schema version recorded in the database
+def get_schema_version(cursor):
+    """
+    Returns the schema version of the connected database.
+    
+    This is the only query run at startup when the schema is current.
+    Databases created before versioning was added report version 0.
+    """
+    from mysql.connector import Error
+    
+    try:
+        cursor.execute("SELECT MAX(Version) FROM SchemaVersion")
+        row = cursor.fetchone()
+        return (row[0] or 0) if row else 0
+    except Error as e:
+        if e.errno == 1146:  # Table doesn't exist
+            return 0
+        raise
+
+# Function to bring the database schema up to SCHEMA_VERSION
+def ensure_schema():
+    """
+    Checks the schema version and runs DDL only when the database is behind.
+    
+    Returns:
+        bool: True if the schema is current, False otherwise
+    """
+    from mysql.connector import Error
+    
+    conn = None
+    try:
+        conn = connect_to_database()
+        if not conn:
+            return False
+        
+        cursor = conn.cursor()
+        current_version = get_schema_version(cursor)
+        
+        if current_version >= SCHEMA_VERSION:
+            return True
+        
+        print(f"Upgrading database schema from version {current_version} to {SCHEMA_VERSION}...")
+        
+        # Baseline tables (all IF NOT EXISTS, so safe on pre-versioning databases)
+        if current_version < 1:
+            if not create_tables():
+                return False
+            cursor.execute("INSERT IGNORE INTO SchemaVersion (Version) VALUES (1)")
+            conn.commit()
+            current_version = 1
+        
+        # Apply each migration in order, recording the version as we go
+        for version in range(current_version + 1, SCHEMA_VERSION + 1):
+            for statement in SCHEMA_MIGRATIONS.get(version, []):
+                try:
+                    cursor.execute(statement)
+                except Error as e:
+                    if e.errno not in ALREADY_APPLIED_ERRORS:
+                        raise
+            cursor.execute("INSERT IGNORE INTO SchemaVersion (Version) VALUES (%s)", (version,))
+            conn.commit()
+        
+        print("Database schema is up to date.")
+        return True
+    except Exception as e:
+        print(f"Error upgrading database schema: {e}")
+        return False
+    finally:
+        if conn and conn.is_connected():
+            conn.close()
 
 # Function to add sample data to the database
 def add_sample_data():
     """Add sample data to the database tables."""
+    import bcrypt
+    
     conn = None
     try:
         conn = connect_to_database()
@@ -181,7 +353,7 @@ def add_sample_data():
             ("Jane", "Smith", "jane@food.com", hashed_password, "555-987-6543", "456 Oak Ave, New York, NY 10001", "customer"),
             ("Admin", "User", "admin@food.com", hashed_password, "555-111-2222", "789 Admin St, San Francisco, CA 94105", "admin"),
             ("Rest", "Owner", "restaurant@food.com", hashed_password, "555-444-5555", "321 Chef Blvd, Miami, FL 33101", "restaurant"),
-            ("Delivery", "Person", "delivery@food.com", hashed_password, "555-777-8888", "555 Delivery Rd, Austin, TX 78701", "customer")
+            ("Delivery", "Person", "delivery@food.com", hashed_password, "555-777-8888", "555 Delivery Rd, Austin, TX 78701", "delivery")
         ]
         
         user_query = """
@@ -367,6 +539,14 @@ class FoodOrderingApp(ctk.CTk):
         self.user_role = None
         self.user_id = None
         
+        # Scan static/images once; card images are looked up in memory afterwards
+        from custom.asset_manifest import get_asset_manifest
+        get_asset_manifest()
+        
+        # Measure how long screens block the event loop
+        from custom.frame_metrics import get_frame_metrics
+        get_frame_metrics().start(self)
+        
         # Start with the landing page
         self.show_landing_page()
 
@@ -389,6 +569,11 @@ class FoodOrderingApp(ctk.CTk):
         if self.user_role == "admin":
             from custom.admin_dashboard import AdminDashboard
             self.dashboard = AdminDashboard(master=self, user_id=self.current_user["UserID"])
+            
+            # Load chart and report libraries in the background before the admin opens reports
+            if Config.prewarm_imports:
+                from custom.lazy_imports import prewarm_modules, CHART_MODULES, REPORT_MODULES
+                prewarm_modules(self, CHART_MODULES + REPORT_MODULES)
         elif self.user_role == "restaurant":
             from custom.restaurant_dashboard import RestaurantDashboard
             self.dashboard = RestaurantDashboard(master=self, user_id=self.current_user["UserID"])
@@ -488,15 +673,108 @@ class LandingPage(ctk.CTkFrame):
 
 # Main function to start the application
 def main():
-    # Create necessary tables
-    create_tables()
+    parser = argparse.ArgumentParser(description=Config.app_title)
+    parser.add_argument(
+        "--profile-imports",
+        action="store_true",
+        help="Report the import cost of each startup and report module, then exit"
+    )
+    parser.add_argument(
+        "--seed-sample-data",
+        action="store_true",
+        help="Create the schema if needed, insert the sample data into an empty database, then exit"
+    )
+    parser.add_argument(
+        "--import-users",
+        metavar="FILE",
+        help="Bulk import users from a CSV or JSON file, then exit"
+    )
+    parser.add_argument(
+        "--benchmark-signups",
+        metavar="COUNT",
+        type=int,
+        help="Register COUNT throwaway users, report signups per second, then exit"
+    )
+    parser.add_argument(
+        "--dispatch",
+        action="store_true",
+        help="Run the courier dispatch loop instead of the application"
+    )
+    parser.add_argument(
+        "--dispatch-interval",
+        type=float,
+        default=30,
+        help="Seconds between dispatch cycles (default: 30)"
+    )
+    parser.add_argument(
+        "--ingest-images",
+        action="store_true",
+        help="Write the resized WebP thumbnails and restaurant atlases for static/images, then exit"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Simultaneous clients used by the benchmarks (default: 4)"
+    )
+    args = parser.parse_args()
+    
+    if args.benchmark_signups:
+        from custom.benchmarks import benchmark_signups, print_benchmark
+        print_benchmark(
+            "Signup throughput",
+            benchmark_signups(args.benchmark_signups, concurrency=args.concurrency)
+        )
+        return
+    
+    if args.import_users:
+        from custom.bulk_import import read_import_file, import_users
+        
+        def report_progress(stage, done, total):
+            print(f"\r{stage}: {done}/{total}", end="", flush=True)
+        
+        result = import_users(read_import_file(args.import_users), progress=report_progress)
+        print()
+        print(result.summary())
+        for row_number, error in result.errors:
+            print(f"  Row {row_number}: {error}")
+        return
+    
+    if args.ingest_images:
+        from custom.image_ingest import build_atlases, ingest_images
+        written = ingest_images(progress=lambda path, count: print(f"{path}: {count} written"))
+        print(f"{written} renditions written")
+        print(f"{build_atlases()} restaurant images packed into atlases")
+        return
     
-    # Add sample data
-    add_sample_data()
+    if args.profile_imports:
+        from custom.lazy_imports import print_import_profile, STARTUP_MODULES, CHART_MODULES, REPORT_MODULES
+        print_import_profile(STARTUP_MODULES + CHART_MODULES + REPORT_MODULES)
+        return
+    
+    if args.dispatch:
+        from custom.dispatch import DispatchEngine
+        if ensure_schema():
+            try:
+                DispatchEngine().run(interval=args.dispatch_interval)
+            except KeyboardInterrupt:
+                pass
+        return
+    
+    if args.seed_sample_data:
+        if ensure_schema():
+            add_sample_data()
+        return
+    
+    # Check the schema version (runs DDL only when the database is behind)
+    ensure_schema()
 
     # Start the application
     app = FoodOrderingApp()
     app.mainloop()
+    
+    from custom.frame_metrics import get_frame_metrics
+    get_frame_metrics().stop()
 
 
 if __name__ == "__main__":
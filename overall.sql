@@ -31,6 +31,9 @@ CREATE TABLE IF NOT EXISTS Restaurant (
     CreatedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     UpdatedAt TIMESTAMP NULL ON UPDATE CURRENT_TIMESTAMP,
     DeletedAt TIMESTAMP NULL,
+    -- Running rating totals (schema version 7), kept by custom/reviews.py
+    RatingCount INT NOT NULL DEFAULT 0,
+    RatingSum INT NOT NULL DEFAULT 0,
     PRIMARY KEY (RestaurantID)
 );
 
@@ -111,6 +114,19 @@ CREATE TABLE IF NOT EXISTS Delivery (
     FOREIGN KEY (PersonnelID) REFERENCES User(UserID) ON DELETE CASCADE
 );
 
+-- Used by the courier dispatcher (schema version 2)
+CREATE INDEX idx_delivery_personnel_status ON Delivery (PersonnelID, DeliveryStatus);
+CREATE INDEX idx_order_status ON `Order` (OrderStatus);
+
+-- Used by the kitchen display (schema version 4)
+CREATE INDEX idx_order_restaurant_status ON `Order` (RestaurantID, OrderStatus, OrderDate);
+
+-- Used by the menu cache's version probe (schema version 5)
+CREATE INDEX idx_menu_restaurant_version ON Menu (RestaurantID, UpdatedAt, CreatedAt);
+
+-- Used by the delivery-time model's refresh (schema version 8)
+CREATE INDEX idx_order_status_updated ON `Order` (OrderStatus, UpdatedAt);
+
 --  USER SETTINGS TABLE
 CREATE TABLE IF NOT EXISTS UserSettings (
     SettingID INT NOT NULL AUTO_INCREMENT,
@@ -124,6 +140,57 @@ CREATE TABLE IF NOT EXISTS UserSettings (
     FOREIGN KEY (UserID) REFERENCES User(UserID) ON DELETE CASCADE
 );
 
+--  ORDER EVENT LOG (schema version 3, polled by open order screens)
+CREATE TABLE IF NOT EXISTS OrderEvent (
+    EventID BIGINT NOT NULL AUTO_INCREMENT,
+    OrderID INT NOT NULL,
+    UserID INT NOT NULL,
+    RestaurantID INT NOT NULL,
+    OrderStatus VARCHAR(20) NOT NULL,
+    CreatedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (EventID),
+    KEY idx_order_event_user (UserID, EventID),
+    KEY idx_order_event_restaurant (RestaurantID, EventID),
+    FOREIGN KEY (OrderID) REFERENCES `Order`(OrderID) ON DELETE CASCADE
+);
+
+--  SAVED CART TABLE (schema version 6, one row per item in a user's cart)
+CREATE TABLE IF NOT EXISTS CartItem (
+    UserID INT NOT NULL,
+    MenuID INT NOT NULL,
+    Quantity INT NOT NULL,
+    Price DECIMAL(10,2) NOT NULL,
+    AddedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UpdatedAt TIMESTAMP NULL ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (UserID, MenuID),
+    FOREIGN KEY (UserID) REFERENCES User(UserID) ON DELETE CASCADE,
+    FOREIGN KEY (MenuID) REFERENCES Menu(MenuID) ON DELETE CASCADE
+);
+
+--  REVIEW TABLE (schema version 7, one rating per delivered order)
+CREATE TABLE IF NOT EXISTS Review (
+    ReviewID INT NOT NULL AUTO_INCREMENT,
+    OrderID INT NOT NULL,
+    UserID INT NOT NULL,
+    RestaurantID INT NOT NULL,
+    Rating TINYINT NOT NULL,
+    Comment TEXT,
+    CreatedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (ReviewID),
+    UNIQUE KEY unique_review_order (OrderID),
+    KEY idx_review_restaurant (RestaurantID, CreatedAt),
+    FOREIGN KEY (OrderID) REFERENCES `Order`(OrderID) ON DELETE CASCADE,
+    FOREIGN KEY (UserID) REFERENCES User(UserID) ON DELETE CASCADE,
+    FOREIGN KEY (RestaurantID) REFERENCES Restaurant(RestaurantID) ON DELETE CASCADE
+);
+
+--  SCHEMA VERSION TABLE (checked by main.py at startup)
+CREATE TABLE IF NOT EXISTS SchemaVersion (
+    Version INT NOT NULL,
+    AppliedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (Version)
+);
+
 -- --------------------------------------------------------
 -- Sample Data Inserts
 -- --------------------------------------------------------
@@ -135,7 +202,7 @@ VALUES
 ('Jane', 'Smith', 'jane@example.com', 'Password123!', '555-987-6543', '456 Oak Ave, New York, NY 10001', 'customer'),
 ('Admin', 'User', 'admin@example.com', 'Password123!', '555-111-2222', '789 Admin St, San Francisco, CA 94105', 'admin'),
 ('Rest', 'Owner', 'restaurant@example.com', 'Password123!', '555-444-5555', '321 Chef Blvd, Miami, FL 33101', 'restaurant'),
-('Delivery', 'Person', 'delivery@example.com', 'Password123!', '555-777-8888', '555 Delivery Rd, Austin, TX 78701', 'customer');
+('Delivery', 'Person', 'delivery@example.com', 'Password123!', '555-777-8888', '555 Delivery Rd, Austin, TX 78701', 'delivery');
 
 -- Sample User Settings
 INSERT INTO UserSettings (UserID, SettingName, SettingValue)
@@ -3,9 +3,16 @@ from mysql.connector import Error
 import os
 from tkinter import messagebox
 from config import Config
-import bcrypt
 from datetime import datetime
 
+# Settings every new account starts with (SettingName, SettingValue)
+DEFAULT_USER_SETTINGS = [
+    ("Notifications", True),
+    ("DarkMode", False),
+    ("AutoSaveAddress", True),
+    ("SavePaymentInfo", False)
+]
+
 def connect_to_database():
     """
     Establishes a connection to the MySQL database using credentials from config.py.
@@ -30,6 +37,59 @@ def connect_to_database():
         messagebox.showerror("Database Connection Error", f"Failed to connect to the database: {e}")
         return None
 
+def connect_in_background(**options):
+    """
+    Open a database connection from a worker thread.
+
+    Unlike connect_to_database this never touches Tk (Tk is not thread
+    safe), so failures are only printed.
+
+    Args:
+        **options: Extra mysql.connector.connect options (e.g. autocommit=True)
+
+    Returns:
+        connection (mysql.connector.connection): Connection, or None on failure
+    """
+    try:
+        connection = mysql.connector.connect(
+            host=Config.db_host,
+            user=Config.user,
+            password=Config.password,
+            database=Config.database,
+            **options
+        )
+        if connection.is_connected():
+            return connection
+    except Error as e:
+        print(f"Database connection failed: {e}")
+    return None
+
+def fetch_in_background(query, params=None):
+    """
+    Run a SELECT from a worker thread and return its rows as dicts.
+
+    The worker-thread counterpart of execute_query(fetch=True): errors are
+    printed instead of shown in a messagebox.
+
+    Returns:
+        list: Rows, or None if the database is unreachable or the query failed
+    """
+    connection = connect_in_background()
+    if not connection:
+        return None
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(query, params or ())
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+    except Error as e:
+        print(f"Database query failed: {e}")
+        return None
+    finally:
+        if connection.is_connected():
+            connection.close()
+
 def execute_query(query, params=None, fetch=False):
     """
     Executes a SQL query with optional parameters and returns results if requested.
@@ -157,6 +217,7 @@ def validate_user(email, password):
         stored_password = user['Password']
         
         # Use bcrypt to check the password
+        import bcrypt
         if bcrypt.checkpw(password.encode('utf-8'), stored_password.encode('utf-8')):
             # Remove the password from the result before returning
             del user['Password']
@@ -187,6 +248,7 @@ def register_user(first_name, last_name, email, password, role='customer'):
         return False
     
     # Hash the password using bcrypt
+    import bcrypt
     hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
     
     # Create new user
@@ -253,6 +315,7 @@ def change_password(user_id, current_password, new_password):
     stored_password = result[0]['Password']
     
     # Check if the current password matches
+    import bcrypt
     if not bcrypt.checkpw(current_password.encode('utf-8'), stored_password.encode('utf-8')):
         messagebox.showerror("Password Error", "Current password is incorrect.")
         return False
@@ -282,19 +345,15 @@ def update_user_settings(user_id, setting_name, setting_value):
     Returns:
         bool: True if successful, False otherwise
     """
-    # Check if the setting already exists
-    check_query = "SELECT * FROM UserSettings WHERE UserID = %s AND SettingName = %s"
-    result = execute_query(check_query, (user_id, setting_name), fetch=True)
+    # Single round trip: insert the setting or update it if it already exists
+    query = """
+        INSERT INTO UserSettings (UserID, SettingName, SettingValue, CreatedAt)
+        VALUES (%s, %s, %s, NOW())
+        ON DUPLICATE KEY UPDATE SettingValue = VALUES(SettingValue), UpdatedAt = NOW()
+    """
     
     try:
-        if result:
-            # Update existing setting
-            update_query = "UPDATE UserSettings SET SettingValue = %s, UpdatedAt = NOW() WHERE UserID = %s AND SettingName = %s"
-            execute_query(update_query, (setting_value, user_id, setting_name))
-        else:
-            # Create new setting
-            insert_query = "INSERT INTO UserSettings (UserID, SettingName, SettingValue, CreatedAt) VALUES (%s, %s, %s, NOW())"
-            execute_query(insert_query, (user_id, setting_name, setting_value))
+        execute_query(query, (user_id, setting_name, setting_value))
         return True
     except Exception as e:
         messagebox.showerror("Settings Error", f"Failed to update setting: {e}")